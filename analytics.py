@@ -0,0 +1,128 @@
+import os
+import json
+from itertools import combinations
+
+import pandas as pd
+
+from datasets import load_food_places, load_tourist_places, food_places_path, TOURIST_PLACES_PATH
+
+# ✅ 집계 큐브
+# 모든 차원 조합(지역 × 도시명 × 음식종류, 일부 차원은 전체 '*')의 개수를 미리 세어 두고,
+# 드릴다운용으로 "상위 셀 → 차원별 하위 셀 목록"도 함께 만들어 둔다.
+# 조회는 전부 dict 한 번으로 끝나므로 원본 행을 다시 훑지 않는다.
+ALL = "*"
+CUBE_DIR = os.path.join("data", "cache", "cubes")
+
+FOOD_DIMS = ['지역', '도시명', '음식종류']
+TOURIST_DIMS = ['지역코드', '카테고리', '관광지코드']
+
+
+class Cube:
+    def __init__(self, dims, cells, children, source=None):
+        self.dims = list(dims)
+        self.cells = cells          # (값 또는 '*', ...) → 개수
+        self.children = children    # (상위 셀, 차원) → [(값, 개수), ...] 개수 내림차순
+        self.source = source
+
+    # ✅ 원본에서 큐브 만들기 (2^차원수 번의 groupby)
+    @classmethod
+    def build(cls, df, dims, source=None):
+        df = df[dims].fillna("").astype(str)
+        cells = {(ALL,) * len(dims): len(df)}
+        for r in range(1, len(dims) + 1):
+            for subset in combinations(range(len(dims)), r):
+                counts = df.groupby([dims[i] for i in subset]).size()
+                for values, n in counts.items():
+                    values = values if isinstance(values, tuple) else (values,)
+                    key = [ALL] * len(dims)
+                    for i, v in zip(subset, values):
+                        key[i] = v
+                    cells[tuple(key)] = int(n)
+
+        return cls(dims, cells, cls._children(dims, cells), source)
+
+    def _key(self, filters):
+        unknown = set(filters) - set(self.dims)
+        if unknown:
+            raise KeyError(f"큐브에 없는 차원입니다: {', '.join(sorted(unknown))}")
+        return tuple(str(filters[d]) if filters.get(d) is not None else ALL for d in self.dims)
+
+    # ✅ 개수: cube.count(지역="제주도", 음식종류="고기국수")
+    def count(self, **filters):
+        return self.cells.get(self._key(filters), 0)
+
+    # ✅ 드릴다운: 주어진 조건 아래에서 dim 값별 개수 (normalize=True면 비율)
+    def breakdown(self, dim, normalize=False, **filters):
+        if dim not in self.dims:
+            raise KeyError(f"큐브에 없는 차원입니다: {dim}")
+        items = self.children.get((self._key(filters), dim), [])
+        series = pd.Series(dict(items), name="count", dtype="int64")
+        series.index.name = dim
+        if normalize:
+            total = self.count(**filters)
+            series = (series / total if total else series.astype(float)).rename("proportion")
+        return series
+
+    # ✅ 비율: share(지역="제주도", 도시명="제주시", of="도시명") → 제주도 안에서 제주시 비중
+    def share(self, of, **filters):
+        parent = dict(filters)
+        parent.pop(of, None)
+        total = self.count(**parent)
+        return self.count(**filters) / total if total else 0.0
+
+    def to_dict(self):
+        return {
+            "dims": self.dims,
+            "source": self.source,
+            "cells": [[list(k), n] for k, n in self.cells.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        cells = {tuple(k): n for k, n in data["cells"]}
+        return cls(data["dims"], cells, cls._children(data["dims"], cells), data.get("source"))
+
+    # 상위 셀(차원 하나를 '*'로 바꾼 셀) → 하위 값 목록
+    @staticmethod
+    def _children(dims, cells):
+        children = {}
+        for key, n in cells.items():
+            for i, v in enumerate(key):
+                if v != ALL:
+                    children.setdefault((key[:i] + (ALL,) + key[i + 1:], dims[i]), []).append((v, n))
+        for items in children.values():
+            items.sort(key=lambda x: (-x[1], x[0]))
+        return children
+
+
+def _fingerprint(path):
+    st = os.stat(path)
+    return {"path": path, "size": st.st_size, "mtime": st.st_mtime}
+
+
+# ✅ 원본 파일이 그대로면 저장된 큐브를 읽고, 바뀌었으면 다시 만든다
+def load_or_build_cube(name, source_path, loader, dims):
+    path = os.path.join(CUBE_DIR, f"{name}.json")
+    fingerprint = _fingerprint(source_path)
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("source") == fingerprint and data.get("dims") == dims:
+            return Cube.from_dict(data)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    cube = Cube.build(loader(source_path), dims, source=fingerprint)
+    os.makedirs(CUBE_DIR, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cube.to_dict(), f, ensure_ascii=False)
+    return cube
+
+
+def food_cube(path=None):
+    path = path or food_places_path()
+    return load_or_build_cube("food", path, load_food_places, FOOD_DIMS)
+
+
+def tourist_cube(path=TOURIST_PLACES_PATH):
+    return load_or_build_cube("tourist", path, load_tourist_places, TOURIST_DIMS)
@@ -0,0 +1,219 @@
+import bisect
+import functools
+from dataclasses import dataclass
+
+import pandas as pd
+
+from datasets import load_area_numbers, load_food_places, load_tourist_places
+
+# ✅ 지역·관광지 자동완성 (로컬 인덱스, API 호출 없음)
+# 입력창에 친 글자를 그대로 Text Search로 보내지 않고, area_numbers.csv 지역명·관광지명·전국맛집 도시명 중
+# 정식 이름을 먼저 고르게 한다.
+#   - 앞부분 일치: 자모 단위로 비교하므로 "부사"(입력 중) → "부산", "제ㅈ" → "제주"
+#   - 초성 검색: "ㅈㅈ" → "제주", "ㄱㅂㄱ" → "경복궁"
+#   - 오타 허용: 단어 단위 편집 거리(자모 기준 1~2) - 삭제 변형 사전(SymSpell 방식)으로 찾는다
+# 인덱스는 한 번만 만들고, 조회는 정렬 목록 이분 탐색 + 사전 조회뿐이라 1ms 안에 끝난다.
+KIND_ORDER = {"지역": 0, "도시": 1, "관광지": 2}
+DEFAULT_LIMIT = 8
+MIN_FUZZY_LENGTH = 4        # 자모 4개 미만 단어는 오타 검색 안 함 (후보가 너무 많아짐)
+LONG_WORD_LENGTH = 8        # 자모 8개 이상이면 편집 거리 2까지 허용
+
+# 한글 음절 = 초성 19 × 중성 21 × 종성 28
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = ["ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅗㅏ", "ㅗㅐ", "ㅗㅣ", "ㅛ", "ㅜ",
+              "ㅜㅓ", "ㅜㅔ", "ㅜㅣ", "ㅠ", "ㅡ", "ㅡㅣ", "ㅣ"]
+_JONGSEONG = ["", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ",
+              "ㄹㅍ", "ㄹㅎ", "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+# 겹받침·겹모음을 따로 친 경우도 같게 보이도록 낱자로 푼다
+_COMPOUND_JAMO = {"ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+                  "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ", "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ",
+                  "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ"}
+_SYLLABLE_FIRST, _SYLLABLE_LAST = 0xAC00, 0xD7A3
+
+
+def normalize(text):
+    return "".join(str(text).lower().split())
+
+
+def to_jamo(text):
+    out = []
+    for ch in normalize(text):
+        code = ord(ch)
+        if _SYLLABLE_FIRST <= code <= _SYLLABLE_LAST:
+            offset = code - _SYLLABLE_FIRST
+            out.append(_CHOSEONG[offset // 588])
+            out.append(_JUNGSEONG[offset % 588 // 28])
+            out.append(_JONGSEONG[offset % 28])
+        else:
+            out.append(_COMPOUND_JAMO.get(ch, ch))
+    return "".join(out)
+
+
+def to_choseong(text):
+    out = []
+    for ch in normalize(text):
+        code = ord(ch)
+        out.append(_CHOSEONG[(code - _SYLLABLE_FIRST) // 588] if _SYLLABLE_FIRST <= code <= _SYLLABLE_LAST else ch)
+    return "".join(out)
+
+
+def is_choseong_query(text):
+    text = normalize(text)
+    return bool(text) and all(ch in _CHOSEONG for ch in text)
+
+
+def edit_distance(a, b, limit):
+    # limit을 넘으면 일찍 멈추는 레벤슈타인 거리
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _deletes(word, distance):
+    # 글자를 distance개까지 지운 변형 전부
+    found, frontier = {word}, {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+def _max_distance(word):
+    if len(word) < MIN_FUZZY_LENGTH:
+        return 0
+    return 2 if len(word) >= LONG_WORD_LENGTH else 1
+
+
+def _syllable_prefixes(word):
+    jamo = [to_jamo(ch) for ch in normalize(word)]
+    return {"".join(jamo[:n]) for n in range(1, len(jamo) + 1)} - {""}
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    label: str          # 화면에 보일 정식 이름
+    kind: str           # "지역" / "도시" / "관광지"
+    query: str          # 검색에 넘길 문자열
+    detail: str = ""
+
+
+class AutocompleteIndex:
+    def __init__(self, entries):
+        self.entries = list(dict.fromkeys(entries))     # 같은 (이름, 종류)는 한 번만
+        jamo_keys, choseong_keys, self._fuzzy, self._exact = [], [], {}, {}
+        for i, entry in enumerate(self.entries):
+            words = str(entry.label).split()
+            full = to_jamo(entry.label)
+            jamo_keys.append((full, 0, i))
+            choseong_keys.append((to_choseong(entry.label), 0, i))
+            if len(words) > 1:
+                for word in words:
+                    jamo_keys.append((to_jamo(word), 1, i))
+                    choseong_keys.append((to_choseong(word), 1, i))
+            self._exact.setdefault(full, set()).add(i)
+            # 오타 사전에는 단어마다 음절 경계까지 자른 앞부분도 넣는다 ("제즈" → "제주시"의 "제주")
+            for word in words:
+                for head in _syllable_prefixes(word):
+                    for variant in _deletes(head, _max_distance(head)):
+                        self._fuzzy.setdefault(variant, set()).add((head, i))
+        self._jamo = sorted(jamo_keys)
+        self._jamo_strings = [k for k, _, _ in self._jamo]
+        self._choseong = sorted(choseong_keys)
+        self._choseong_strings = [k for k, _, _ in self._choseong]
+
+    @staticmethod
+    def _prefix(keys, strings, prefix):
+        start = bisect.bisect_left(strings, prefix)
+        end = bisect.bisect_right(strings, prefix + "\uffff")
+        return keys[start:end]
+
+    # ✅ 후보 (점수가 낮을수록 위): 정확히 일치 → 이름 앞부분 → 단어 앞부분 → 입력 앞부분 → 초성 → 오타 1 → 오타 2
+    def suggest(self, text, limit=DEFAULT_LIMIT):
+        query = to_jamo(text)
+        if not query:
+            return []
+        best = {}
+
+        def offer(i, tier):
+            if tier < best.get(i, tier + 1):
+                best[i] = tier
+
+        for key, is_word, i in self._prefix(self._jamo, self._jamo_strings, query):
+            offer(i, 0 if key == query and not is_word else 1 + is_word)
+        # 입력이 정식 이름으로 시작하는 경우 ("서울특별시" → "서울", "부산 해운대" → "부산")
+        for head in _syllable_prefixes(text):
+            for i in self._exact.get(head, ()):
+                offer(i, 2.5)
+        if is_choseong_query(text):
+            for _, is_word, i in self._prefix(self._choseong, self._choseong_strings, normalize(text)):
+                offer(i, 3 + is_word * 0.5)
+        if len(best) < limit:
+            limit_distance = _max_distance(query)
+            for variant in _deletes(query, limit_distance):
+                for word, i in self._fuzzy.get(variant, ()):
+                    if i in best and best[i] < 4:
+                        continue
+                    distance = edit_distance(query, word, limit_distance)
+                    if distance <= limit_distance:
+                        offer(i, 3 + distance)
+
+        ranked = sorted(best, key=lambda i: (best[i], KIND_ORDER.get(self.entries[i].kind, 9),
+                                             len(self.entries[i].label), self.entries[i].label))
+        return [self.entries[i] for i in ranked[:limit]]
+
+    def is_canonical(self, text):
+        text = normalize(text)
+        return any(normalize(e.label) == text for e in self.suggest(text, limit=3))
+
+
+def build_entries(areas, food, places):
+    entries = [Suggestion(str(r['지역명']), "지역", str(r['지역명']), f"지역코드 {r['지역코드']}")
+               for _, r in areas.iterrows()]
+    cities = food.dropna(subset=['도시명']).drop_duplicates(subset=['도시명'])
+    entries += [Suggestion(str(r['도시명']), "도시", str(r['도시명']), str(r['지역']))
+                for _, r in cities.iterrows()]
+    entries += [Suggestion(str(r['관광지명']), "관광지", str(r['관광지명']),
+                           " ".join(str(r['주소']).split()[:2]) if pd.notna(r['주소']) else "")
+                for _, r in places.dropna(subset=['관광지명']).iterrows()]
+    return entries
+
+
+@functools.lru_cache(maxsize=1)
+def autocomplete_index():
+    return AutocompleteIndex(build_entries(load_area_numbers(), load_food_places(), load_tourist_places()))
+
+
+def suggest(text, limit=DEFAULT_LIMIT):
+    return autocomplete_index().suggest(text, limit)
+
+
+# ✅ 지역 이름 하나 확인: area_numbers.csv 지역명·전국맛집 도시명 중 가장 가까운 정식 이름 (없으면 None)
+# "제주" → "제주특별자치도", "강능" → "강릉"
+def resolve_region(text, kinds=("지역", "도시")):
+    candidates = [s for s in suggest(text, limit=20) if s.kind in kinds]
+    return candidates[0] if candidates else None
+
+
+# ✅ 자동완성 입력창: 친 글자가 정식 이름이 아니면 후보를 보여주고 고른 이름을 돌려준다
+def autocomplete_input(st, label, value="", key=None):
+    text = st.text_input(label, value, key=key)
+    index = autocomplete_index()
+    if not text.strip() or index.is_canonical(text):
+        return text
+    suggestions = index.suggest(text)
+    if not suggestions:
+        st.caption("일치하는 지역·관광지가 없어 입력한 그대로 검색합니다.")
+        return text
+    # 옵션이 바뀌면 선택도 첫 후보로 돌아가도록 key 없이 만든다
+    options = suggestions + [None]
+    choice = st.radio("🔎 혹시 이곳을 찾으시나요?", options, horizontal=True,
+                      format_func=lambda s: f"{s.label} · {s.kind}" if s else f"입력한 그대로 '{text}'")
+    return choice.query if choice else text
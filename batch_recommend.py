@@ -0,0 +1,198 @@
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import multiprocessing as mp
+
+import pandas as pd
+from dotenv import load_dotenv
+
+import offline
+from datasets import TOURIST_PLACES_PATH, load_tourist_places, load_area_numbers
+from export import write_export
+from federated import federated_nearby
+from crosswalk import crosswalk
+from ranking import rank_dataframe
+from rate_limit import RateLimiter, install
+
+# ✅ 전체 관광지 맛집 추천 일괄 계산 (headless)
+# 관광지 CSV(또는 지역코드)의 관광지마다 주변 맛집 후보를 모아 랭킹한 뒤 NDJSON으로 한 줄씩 흘려 쓴다.
+#   python batch_recommend.py --region 제주 --workers 4 --rate 10
+#   python batch_recommend.py --places data/tourist_places.csv --format parquet
+# 워커 프로세스들은 하나의 토큰 버킷(초당 --rate 회)을 나눠 쓰고,
+# 이미 끝난 콘텐츠ID는 출력 파일에서 읽어 건너뛴다(--no-resume 으로 끄기).
+BATCH_DIR = os.path.join("data", "batch")
+EXCLUDED_TYPES = (32, 39)   # 숙박, 음식점은 추천 대상 관광지에서 제외
+
+
+_limiter = None
+_options = None
+
+
+# ✅ 워커 초기화: 외부 API로 나가는 requests 호출마다 속도 제한기를 거치게 한다
+def _init_worker(limiter, options):
+    global _limiter, _options
+    _limiter, _options = limiter, options
+    install(limiter)
+
+
+def _candidates(lat, lng, options):
+    if options["offline"]:
+        return offline.find_nearby_restaurants(lat, lng, radius=options["radius"], limit=50)
+    return federated_nearby(lat, lng, options["radius"], options["google_key"], options["kakao_key"])
+
+
+# ✅ 관광지 하나 → 추천 맛집 top-k (오류는 줄에 기록하고 다음 실행에서 다시 시도)
+def recommend(place):
+    record = {
+        "콘텐츠ID": place["콘텐츠ID"],
+        "관광지명": place["관광지명"],
+        "지역코드": int(place["지역코드"]),
+        "위도": place["위도"],
+        "경도": place["경도"],
+        "computed_at": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+    try:
+        candidates = _candidates(place["위도"], place["경도"], _options)
+        # 구글·카카오 짝을 id 대응표에 남겨 앱과 다음 일괄 작업이 다시 찾지 않게 한다
+        if not _options["offline"]:
+            crosswalk().link_records(candidates)
+        df = pd.DataFrame(candidates)
+        if df.empty:
+            record["restaurants"] = []
+            return record
+        df['평점'] = pd.to_numeric(df['평점'], errors='coerce')
+        df = rank_dataframe(df, place["위도"], place["경도"], k=_options["top"])
+        columns = [c for c in ('이름', '주소', '평점', '리뷰수', '전화번호', '거리(m)', '점수',
+                               'google_place_id', 'kakao_id', 'place_id', '출처') if c in df]
+        df = df[columns].astype(object).where(df[columns].notna(), None)
+        record["restaurants"] = df.to_dict("records")
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    return record
+
+
+# ✅ 대상 관광지 고르기 (--region 은 지역코드 숫자 또는 area_numbers.csv 지역명)
+def select_places(path=TOURIST_PLACES_PATH, region=None):
+    places = load_tourist_places(path)
+    places = places[~places['관광지코드'].isin(EXCLUDED_TYPES)]
+    if region is not None:
+        areas = load_area_numbers()
+        codes = dict(zip(areas['지역명'], areas['지역코드']))
+        if str(region).isdigit():
+            code = int(region)
+            if code not in codes.values():
+                raise ValueError(f"알 수 없는 지역코드: {region}")
+        else:
+            # "제주" → "제주특별자치도" 처럼 줄인 이름도 하나로 정해지면 허용
+            matches = [c for name, c in codes.items() if region == name or region in name]
+            if len(set(matches)) != 1:
+                raise ValueError(f"알 수 없는 지역명: {region} (area_numbers.csv 참고)")
+            code = matches[0]
+        places = places[places['지역코드'] == code]
+    return places.reset_index(drop=True)
+
+
+# ✅ 이어하기: 오류 없이 끝난 콘텐츠ID 목록
+def completed_ids(journal_path):
+    done = set()
+    try:
+        with open(journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue   # 중단될 때 반쯤 쓰인 마지막 줄
+                if "error" not in row:
+                    done.add(row["콘텐츠ID"])
+    except OSError:
+        pass
+    return done
+
+
+# ✅ NDJSON 저널 → 관광지×맛집 한 행씩 펼친 표 (같은 관광지는 마지막 줄 기준)
+def flatten(journal_path):
+    latest = {}
+    with open(journal_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            if "error" not in row:
+                latest[row["콘텐츠ID"]] = row
+    rows = []
+    for row in latest.values():
+        base = {k: v for k, v in row.items() if k != "restaurants"}
+        for rank, restaurant in enumerate(row["restaurants"], start=1):
+            rows.append({**base, "순위": rank, **restaurant})
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="관광지별 추천 맛집 일괄 계산")
+    parser.add_argument("--places", default=TOURIST_PLACES_PATH, help="관광지 CSV 경로")
+    parser.add_argument("--region", help="지역코드 또는 지역명 (area_numbers.csv)")
+    parser.add_argument("--out", help="출력 경로 (기본: data/batch/recommendations[_지역].ndjson|parquet)")
+    parser.add_argument("--format", choices=["ndjson", "parquet"], default="ndjson")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--rate", type=float, default=10.0, help="전체 워커 합산 초당 API 요청 수 (0이면 제한 없음)")
+    parser.add_argument("--radius", type=int, default=2000)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--limit", type=int, help="앞에서부터 N곳만 처리")
+    parser.add_argument("--no-resume", action="store_true", help="이전 결과를 무시하고 처음부터")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    google_key = os.getenv("Google_key")
+    options = {
+        "offline": offline.is_offline(google_key),
+        "google_key": google_key,
+        "kakao_key": os.getenv("KAKAO_KEY"),
+        "radius": args.radius,
+        "top": args.top,
+    }
+
+    try:
+        places = select_places(args.places, args.region)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.limit:
+        places = places.head(args.limit)
+
+    suffix = f"_{args.region}" if args.region else ""
+    out = args.out or os.path.join(BATCH_DIR, f"recommendations{suffix}.{args.format}")
+    # Parquet은 이어 쓸 수 없으므로 NDJSON 저널에 흘려 쓰고 마지막에 변환한다
+    journal = out if args.format == "ndjson" else os.path.splitext(out)[0] + ".ndjson"
+    os.makedirs(os.path.dirname(journal) or ".", exist_ok=True)
+    if args.no_resume and os.path.exists(journal):
+        os.remove(journal)
+
+    done = completed_ids(journal)
+    todo = [p for p in places.to_dict("records") if p["콘텐츠ID"] not in done]
+    print(f"대상 {len(places)}곳, 완료 {len(places) - len(todo)}곳, 남은 {len(todo)}곳"
+          f"{' (오프라인)' if options['offline'] else ''}", file=sys.stderr)
+
+    failed = 0
+    start = time.perf_counter()
+    if todo:
+        limiter = RateLimiter(args.rate)
+        with open(journal, "a", encoding="utf-8") as f, \
+                mp.Pool(args.workers, initializer=_init_worker, initargs=(limiter, options)) as pool:
+            for i, record in enumerate(pool.imap_unordered(recommend, todo), start=1):
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                f.flush()
+                failed += "error" in record
+                if i % 10 == 0 or i == len(todo):
+                    print(f"  {i}/{len(todo)} ({time.perf_counter() - start:.1f}s, 오류 {failed})", file=sys.stderr)
+
+    if args.format == "parquet":
+        write_export(flatten(journal), "parquet", out)
+    print(f"저장: {out}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
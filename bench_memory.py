@@ -0,0 +1,97 @@
+import sys
+import copy
+import json
+import random
+import pickle
+import tracemalloc
+
+import pandas as pd
+
+from datasets import load_tourist_places
+from place_records import to_place_records, first_photo_ref
+
+# ✅ 세션당 메모리 사용량 비교: Text Search 원본 JSON vs PlaceRecord
+#   python bench_memory.py [검색 횟수]
+# 한 세션이 검색을 여러 번 하면서 session_state에 남기는 관광지 목록과
+# 맛집 DataFrame(사진 배열 포함 vs 첫 사진 참조만)의 크기를 잰다.
+
+
+# 실제 Text Search 응답과 같은 구조의 결과 하나
+def fake_text_search_result(row, rng):
+    lat, lng = float(row['위도']), float(row['경도'])
+    photo = {
+        "height": 3024,
+        "width": 4032,
+        "html_attributions": [f'<a href="https://maps.google.com/maps/contrib/{rng.getrandbits(64)}">{row["관광지명"]} 방문자</a>'],
+        "photo_reference": "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-") for _ in range(400)),
+    }
+    return {
+        "business_status": "OPERATIONAL",
+        "formatted_address": f"대한민국 {row['주소']}",
+        "geometry": {
+            "location": {"lat": lat, "lng": lng},
+            "viewport": {"northeast": {"lat": lat + 0.001, "lng": lng + 0.001},
+                         "southwest": {"lat": lat - 0.001, "lng": lng - 0.001}},
+        },
+        "icon": "https://maps.gstatic.com/mapfiles/place_api/icons/v1/png_71/generic_business-71.png",
+        "icon_background_color": "#7B9EB0",
+        "icon_mask_base_uri": "https://maps.gstatic.com/mapfiles/place_api/icons/v2/generic_pinlet",
+        "name": row['관광지명'],
+        "opening_hours": {"open_now": True},
+        "photos": [copy.deepcopy(photo) for _ in range(rng.randint(1, 10))],
+        "place_id": f"ChIJ{rng.getrandbits(96):024x}",
+        "plus_code": {"compound_code": "F8GF+6C 제주시 제주특별자치도", "global_code": "8Q48F8GF+6C"},
+        "rating": round(rng.uniform(3.5, 5.0), 1),
+        "reference": f"ChIJ{rng.getrandbits(96):024x}",
+        "types": ["tourist_attraction", "point_of_interest", "establishment"],
+        "user_ratings_total": rng.randint(10, 5000),
+    }
+
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    obj = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return obj, size
+
+
+def main(searches=5):
+    rng = random.Random(0)
+    places = load_tourist_places()
+    # 세션은 매번 API 응답 텍스트를 새로 파싱하므로 JSON 텍스트에서부터 잰다
+    texts = [json.dumps([fake_text_search_result(r, rng) for _, r in places.sample(20, random_state=i).iterrows()],
+                        ensure_ascii=False) for i in range(searches)]
+
+    raw, raw_bytes = measure(lambda: [json.loads(t) for t in texts])
+    compact, compact_bytes = measure(lambda: [to_place_records(json.loads(t)) for t in texts])
+
+    restaurant_text = json.dumps([{
+        '이름': p['name'], '주소': p['formatted_address'], '평점': p['rating'],
+        '위도': p['geometry']['location']['lat'], '경도': p['geometry']['location']['lng'],
+        'photos': p['photos'], '전화번호': "064-000-0000", 'place_id': p['place_id'],
+    } for p in raw[0]], ensure_ascii=False)
+
+    def compact_restaurants():
+        records = json.loads(restaurant_text)
+        for r in records:
+            r['photo_ref'] = first_photo_ref(r.pop('photos'))
+        return pd.DataFrame(records)
+
+    _, df_raw_bytes = measure(lambda: pd.DataFrame(json.loads(restaurant_text)))
+    _, df_compact_bytes = measure(compact_restaurants)
+
+    print(f"검색 {searches}회 × 20건 (session_state.places 누적)")
+    print(f"  원본 JSON      : {raw_bytes / 1024:8.1f} KB  (pickle {len(pickle.dumps(raw)) / 1024:.1f} KB)")
+    print(f"  PlaceRecord    : {compact_bytes / 1024:8.1f} KB  (pickle {len(pickle.dumps(compact)) / 1024:.1f} KB)")
+    print(f"  감소율         : {1 - compact_bytes / raw_bytes:8.1%}")
+    print("맛집 DataFrame 20건")
+    print(f"  photos 배열    : {df_raw_bytes / 1024:8.1f} KB")
+    print(f"  photo_ref 하나 : {df_compact_bytes / 1024:8.1f} KB")
+    print(f"  감소율         : {1 - df_compact_bytes / df_raw_bytes:8.1%}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
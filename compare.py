@@ -0,0 +1,71 @@
+import time
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from autocomplete import resolve_region
+from place_records import to_place_records
+from ranking import rank_places
+
+# ✅ 여러 지역 비교 검색
+# "제주, 강릉, 부산"처럼 여러 지역을 받아 정식 이름으로 확인한 뒤,
+# 지역마다 [관광지 검색 → 1위 관광지 주변 맛집 → 랭킹] 사슬을 스레드로 동시에 돌린다.
+# 외부 API 호출은 rate_limit.install()로 건 공유 속도 제한을 함께 쓰므로,
+# 지역이 늘어도 전체 시간은 가장 느린 지역 하나와 비슷하다(예산 안에서).
+MAX_REGIONS = 4
+TOP_ATTRACTIONS = 3
+TOP_RESTAURANTS = 5
+
+
+@dataclass
+class RegionResult:
+    region: str                 # 정식 이름
+    typed: str                  # 사용자가 친 이름
+    attractions: list = field(default_factory=list)     # PlaceRecord (랭킹 순)
+    anchor: object = None       # 맛집을 찾은 기준 관광지
+    restaurants: pd.DataFrame = None
+    place_count: int = 0
+    seconds: float = 0.0
+    error: str = None
+
+
+# ✅ 입력 → (정식 이름 목록, 확인 못 한 이름 목록) - 같은 지역은 한 번만
+def parse_regions(text, max_regions=MAX_REGIONS):
+    resolved, unknown = {}, []
+    for typed in (t.strip() for t in str(text).replace("vs", ",").replace("/", ",").split(",")):
+        if not typed:
+            continue
+        suggestion = resolve_region(typed)
+        if suggestion is None:
+            unknown.append(typed)
+        else:
+            resolved.setdefault(suggestion.query, typed)
+    return list(resolved.items())[:max_regions], unknown
+
+
+# ✅ 지역 하나의 검색 사슬 (워커 스레드에서 실행 - Streamlit 호출 없음)
+def run_region(region, typed, search, restaurants_for):
+    start = time.perf_counter()
+    result = RegionResult(region=region, typed=typed)
+    try:
+        places = to_place_records(search(region))
+        result.place_count = len(places)
+        result.attractions = rank_places(places, k=TOP_ATTRACTIONS)
+        anchor = next((p for p in result.attractions if p.lat is not None), None)
+        if anchor is not None:
+            result.anchor = anchor
+            result.restaurants = restaurants_for(anchor.lat, anchor.lng).head(TOP_RESTAURANTS)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+# ✅ 여러 지역 동시 실행 (입력 순서대로 돌려줌)
+def compare_regions(regions, search, restaurants_for):
+    if not regions:
+        return []
+    with ThreadPoolExecutor(max_workers=len(regions)) as pool:
+        futures = [pool.submit(run_region, region, typed, search, restaurants_for) for region, typed in regions]
+        return [f.result() for f in futures]
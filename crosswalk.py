@@ -0,0 +1,289 @@
+import os
+import re
+import sys
+import time
+import argparse
+import sqlite3
+import threading
+
+from datasets import load_tourist_places
+from federated import normalize_name, names_match
+from ranking import haversine_np
+
+# ✅ 제공자 간 장소 id 대응표 (관광공사 콘텐츠ID ↔ 구글 place_id ↔ 카카오 id)
+# 한 번 짝지은 장소는 SQLite 파일에 남겨 두고, 어느 id로든 한 번의 색인 조회로 나머지 id를 찾는다.
+# id가 아직 없는 장소는 정규화한 전화번호, 또는 가까운 거리(MATCH_DISTANCE_M)와 이름으로 기존 행에 붙인다.
+# WAL 모드라 Streamlit 세션 스레드와 일괄 작업 프로세스가 동시에 읽고 써도 된다.
+#   python crosswalk.py --seed             # tourist_places.csv 행 등록
+#   python crosswalk.py --from-cache       # 공유 캐시에 남은 구글·카카오 결과를 대응표에 붙이기
+#   python crosswalk.py --lookup ChIJ...   # 어느 id든 조회
+CROSSWALK_PATH = os.path.join("data", "cache", "crosswalk.sqlite3")
+ID_COLUMNS = ("content_id", "google_place_id", "kakao_id")
+MATCH_DISTANCE_M = 150
+PHONE_MATCH_DISTANCE_M = 2000   # 전화번호가 같아도 이보다 멀면 다른 지점
+_BOX_DEG = 0.002    # 이름 비교 후보를 고를 위경도 범위 (약 200m)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS places (
+    id INTEGER PRIMARY KEY,
+    content_id TEXT UNIQUE,
+    google_place_id TEXT UNIQUE,
+    kakao_id TEXT UNIQUE,
+    name TEXT,
+    name_key TEXT,
+    phone TEXT,
+    phone_key TEXT,
+    lat REAL,
+    lng REAL,
+    source TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS places_name_key ON places(name_key);
+CREATE INDEX IF NOT EXISTS places_phone_key ON places(phone_key);
+CREATE INDEX IF NOT EXISTS places_lat_lng ON places(lat, lng);
+"""
+
+
+# ✅ 전화번호 정규화: 숫자만, +82 → 0 ("064-123-4567", "+82 64-123-4567" → "0641234567")
+def normalize_phone(phone):
+    if phone is None or str(phone).strip() in ("", "없음", "nan", "None"):
+        return None
+    digits = re.sub(r"\D", "", str(phone))
+    if digits.startswith("82") and str(phone).strip().startswith("+"):
+        digits = "0" + digits[2:]
+    return digits if len(digits) >= 7 else None
+
+
+def _clean(value):
+    if value is None or (isinstance(value, float) and value != value) or str(value).strip() in ("", "없음"):
+        return None
+    return str(value)
+
+
+class Crosswalk:
+    def __init__(self, path=CROSSWALK_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    # ✅ 어느 id로든 조회: lookup(google_place_id="ChIJ...") → {"content_id", "google_place_id", "kakao_id", ...}
+    def lookup(self, **ids):
+        (column, value), = ids.items()
+        if column not in ID_COLUMNS:
+            raise KeyError(f"알 수 없는 id 종류입니다: {column}")
+        if _clean(value) is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(f"SELECT * FROM places WHERE {column} = ?", (str(value),)).fetchone()
+        return dict(row) if row else None
+
+    # ✅ 값만 보고 어느 id 종류인지 모를 때 (CLI·디버그용)
+    def lookup_any(self, value):
+        for column in ID_COLUMNS:
+            row = self.lookup(**{column: value})
+            if row:
+                return row
+        return None
+
+    # ✅ id 없이 찾기: 전화번호가 같으면 그 행, 아니면 가까운 곳 중 이름이 맞는 행
+    def match(self, name=None, lat=None, lng=None, phone=None, max_distance=MATCH_DISTANCE_M):
+        with self._lock:
+            return self._match(name, lat, lng, phone, max_distance)
+
+    def _match(self, name, lat, lng, phone, max_distance=MATCH_DISTANCE_M):
+        phone_key = normalize_phone(phone)
+        if phone_key:
+            rows = self._conn.execute("SELECT * FROM places WHERE phone_key = ?", (phone_key,)).fetchall()
+            # 대표번호를 여러 지점이 같이 쓰는 경우를 걸러낸다
+            rows = [r for r in rows if lat is None or r["lat"] is None
+                    or haversine_np(lat, lng, r["lat"], r["lng"]) <= PHONE_MATCH_DISTANCE_M]
+            if len(rows) == 1:
+                return dict(rows[0])
+        if name is None or lat is None or lng is None:
+            return None
+        rows = self._conn.execute(
+            "SELECT * FROM places WHERE lat BETWEEN ? AND ? AND lng BETWEEN ? AND ?",
+            (lat - _BOX_DEG, lat + _BOX_DEG, lng - _BOX_DEG, lng + _BOX_DEG)).fetchall()
+        best, best_dist = None, float("inf")
+        for r in rows:
+            dist = haversine_np(lat, lng, r["lat"], r["lng"])
+            if dist <= max_distance and dist < best_dist and names_match(name, r["name"]):
+                best, best_dist = r, dist
+        return dict(best) if best else None
+
+    # ✅ 짝 기록: 주어진 id 중 하나라도 아는 행이 있으면 합치고(여러 행이면 하나로), 없으면 전화번호·이름으로
+    # 찾아 붙이고, 그래도 없으면 새 행. 같은 id 종류에 다른 값이 오면 나중 값이 이긴다.
+    def link(self, content_id=None, google_place_id=None, kakao_id=None, name=None, phone=None,
+             lat=None, lng=None, source=None, fuzzy=True):
+        row_id, = self.link_many([dict(content_id=content_id, google_place_id=google_place_id, kakao_id=kakao_id,
+                                       name=name, phone=phone, lat=lat, lng=lng, source=source, fuzzy=fuzzy)])
+        if row_id is None:
+            return None
+        with self._lock:
+            return dict(self._conn.execute("SELECT * FROM places WHERE id = ?", (row_id,)).fetchone())
+
+    # ✅ 여러 짝을 트랜잭션 하나로 기록 (커밋·fsync 한 번) → 행 id 목록 (id가 하나도 없던 항목은 None)
+    # items: link()와 같은 키워드의 dict 목록
+    def link_many(self, items):
+        with self._lock:
+            cur = self._conn
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                row_ids = []
+                for item in items:
+                    ids = {c: _clean(item.get(c)) for c in ID_COLUMNS}
+                    ids = {c: v for c, v in ids.items() if v is not None}
+                    row_ids.append(self._link(ids, _clean(item.get("name")), _clean(item.get("phone")),
+                                              item.get("lat"), item.get("lng"), item.get("source"),
+                                              item.get("fuzzy", True)) if ids else None)
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+        return row_ids
+
+    def _link(self, ids, name, phone, lat, lng, source, fuzzy):
+        cur = self._conn
+        rows = {}
+        for column, value in ids.items():
+            row = cur.execute(f"SELECT * FROM places WHERE {column} = ?", (value,)).fetchone()
+            if row:
+                rows[row["id"]] = dict(row)
+        if not rows and fuzzy:
+            found = self._match(name, lat, lng, phone)
+            # 이미 같은 종류의 다른 id를 가진 행에는 붙이지 않는다 (지점이 다른 가게일 수 있음)
+            if found and all(found[c] in (None, v) for c, v in ids.items()):
+                rows[found["id"]] = found
+
+        ordered = sorted(rows.values(), key=lambda r: r["id"])
+        keep = ordered[0] if ordered else {}
+        merged = {c: next((r[c] for r in ordered if r[c]), None) for c in ID_COLUMNS}
+        merged.update(ids)
+        for r in ordered[1:]:
+            cur.execute("DELETE FROM places WHERE id = ?", (r["id"],))
+        # 다른 행이 가진 같은 id는 비운다 (UNIQUE, 나중 값이 이김)
+        for c, v in ids.items():
+            cur.execute(f"UPDATE places SET {c} = NULL WHERE {c} = ? AND id != ?", (v, keep.get("id", -1)))
+
+        # 이름·좌표는 처음 기록한 값을 유지 (관광지 CSV 등록은 항상 덮어씀)
+        def pick(new, column):
+            old = keep.get(column)
+            return new if old is None or (new is not None and source == "tour") else old
+
+        values = {
+            **merged,
+            "name": pick(name, "name"),
+            "phone": phone or keep.get("phone"),
+            "lat": pick(lat, "lat"),
+            "lng": pick(lng, "lng"),
+            "source": pick(source, "source"),
+            "updated_at": time.time(),
+        }
+        values["name_key"] = normalize_name(values["name"]) if values["name"] else None
+        values["phone_key"] = normalize_phone(values["phone"])
+        columns = list(values)
+        if keep:
+            cur.execute(f"UPDATE places SET {', '.join(f'{c} = ?' for c in columns)} WHERE id = ?",
+                        [values[c] for c in columns] + [keep["id"]])
+            return keep["id"]
+        return cur.execute(f"INSERT INTO places ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                           [values[c] for c in columns]).lastrowid
+
+    # ✅ 맛집 레코드(federated·최종 앱 형식) 여러 개 기록 (트랜잭션 하나)
+    def link_records(self, records, source=None):
+        return self.link_many([dict(google_place_id=r.get("google_place_id"), kakao_id=r.get("kakao_id"),
+                                    name=r.get("이름"), phone=r.get("전화번호"), lat=r.get("위도"), lng=r.get("경도"),
+                                    source=source or r.get("출처")) for r in records])
+
+    def stats(self):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) AS places, COUNT(content_id) AS content, COUNT(google_place_id) AS google, "
+                "COUNT(kakao_id) AS kakao, "
+                "SUM((content_id IS NOT NULL) + (google_place_id IS NOT NULL) + (kakao_id IS NOT NULL) >= 2) AS linked "
+                "FROM places").fetchone()
+        return dict(row)
+
+
+_instance = None
+_instance_lock = threading.Lock()
+
+
+# ✅ 프로세스마다 하나 (Streamlit 세션 스레드끼리 공유)
+# SHARED_CACHE_DISK=0 (부하 테스트 등)이면 파일 대신 메모리에만 둔다
+def crosswalk():
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            _instance = Crosswalk(CROSSWALK_PATH if os.getenv("SHARED_CACHE_DISK", "1") != "0" else ":memory:")
+        return _instance
+
+
+# ✅ tourist_places.csv 행 등록 (이미 있는 콘텐츠ID는 이름·전화번호·좌표만 갱신)
+def seed_tourist(store, places=None):
+    places = load_tourist_places() if places is None else places
+    store.link_many([dict(content_id=r['콘텐츠ID'], name=r['관광지명'], phone=r.get('전화번호'),
+                          lat=float(r['위도']), lng=float(r['경도']), source="tour", fuzzy=False)
+                     for _, r in places.iterrows()])
+    return len(places)
+
+
+# ✅ 공유 캐시에 남은 구글(textsearch·nearbycell)·카카오(kakaocategory) 결과를 대응표에 붙이기
+def link_from_cache(store):
+    from shared_cache import shared_cache
+    items = []
+    for _, namespace, _, _, value in shared_cache.iter_values(("textsearch", "textsearch_rated", "nearbycell",
+                                                                 "kakaocategory")):
+        if namespace == "kakaocategory":
+            for d in (value or {}).get("documents", []):
+                items.append(dict(kakao_id=d.get('id'), name=d.get('place_name'), phone=d.get('phone'),
+                                  lat=float(d['y']), lng=float(d['x']), source="kakao"))
+            continue
+        results = value.get("results", []) if isinstance(value, dict) else value or []
+        for r in results:
+            loc = (r.get('geometry') or {}).get('location') or {}
+            if not r.get('place_id') or 'lat' not in loc:
+                continue
+            items.append(dict(google_place_id=r['place_id'], name=r.get('name'), lat=loc['lat'], lng=loc['lng'],
+                              source="google"))
+    store.link_many(items)
+    return len(items)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="관광공사·구글·카카오 장소 id 대응표")
+    parser.add_argument("--seed", action="store_true", help="tourist_places.csv 콘텐츠ID 등록")
+    parser.add_argument("--from-cache", action="store_true", help="공유 캐시의 구글·카카오 결과를 대응표에 붙이기")
+    parser.add_argument("--lookup", help="콘텐츠ID·구글 place_id·카카오 id 중 아무거나")
+    parser.add_argument("--path", default=CROSSWALK_PATH)
+    args = parser.parse_args(argv)
+
+    store = Crosswalk(args.path)
+    if args.seed:
+        print(f"관광지 {seed_tourist(store)}곳 등록")
+    if args.from_cache:
+        print(f"캐시 결과 {link_from_cache(store)}건 반영")
+    if args.lookup:
+        row = store.lookup_any(args.lookup)
+        if row is None:
+            print("대응표에 없습니다.")
+            return 1
+        for column in ID_COLUMNS + ("name", "phone", "lat", "lng", "source"):
+            print(f"  {column:<16} {row[column]}")
+    stats = store.stats()
+    print(f"장소 {stats['places']}곳 (콘텐츠ID {stats['content']} · 구글 {stats['google']} · 카카오 {stats['kakao']}, "
+          f"두 종류 이상 연결 {stats['linked'] or 0})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+import os
+import pandas as pd
+
+# ✅ 로컬 데이터 파일 경로
+DATA_DIR = "data"
+TOURIST_PLACES_PATH = os.path.join(DATA_DIR, "tourist_places.csv")
+AREA_NUMBERS_PATH = os.path.join(DATA_DIR, "area_numbers.csv")
+CATEGORY_CODES_PATH = os.path.join(DATA_DIR, "category_codes.csv")
+FOOD_CSV_PATH = os.path.join(DATA_DIR, "전국맛집.csv")
+FOOD_PARQUET_PATH = os.path.join(DATA_DIR, "전국맛집.parquet")
+FOOD_COLUMNS = ['지역', '도시명', '음식종류', '대표메뉴', '식당상호', '포털 검색명', '추천사유']
+
+# ✅ 관광지코드 (KorService2 contenttypeid)
+CONTENT_TYPES = {
+    12: "관광지",
+    14: "문화시설",
+    15: "축제공연행사",
+    25: "여행코스",
+    28: "레포츠",
+    32: "숙박",
+    38: "쇼핑",
+    39: "음식점",
+}
+
+# ✅ 관광지 CSV 불러오기 (좌표는 숫자, 코드는 문자열로 통일)
+def load_tourist_places(path=TOURIST_PLACES_PATH):
+    df = pd.read_csv(path, encoding="utf-8-sig", dtype={'콘텐츠ID': str, '카테고리': str, '전화번호': str})
+    df['위도'] = pd.to_numeric(df['위도'], errors='coerce')
+    df['경도'] = pd.to_numeric(df['경도'], errors='coerce')
+    df = df.dropna(subset=['위도', '경도'])
+    return df.reset_index(drop=True)
+
+# ✅ 지역명-지역코드 표 불러오기
+def load_area_numbers(path=AREA_NUMBERS_PATH):
+    return pd.read_csv(path, encoding="utf-8-sig")
+
+# ✅ 관광공사 분류 코드표 (대분류 A01 → 중분류 A0101 → 소분류 A01010100)
+def load_category_codes(path=CATEGORY_CODES_PATH):
+    df = pd.read_csv(path, encoding="utf-8-sig", dtype=str)
+    return dict(zip(df['코드'], df['이름']))
+
+# ✅ 전국맛집 원본 경로 (ingest_food.py가 만든 Parquet 우선)
+def food_places_path():
+    return FOOD_PARQUET_PATH if os.path.exists(FOOD_PARQUET_PATH) else FOOD_CSV_PATH
+
+# ✅ 전국맛집 불러오기
+# CSV는 예전 형식("Unnamed: 0.." 줄 아래에 진짜 헤더)도 읽을 수 있게 헤더 줄을 찾아서 사용
+def load_food_places(path=None):
+    path = path or food_places_path()
+    if path.endswith(".parquet"):
+        try:
+            return pd.read_parquet(path)
+        except ImportError:
+            path = FOOD_CSV_PATH
+    raw = pd.read_csv(path, encoding="utf-8-sig", header=None, dtype=str)
+    header_rows = raw.index[raw.iloc[:, 0].str.strip() == FOOD_COLUMNS[0]]
+    start = header_rows[0] + 1 if len(header_rows) else 0
+    df = raw.iloc[start:, :len(FOOD_COLUMNS)].copy()
+    df.columns = FOOD_COLUMNS
+    for col in FOOD_COLUMNS:
+        df[col] = df[col].str.strip()
+    return df.dropna(subset=['지역', '식당상호']).reset_index(drop=True)
@@ -0,0 +1,45 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# ✅ 지연 예산(deadline) 안에서 병렬 작업 받기
+# 예산 안에 끝난 결과만 바로 돌려주고(못 끝낸 칸은 None), 남은 작업은 버리지 않고 백그라운드에서 끝까지 돌린다.
+# 다 끝나면 on_complete(전체 결과)를 한 번 부른다 - 보통 완성된 결과를 캐시에 넣어 다음 요청을 데우는 데 쓴다.
+# 실패한 작업도 None으로 채운다 (예산 안의 응답을 오류 하나 때문에 버리지 않는다).
+
+
+# ✅ 결과 목록 + 예산 안에 못 채운 필드 보고 (list 그대로 쓸 수 있음)
+class PartialResult(list):
+    def __init__(self, items=(), degraded=None, pending=0, budget=None):
+        super().__init__(items)
+        self.degraded = degraded or {}     # 필드 → 못 채운 항목 이름들
+        self.pending = pending             # 예산이 끝날 때 아직 진행 중이던 작업 수
+        self.budget = budget
+
+
+def map_within(fn, items, budget, max_workers=8, on_complete=None):
+    items = list(items)
+    if not items:
+        if on_complete is not None:
+            on_complete([])
+        return [], 0
+    pool = ThreadPoolExecutor(max_workers=min(max_workers, len(items)), thread_name_prefix="deadline")
+    futures = [pool.submit(fn, item) for item in items]
+    done, pending = wait(futures, timeout=max(budget, 0))
+    # 대기만 그만두고 작업은 취소하지 않는다
+    pool.shutdown(wait=False)
+    results = [_result(f) if f in done else None for f in futures]
+
+    if on_complete is not None:
+        def finish():
+            wait(futures)
+            on_complete([_result(f) for f in futures])
+
+        if pending:
+            threading.Thread(target=finish, name="deadline-finish", daemon=True).start()
+        else:
+            finish()
+    return results, len(pending)
+
+
+def _result(future):
+    return future.result() if future.exception() is None else None
@@ -0,0 +1,169 @@
+import os
+import json
+import math
+import functools
+
+import numpy as np
+
+from spatial_index import M_PER_DEG
+
+# ✅ 육각 격자 밀도 집계 (지도 히트맵 오버레이용)
+# 점(관광지·맛집)을 여러 크기의 육각형 칸에 미리 세어 두고, 지도가 멀리 보일 때는
+# 점 대신 화면 안 칸의 (중심, 개수)만 보낸다. 한 화면 칸 수는 줌 레벨과 상관없이 수백 개 이하.
+# 점마다 id를 기억해 두므로 데이터가 늘거나 줄면 바뀐 점만 더하고 뺀다 (파일에 저장).
+DENSITY_PATH = os.path.join("data", "cache", "density.json")
+REF_LAT = 36.0              # 한반도 가운데 - 경도 방향 거리 환산 기준 (칸 모양이 전국에서 같게)
+HEX_SIZES_M = (500, 1000, 2000, 4000, 8000, 16000)    # 육각형 중심 → 꼭짓점 거리
+MIN_LEVEL = 6               # 카카오 줌 레벨 6(약 1km 축척) 이상이면 오버레이로 전환
+MAX_CELLS = 600
+
+_M_PER_DEG_LNG = M_PER_DEG * math.cos(math.radians(REF_LAT))
+
+
+# ✅ 줌 레벨 → 육각형 크기 (레벨이 하나 오를 때마다 두 배)
+def hex_size_for_level(level):
+    i = min(max(level - MIN_LEVEL, 0), len(HEX_SIZES_M) - 1)
+    return HEX_SIZES_M[i]
+
+
+# ✅ 좌표 → 육각형 칸 (pointy-top axial 좌표 q, r)
+def hex_bin(lats, lngs, size):
+    x = np.asarray(lngs, dtype=float) * _M_PER_DEG_LNG / size
+    y = np.asarray(lats, dtype=float) * M_PER_DEG / size
+    q = (math.sqrt(3) / 3) * x - y / 3
+    r = (2 / 3) * y
+    # cube 좌표 반올림 (세 값의 합이 0이 되도록 오차가 가장 큰 축을 고친다)
+    s = -q - r
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+    return rq.astype(np.int64), rr.astype(np.int64)
+
+
+def hex_center(q, r, size):
+    x = size * math.sqrt(3) * (q + r / 2)
+    y = size * 1.5 * r
+    return y / M_PER_DEG, x / _M_PER_DEG_LNG
+
+
+class DensityGrid:
+    def __init__(self, sizes=HEX_SIZES_M):
+        self.sizes = tuple(sizes)
+        self.counts = {}    # (레이어, 크기) → {(q, r): 개수}
+        self.points = {}    # 레이어 → {id: [위도, 경도]}
+
+    def _update(self, layer, lats, lngs, sign):
+        if not len(lats):
+            return
+        for size in self.sizes:
+            q, r = hex_bin(lats, lngs, size)
+            keys, n = np.unique(np.stack([q, r], axis=1), axis=0, return_counts=True)
+            cells = self.counts.setdefault((layer, size), {})
+            for (cq, cr), c in zip(keys.tolist(), n.tolist()):
+                value = cells.get((cq, cr), 0) + sign * c
+                if value > 0:
+                    cells[(cq, cr)] = value
+                else:
+                    cells.pop((cq, cr), None)
+
+    # ✅ 증분 동기화: 새 id는 더하고, 없어진 id나 좌표가 바뀐 id는 뺀다 → 바뀐 점 수
+    def sync(self, layer, ids, lats, lngs):
+        current = {str(i): [float(a), float(b)] for i, a, b in zip(ids, lats, lngs)
+                   if not (math.isnan(a) or math.isnan(b))}
+        known = self.points.setdefault(layer, {})
+        removed = [p for i, p in known.items() if current.get(i) != p]
+        added = [p for i, p in current.items() if known.get(i) != p]
+        if removed:
+            self._update(layer, np.array([p[0] for p in removed]), np.array([p[1] for p in removed]), -1)
+        if added:
+            self._update(layer, np.array([p[0] for p in added]), np.array([p[1] for p in added]), 1)
+        self.points[layer] = current
+        return len(added) + len(removed)
+
+    # ✅ 화면 범위 안 칸들 → [[중심 위도, 중심 경도, 개수], ...] (많으면 개수 큰 순 MAX_CELLS개)
+    def cells_in_view(self, layer, bounds, level, max_cells=MAX_CELLS):
+        size = hex_size_for_level(level)
+        cells = self.counts.get((layer, size), {})
+        south, west, north, east = bounds
+        pad_lat, pad_lng = size / M_PER_DEG, size / _M_PER_DEG_LNG
+        # 화면을 덮는 (q, r) 범위가 저장된 칸 수보다 작으면 범위를 돌고, 아니면 저장된 칸을 훑는다
+        x0, x1 = west * _M_PER_DEG_LNG / size, east * _M_PER_DEG_LNG / size
+        r0, r1 = math.floor(south * M_PER_DEG / size / 1.5) - 1, math.ceil(north * M_PER_DEG / size / 1.5) + 1
+        q_span = math.ceil((x1 - x0) / math.sqrt(3)) + 3
+        if (r1 - r0 + 1) * q_span < len(cells):
+            candidates = (((q, r), cells[(q, r)]) for r in range(r0, r1 + 1)
+                          for q in range(math.floor(x0 / math.sqrt(3) - r / 2) - 1,
+                                         math.floor(x0 / math.sqrt(3) - r / 2) - 1 + q_span)
+                          if (q, r) in cells)
+        else:
+            candidates = cells.items()
+        found = []
+        for (q, r), n in candidates:
+            lat, lng = hex_center(q, r, size)
+            if south - pad_lat <= lat <= north + pad_lat and west - pad_lng <= lng <= east + pad_lng:
+                found.append([round(lat, 5), round(lng, 5), n])
+        if len(found) > max_cells:
+            found.sort(key=lambda c: -c[2])
+            found = found[:max_cells]
+        return found, size
+
+    def to_dict(self):
+        return {
+            "sizes": list(self.sizes),
+            "points": self.points,
+            "counts": [[layer, size, [[q, r, n] for (q, r), n in cells.items()]]
+                       for (layer, size), cells in self.counts.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        grid = cls(data["sizes"])
+        grid.points = data["points"]
+        grid.counts = {(layer, size): {(q, r): n for q, r, n in cells} for layer, size, cells in data["counts"]}
+        return grid
+
+
+# 육각형 꼭짓점을 그릴 때 쓰는 크기 (위도·경도 방향 도 단위)
+def hex_size_deg(size):
+    return [size / M_PER_DEG, size / _M_PER_DEG_LNG]
+
+
+def load_grid(path=DENSITY_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if tuple(data["sizes"]) == HEX_SIZES_M:
+            return DensityGrid.from_dict(data)
+    except (OSError, ValueError, KeyError):
+        pass
+    return DensityGrid()
+
+
+def save_grid(grid, path=DENSITY_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(grid.to_dict(), f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+# ✅ 관광지 CSV + 로컬 맛집 풀로 저장된 격자를 맞추고, 바뀐 점이 있을 때만 다시 저장
+def sync_grid(grid, places, restaurants):
+    changed = grid.sync("tour", "kto:" + places['콘텐츠ID'].astype(str), places['위도'], places['경도'])
+    rest_ids = restaurants['place_id'].where(restaurants['place_id'].notna(),
+                                             restaurants['이름'].astype(str) + "@" + restaurants['위도'].astype(str))
+    changed += grid.sync("food", rest_ids, restaurants['위도'], restaurants['경도'])
+    return changed
+
+
+@functools.lru_cache(maxsize=1)
+def density_grid():
+    from near_me import near_me_index
+    index = near_me_index()
+    grid = load_grid()
+    if sync_grid(grid, index.places, index.restaurants):
+        save_grid(grid)
+    return grid
@@ -0,0 +1,133 @@
+import io
+import json
+from xml.sax.saxutils import escape
+
+import pandas as pd
+
+# ✅ 내보내기 형식: (MIME, 확장자)
+FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+    "geojson": ("application/geo+json", ".geojson"),
+    "kml": ("application/vnd.google-earth.kml+xml", ".kml"),
+}
+CHUNK_ROWS = 5000
+
+
+# ✅ DataFrame 하나 또는 DataFrame 조각 묶음을 같은 방식으로 순회
+def _iter_frames(data, chunk_rows):
+    if isinstance(data, pd.DataFrame):
+        for start in range(0, max(len(data), 1), chunk_rows):
+            yield data.iloc[start:start + chunk_rows]
+    else:
+        yield from data
+
+
+def iter_csv(data, chunk_rows=CHUNK_ROWS):
+    header = True
+    for frame in _iter_frames(data, chunk_rows):
+        text = frame.to_csv(index=False, header=header)
+        # 첫 조각에만 BOM을 붙여야 엑셀에서 한글이 깨지지 않는다
+        yield text.encode("utf-8-sig" if header else "utf-8")
+        header = False
+
+
+def _properties(row, lat_col, lng_col):
+    return {k: (None if pd.isna(v) else v.item() if hasattr(v, "item") else v)
+            for k, v in row.items() if k not in (lat_col, lng_col)}
+
+
+def iter_geojson(data, chunk_rows=CHUNK_ROWS, lat_col='위도', lng_col='경도'):
+    yield b'{"type":"FeatureCollection","features":['
+    first = True
+    for frame in _iter_frames(data, chunk_rows):
+        frame = frame.dropna(subset=[lat_col, lng_col])
+        features = []
+        for _, row in frame.iterrows():
+            features.append(json.dumps({
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [float(row[lng_col]), float(row[lat_col])]},
+                "properties": _properties(row, lat_col, lng_col),
+            }, ensure_ascii=False, default=str))
+        if features:
+            yield (("" if first else ",") + ",".join(features)).encode("utf-8")
+            first = False
+    yield b"]}"
+
+
+def iter_kml(data, chunk_rows=CHUNK_ROWS, lat_col='위도', lng_col='경도', name_col=None, title="MatTour"):
+    yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+           '<kml xmlns="http://www.opengis.net/kml/2.2"><Document>'
+           f'<name>{escape(title)}</name>\n').encode("utf-8")
+    for frame in _iter_frames(data, chunk_rows):
+        frame = frame.dropna(subset=[lat_col, lng_col])
+        col = name_col or ('이름' if '이름' in frame else '관광지명' if '관광지명' in frame else None)
+        parts = []
+        for _, row in frame.iterrows():
+            name = escape(str(row[col])) if col else ""
+            extra = "".join(
+                f'<Data name="{escape(str(k))}"><value>{escape(str(v))}</value></Data>'
+                for k, v in _properties(row, lat_col, lng_col).items() if k != col and v is not None
+            )
+            parts.append(f"<Placemark><name>{name}</name><ExtendedData>{extra}</ExtendedData>"
+                         f"<Point><coordinates>{float(row[lng_col])},{float(row[lat_col])}</coordinates></Point></Placemark>\n")
+        if parts:
+            yield "".join(parts).encode("utf-8")
+    yield b"</Document></kml>\n"
+
+
+# ✅ Parquet: 조각마다 row group 하나씩 쓰고, 쓰인 바이트를 바로 내보낸다
+def iter_parquet(data, chunk_rows=CHUNK_ROWS):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet 내보내기에는 pyarrow가 필요합니다 (pip install pyarrow)")
+
+    sink = io.BytesIO()
+    writer = None
+    for frame in _iter_frames(data, chunk_rows):
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        writer.write_table(table.cast(writer.schema))
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+    if writer is not None:
+        writer.close()
+    yield sink.getvalue()
+
+
+_WRITERS = {"csv": iter_csv, "parquet": iter_parquet, "geojson": iter_geojson, "kml": iter_kml}
+
+
+def iter_export(data, fmt, chunk_rows=CHUNK_ROWS, **kwargs):
+    if fmt not in _WRITERS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt} (가능: {', '.join(FORMATS)})")
+    for chunk in _WRITERS[fmt](data, chunk_rows=chunk_rows, **kwargs):
+        if chunk:
+            yield chunk
+
+
+# ✅ 다운로드 버튼용: 버튼을 눌렀을 때만 호출되도록 함수로 넘긴다
+def build_export(data, fmt, **kwargs):
+    return b"".join(iter_export(data, fmt, **kwargs))
+
+
+# ✅ 지역 단위 대용량 내보내기: 조각별로 파일에 바로 기록 (전체 바이트열을 메모리에 만들지 않음)
+def write_export(data, fmt, path, **kwargs):
+    written = 0
+    with open(path, "wb") as f:
+        for chunk in iter_export(data, fmt, **kwargs):
+            f.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def export_file_name(base, fmt):
+    return f"{base}{FORMATS[fmt][1]}"
+
+
+def export_mime(fmt):
+    return FORMATS[fmt][0]
@@ -0,0 +1,109 @@
+import functools
+
+import numpy as np
+import pandas as pd
+
+from datasets import CONTENT_TYPES, load_area_numbers, load_category_codes, load_tourist_places
+
+# ✅ 관광지 분류 패싯 (비트셋 인덱스)
+# 지역코드·관광지코드·카테고리 값마다 "그 값을 가진 행" 비트셋(파이썬 정수)을 미리 만들어 두고,
+# 필터 조합은 같은 패싯 안에서는 OR, 패싯끼리는 AND 비트 연산으로 계산한다.
+# 카테고리는 대분류 A05 → 중분류 A0502 → 소분류 A05020100 앞부분마다 비트셋을 따로 두어
+# 어느 단계로 골라도 하위 분류가 모두 포함된다. 개수는 bit_count() 한 번이라 전국 데이터도 수 μs.
+FACETS = ("지역코드", "관광지코드", "카테고리")
+CATEGORY = "카테고리"
+CATEGORY_LEVELS = (3, 5, 9)     # 대분류 / 중분류 / 소분류 코드 길이
+
+
+def _key(value):
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def category_prefixes(code):
+    return [code[:n] for n in CATEGORY_LEVELS if len(code) >= n]
+
+
+def _bitset(mask):
+    # 불리언 배열 → 정수 비트셋 (행 i = 비트 i)
+    return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+
+
+class FacetIndex:
+    def __init__(self, df, facets=FACETS, labels=None):
+        self.df = df.reset_index(drop=True)
+        self.size = len(self.df)
+        self.facets = tuple(facets)
+        self.labels = labels or {}
+        self.bits = {}
+        for facet in self.facets:
+            keys = self.df[facet].map(lambda v: None if pd.isna(v) else _key(v))
+            bits = {}
+            for value, rows in keys.groupby(keys).groups.items():
+                mask = np.zeros(self.size, dtype=bool)
+                mask[rows] = True
+                for key in (category_prefixes(value) if facet == CATEGORY else [value]):
+                    bits[key] = bits.get(key, 0) | _bitset(mask)
+            self.bits[facet] = bits
+
+    # ✅ 필터 → 비트셋: index.select(지역코드=39, 관광지코드=[12, 14], 카테고리="A01")
+    def select(self, **selections):
+        result = (1 << self.size) - 1
+        for facet, values in selections.items():
+            if facet not in self.bits:
+                raise KeyError(f"패싯이 없습니다: {facet}")
+            if values is None or (isinstance(values, (list, tuple, set)) and not values):
+                continue
+            values = values if isinstance(values, (list, tuple, set)) else [values]
+            chosen = 0
+            for value in values:
+                chosen |= self.bits[facet].get(_key(value), 0)
+            result &= chosen
+        return result
+
+    def count(self, **selections):
+        return self.select(**selections).bit_count()
+
+    # ✅ 패싯별 개수: 자기 패싯의 선택은 빼고 나머지 선택 아래에서 센다 (다른 값으로 바꿨을 때 개수)
+    # 카테고리는 parent 바로 아래 단계만 (parent=None이면 대분류)
+    def facet_counts(self, facet, parent=None, **selections):
+        selections = {f: v for f, v in selections.items() if f != facet}
+        base = self.select(**selections)
+        keys = self.bits[facet]
+        if facet == CATEGORY:
+            level = next((n for n in CATEGORY_LEVELS if n > len(parent or "")), None)
+            keys = {k: b for k, b in keys.items() if len(k) == level and k.startswith(parent or "")}
+        counts = {k: (b & base).bit_count() for k, b in keys.items()}
+        series = pd.Series({k: n for k, n in counts.items() if n}, name="count", dtype="int64")
+        series.index.name = facet
+        return series.sort_values(ascending=False, kind="stable")
+
+    def rows(self, bitset):
+        raw = np.frombuffer(bitset.to_bytes((self.size + 7) // 8, "little"), dtype=np.uint8)
+        return np.flatnonzero(np.unpackbits(raw, bitorder="little")[:self.size])
+
+    def mask(self, **selections):
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.rows(self.select(**selections))] = True
+        return mask
+
+    def frame(self, **selections):
+        return self.df.iloc[self.rows(self.select(**selections))]
+
+    def label(self, facet, key):
+        return self.labels.get(facet, {}).get(_key(key), _key(key))
+
+
+def facet_labels():
+    areas = load_area_numbers()
+    return {
+        "지역코드": {_key(c): n for c, n in zip(areas['지역코드'], areas['지역명'])},
+        "관광지코드": {_key(c): n for c, n in CONTENT_TYPES.items()},
+        CATEGORY: load_category_codes(),
+    }
+
+
+@functools.lru_cache(maxsize=1)
+def tourist_facets():
+    return FacetIndex(load_tourist_places(), labels=facet_labels())
@@ -0,0 +1,173 @@
+import re
+from difflib import SequenceMatcher
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from nearby_cells import nearby_search, cached_nearby_search, REQUEST_TIMEOUT
+from place_records import first_photo_ref
+from ranking import haversine_np
+from shared_cache import cached
+
+# ✅ 구글 + 카카오 연합 주변 맛집 검색
+# 구글 nearbysearch(격자 칸)와 카카오 카테고리 검색(FD6, 1..3 페이지)을 동시에 부르고,
+# 위치(MATCH_DISTANCE_M 이내)와 이름이 맞는 후보를 한 레코드로 합쳐 양쪽 id를 함께 붙인다.
+KAKAO_CATEGORY_URL = "https://dapi.kakao.com/v2/local/search/category.json"
+KAKAO_PAGES = 3
+KAKAO_PAGE_SIZE = 15
+MATCH_DISTANCE_M = 100
+NAME_SIMILARITY = 0.6
+
+
+# ✅ 이름 비교용 정규화 (공백·기호 제거, 소문자)
+def normalize_name(name):
+    return re.sub(r"[^가-힣A-Za-z0-9]", "", str(name or "")).lower()
+
+
+def names_match(a, b):
+    a, b = normalize_name(a), normalize_name(b)
+    if not a or not b:
+        return False
+    # "꿉자" ↔ "꿉자 애월점" 처럼 지점명이 붙은 경우
+    if a in b or b in a:
+        return True
+    return SequenceMatcher(None, a, b).ratio() >= NAME_SIMILARITY
+
+
+# ✅ 카카오 카테고리 검색 한 페이지 (오류면 None → 캐시하지 않음)
+@cached("kakaocategory", ignore=("kakao_key", "timeout"))
+def fetch_kakao_page(lat, lng, radius, page, kakao_key, category="FD6", timeout=None):
+    headers = {"Authorization": f"KakaoAK {kakao_key}"}
+    params = {
+        "category_group_code": category,
+        "x": lng,
+        "y": lat,
+        "radius": radius,
+        "page": page,
+        "size": KAKAO_PAGE_SIZE,
+        "sort": "distance"
+    }
+    try:
+        res = requests.get(KAKAO_CATEGORY_URL, headers=headers, params=params, timeout=timeout or REQUEST_TIMEOUT)
+    except requests.RequestException:
+        return None
+    if res.status_code != 200:
+        return None
+    body = res.json()
+    documents = [{k: d.get(k) for k in ("id", "place_name", "road_address_name", "address_name",
+                                         "phone", "x", "y", "category_name", "place_url")}
+                 for d in body.get("documents", [])]
+    return {"documents": documents, "is_end": body.get("meta", {}).get("is_end", True)}
+
+
+def _google_record(r):
+    loc = r['geometry']['location']
+    return {
+        "이름": r.get('name'),
+        "주소": r.get('vicinity'),
+        "평점": r.get('rating'),
+        "리뷰수": r.get('user_ratings_total', 0),
+        "위도": loc['lat'],
+        "경도": loc['lng'],
+        "전화번호": "없음",
+        "photo_ref": first_photo_ref(r.get('photos')),
+        "google_place_id": r.get('place_id'),
+        "kakao_id": None,
+        "출처": "google",
+    }
+
+
+def _kakao_record(d):
+    return {
+        "이름": d.get('place_name'),
+        "주소": d.get('road_address_name') or d.get('address_name') or "",
+        "평점": None,
+        "리뷰수": 0,
+        "위도": float(d['y']),
+        "경도": float(d['x']),
+        "전화번호": d.get('phone') or "없음",
+        "photo_ref": None,
+        "google_place_id": None,
+        "kakao_id": d.get('id'),
+        "출처": "kakao",
+    }
+
+
+# ✅ 카카오 페이지들을 순서대로 이어 붙이기 (is_end 이후 페이지는 버림)
+def _kakao_documents(pages):
+    documents = []
+    for page in pages:
+        if not page:
+            break
+        documents += page["documents"]
+        if page["is_end"]:
+            break
+    return documents
+
+
+# ✅ 두 제공자 결과 합치기: 카카오 후보마다 가까운 구글 후보 중 이름이 맞는 것에 붙인다
+def merge_candidates(google_results, kakao_documents, match_distance=MATCH_DISTANCE_M):
+    records = [_google_record(r) for r in google_results]
+    if records:
+        lats = np.array([r["위도"] for r in records], dtype=float)
+        lngs = np.array([r["경도"] for r in records], dtype=float)
+    matched = set()
+    seen_kakao = set()
+    for d in kakao_documents:
+        if d.get('id') in seen_kakao:
+            continue
+        seen_kakao.add(d.get('id'))
+        k = _kakao_record(d)
+        target = None
+        if records:
+            dist = haversine_np(k["위도"], k["경도"], lats, lngs)
+            for i in np.argsort(dist, kind="stable"):
+                if dist[i] > match_distance:
+                    break
+                if i not in matched and names_match(records[i]["이름"], k["이름"]):
+                    target = int(i)
+                    break
+        if target is None:
+            records.append(k)
+            continue
+        matched.add(target)
+        record = records[target]
+        record["kakao_id"] = k["kakao_id"]
+        record["출처"] = "google+kakao"
+        if record["전화번호"] == "없음":
+            record["전화번호"] = k["전화번호"]
+    return records
+
+
+# ✅ 연합 검색: 구글 칸들과 카카오 페이지들을 한꺼번에 동시 요청
+def federated_nearby(lat, lng, radius, google_key, kakao_key=None, pages=KAKAO_PAGES, timeout=None):
+    with ThreadPoolExecutor(max_workers=1 + pages) as pool:
+        google = pool.submit(nearby_search, lat, lng, radius, google_key, timeout=timeout) if google_key else None
+        kakao = [pool.submit(fetch_kakao_page, lat, lng, radius, page, kakao_key, timeout=timeout)
+                 for page in range(1, pages + 1)] if kakao_key else []
+        google_results = google.result() if google else []
+        kakao_pages = [f.result() for f in kakao]
+    return merge_candidates(google_results, _kakao_documents(kakao_pages))
+
+
+# ✅ 캐시에 이미 있는 칸·페이지만으로 연합 검색 (API 없음, 지연 예산이 끝났을 때)
+# → (후보, 빠진 제공자 목록) - 아직 받지 못한 구글 칸이나 카카오 페이지가 있으면 그 제공자가 빠진 것
+def cached_federated_nearby(lat, lng, radius, google_key, kakao_key=None, pages=KAKAO_PAGES):
+    missing = []
+    google_results = []
+    if google_key:
+        google_results, missing_cells = cached_nearby_search(lat, lng, radius, google_key)
+        if missing_cells:
+            missing.append("google")
+    kakao_pages = []
+    if kakao_key:
+        for page in range(1, pages + 1):
+            value = fetch_kakao_page.peek(lat, lng, radius, page, kakao_key)
+            if value is None:
+                missing.append("kakao")
+                break
+            kakao_pages.append(value)
+            if value["is_end"]:
+                break
+    return merge_candidates(google_results, _kakao_documents(kakao_pages)), missing
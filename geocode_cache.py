@@ -0,0 +1,122 @@
+import os
+import re
+import json
+import time
+import atexit
+import threading
+import requests
+import pandas as pd
+
+# ✅ 지오코딩 캐시 파일 위치 (정규화 주소 → [위도, 경도])
+CACHE_PATH = os.path.join("data", "cache", "geocode.json")
+# 새 좌표는 바로 파일에 쓰지 않고 모았다가 SAVE_INTERVAL초마다(또는 SAVE_EVERY개가 쌓이면) 한 번에 저장
+# (미스마다 JSON 전체를 다시 쓰면 캐시가 커질수록 일괄 지오코딩이 느려진다)
+SAVE_INTERVAL = 30
+SAVE_EVERY = 200
+
+_cache = None
+_lock = threading.Lock()
+_unsaved = 0
+_last_save = time.monotonic()
+
+# ✅ 주소 정규화 (국가 접두어·괄호·쉼표·중복 공백 제거)
+def normalize_address(address):
+    if address is None or (pd.api.types.is_scalar(address) and pd.isna(address)):
+        return ""
+    text = str(address).strip()
+    text = re.sub(r'^(대한민국|South Korea|KR),?\s*', '', text)
+    text = re.sub(r'[(),/]', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip().lower()
+
+def _load():
+    global _cache
+    if _cache is None:
+        try:
+            with open(CACHE_PATH, encoding="utf-8") as f:
+                _cache = json.load(f)
+        except (OSError, ValueError):
+            _cache = {}
+    return _cache
+
+def _save():
+    global _unsaved, _last_save
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    tmp_path = CACHE_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(_cache, f, ensure_ascii=False)
+    os.replace(tmp_path, CACHE_PATH)
+    _unsaved, _last_save = 0, time.monotonic()
+
+# ✅ 모아 둔 새 좌표 저장 (일괄 작업이 끝날 때·프로세스 종료 시)
+def flush():
+    with _lock:
+        if _unsaved:
+            _save()
+
+atexit.register(flush)
+
+# ✅ Text Search 결과(또는 PlaceRecord)에 이미 들어있는 좌표 꺼내기 (없으면 None, None)
+def place_lat_lng(place):
+    if hasattr(place, 'lat'):
+        return (place.lat, place.lng) if place.lat is not None else (None, None)
+    location = (place or {}).get('geometry', {}).get('location', {})
+    if 'lat' in location and 'lng' in location:
+        return location['lat'], location['lng']
+    return None, None
+
+# ✅ 캐시 조회만 (API 호출 없음)
+def get_cached_lat_lng(address):
+    key = normalize_address(address)
+    with _lock:
+        hit = _load().get(key)
+    if hit is None:
+        return None
+    return tuple(hit)
+
+# ✅ 구글 지오코딩 (캐시 우선, 실패 결과도 캐시해서 같은 주소를 다시 묻지 않음)
+def geocode(address, api_key):
+    key = normalize_address(address)
+    if not key:
+        return None, None
+
+    with _lock:
+        hit = _load().get(key)
+    if hit is not None:
+        return tuple(hit)
+
+    url = "https://maps.googleapis.com/maps/api/geocode/json"
+    params = {'address': address, 'language': 'ko', 'key': api_key}
+    res = requests.get(url, params=params).json()
+    if res.get('status') == 'OK' and res['results']:
+        loc = res['results'][0]['geometry']['location']
+        lat_lng = [loc['lat'], loc['lng']]
+    elif res.get('status') == 'ZERO_RESULTS':
+        lat_lng = [None, None]
+    else:
+        # 키 오류·쿼터 초과 등 일시적인 실패는 캐시하지 않음
+        return None, None
+
+    global _unsaved
+    with _lock:
+        _load()[key] = lat_lng
+        _unsaved += 1
+        if _unsaved >= SAVE_EVERY or time.monotonic() - _last_save >= SAVE_INTERVAL:
+            _save()
+    return tuple(lat_lng)
+
+# ✅ 데이터프레임 일괄 지오코딩 (전국맛집 '포털 검색명' 등 자유 텍스트 열)
+# 정규화 주소가 같은 행은 한 번만 조회하고, 새 좌표는 끝날 때 한 번에 저장한다.
+def geocode_dataframe(df, column, api_key):
+    df = df.copy()
+    keys = df[column].map(normalize_address)
+    resolved = {}
+    try:
+        for key, address in zip(keys, df[column]):
+            if key and key not in resolved:
+                resolved[key] = geocode(address, api_key)
+    finally:
+        flush()
+    df['위도'] = keys.map(lambda k: resolved.get(k, (None, None))[0])
+    df['경도'] = keys.map(lambda k: resolved.get(k, (None, None))[1])
+    return df
@@ -0,0 +1,118 @@
+import os
+import sys
+import json
+import hashlib
+import argparse
+
+import pandas as pd
+
+from datasets import DATA_DIR, FOOD_COLUMNS, FOOD_CSV_PATH, FOOD_PARQUET_PATH
+
+# ✅ 전국맛집.xlsx → 정리된 CSV + Parquet 변환
+# 원본 해시가 이전 변환과 같으면 엑셀을 다시 읽지 않는다.
+FOOD_XLSX_PATH = os.path.join(DATA_DIR, "전국맛집.xlsx")
+MANIFEST_PATH = os.path.join(DATA_DIR, "전국맛집.manifest.json")
+CATEGORY_COLUMNS = ['지역', '도시명', '음식종류']
+REQUIRED_COLUMNS = ['지역', '도시명', '식당상호']
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ✅ 헤더 줄 자동 탐지: 기대 열 이름이 가장 많이 들어있는 줄
+def detect_header_row(raw, expected=FOOD_COLUMNS, scan_rows=30, min_matches=None):
+    min_matches = min_matches or (len(expected) + 1) // 2
+    expected = set(expected)
+    best_row, best_hits = None, 0
+    for i, row in raw.head(scan_rows).iterrows():
+        hits = sum(str(v).strip() in expected for v in row.values if pd.notna(v))
+        if hits > best_hits:
+            best_row, best_hits = i, hits
+    if best_row is None or best_hits < min_matches:
+        raise SchemaError(f"헤더 줄을 찾지 못했습니다 (기대 열: {', '.join(sorted(expected))})")
+    return best_row
+
+
+# ✅ 스키마 검증 + 타입 정리 (범주형 열은 category)
+def validate(df):
+    missing = [c for c in FOOD_COLUMNS if c not in df.columns]
+    if missing:
+        raise SchemaError(f"필수 열이 없습니다: {', '.join(missing)}")
+    df = df[FOOD_COLUMNS].copy()
+    for col in FOOD_COLUMNS:
+        df[col] = df[col].astype("string").str.strip()
+    df = df.dropna(how="all")
+    empty = df[REQUIRED_COLUMNS].isna().any(axis=1)
+    if empty.any():
+        rows = ", ".join(str(i) for i in df.index[empty][:5])
+        raise SchemaError(f"{int(empty.sum())}개 행에 지역/도시명/식당상호가 비어 있습니다 (예: {rows})")
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype("category")
+    return df.reset_index(drop=True)
+
+
+def read_source(path=FOOD_XLSX_PATH):
+    raw = pd.read_excel(path, header=None, dtype=str)
+    header_row = detect_header_row(raw)
+    df = raw.iloc[header_row + 1:].copy()
+    df.columns = [str(c).strip() for c in raw.iloc[header_row]]
+    return validate(df)
+
+
+def _load_manifest():
+    try:
+        with open(MANIFEST_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# ✅ 변환 실행 (바뀐 게 없으면 건너뛰고 False 반환)
+def ingest(source=FOOD_XLSX_PATH, force=False):
+    digest = file_sha256(source)
+    manifest = _load_manifest()
+    outputs_exist = os.path.exists(FOOD_PARQUET_PATH) and os.path.exists(FOOD_CSV_PATH)
+    if not force and outputs_exist and manifest.get("sha256") == digest:
+        print(f"⏭ 변경 없음: {source} (sha256 {digest[:12]})")
+        return False
+
+    df = read_source(source)
+    df.to_parquet(FOOD_PARQUET_PATH, index=False)
+    df.to_csv(FOOD_CSV_PATH, index=False, encoding="utf-8-sig")
+
+    manifest = {
+        "source": os.path.basename(source),
+        "sha256": digest,
+        "rows": len(df),
+        "columns": {c: str(t) for c, t in df.dtypes.items()},
+    }
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    print(f"✅ {len(df)}행 변환 완료 → {FOOD_PARQUET_PATH}, {FOOD_CSV_PATH}")
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="전국맛집.xlsx를 CSV/Parquet으로 변환합니다.")
+    parser.add_argument("--source", default=FOOD_XLSX_PATH)
+    parser.add_argument("--force", action="store_true", help="해시가 같아도 다시 변환")
+    args = parser.parse_args(argv)
+    try:
+        ingest(args.source, force=args.force)
+    except SchemaError as e:
+        print(f"❌ 스키마 오류: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
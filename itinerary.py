@@ -0,0 +1,252 @@
+import numpy as np
+import pandas as pd
+from ranking import haversine_np
+
+# ✅ 일정 기본값
+SPEED_KMH = 30            # 시내 이동 평균 속도
+ROAD_FACTOR = 1.3         # 직선거리 → 도로거리 보정
+VISIT_MINUTES = 60        # 관광지 체류 시간
+MEAL_MINUTES = 60         # 식사 시간
+MEAL_SLOTS = [("점심", "11:30", "13:30"), ("저녁", "17:30", "19:30")]
+
+
+def to_minutes(hhmm):
+    if isinstance(hhmm, (int, float)):
+        return float(hhmm)
+    h, m = str(hhmm).split(":")
+    return int(h) * 60 + int(m)
+
+
+def to_hhmm(minutes):
+    minutes = int(round(minutes))
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+# ✅ 거리 행렬 (N×N, 미터) - 브로드캐스팅 하버사인
+def distance_matrix(lats, lngs):
+    lats = np.asarray(lats, dtype=float)
+    lngs = np.asarray(lngs, dtype=float)
+    return haversine_np(lats[:, None], lngs[:, None], lats[None, :], lngs[None, :]) * ROAD_FACTOR
+
+
+def _path_cost(route, dist):
+    r = np.asarray(route)
+    return float(dist[r[:-1], r[1:]].sum()) if len(r) > 1 else 0.0
+
+
+# ✅ 최근접 삽입: 경로에 붙였을 때 늘어나는 거리가 가장 작은 후보를 시간 예산 안에서 계속 추가
+def nearest_insertion(dist, budget_minutes, speed_m_per_min, visit_minutes, max_stops=None, feasible=None):
+    n = len(dist)
+    route = [0]
+    remaining = np.ones(n, dtype=bool)
+    remaining[0] = False
+    used = 0.0
+
+    while remaining.any() and (max_stops is None or len(route) - 1 < max_stops):
+        cand = np.flatnonzero(remaining)
+        prev = np.asarray(route)
+        nxt = np.append(prev[1:], -1)
+        has_next = nxt >= 0
+
+        # cost[c, i] = d(prev_i, c) + d(c, next_i) - d(prev_i, next_i)  (마지막 위치는 뒤에 붙이기)
+        cost = dist[np.ix_(cand, prev)]
+        cost[:, has_next] += dist[np.ix_(cand, nxt[has_next])] - dist[prev[has_next], nxt[has_next]]
+        best_pos = cost.argmin(axis=1)
+        best_cost = cost[np.arange(len(cand)), best_pos]
+        added = best_cost / speed_m_per_min + visit_minutes[cand]
+        ok = used + added <= budget_minutes
+        if not ok.any():
+            break
+
+        inserted = False
+        for j in np.argsort(np.where(ok, best_cost, np.inf))[:10]:
+            if not ok[j]:
+                break
+            trial = route[:best_pos[j] + 1] + [int(cand[j])] + route[best_pos[j] + 1:]
+            if feasible is None or feasible(trial):
+                route = trial
+                used += added[j]
+                remaining[cand[j]] = False
+                inserted = True
+                break
+        if not inserted:
+            break
+    return route
+
+
+# ✅ 2-opt (시작점 고정, 열린 경로)
+def two_opt(route, dist):
+    route = list(route)
+    n = len(route)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, n - 1):
+            a, b = route[i - 1], route[i]
+            js = np.arange(i + 1, n)
+            c = np.asarray(route)[js]
+            d_next = np.array([route[j + 1] if j + 1 < n else -1 for j in js])
+            has_next = d_next >= 0
+            delta = dist[a, c] - dist[a, b]
+            delta[has_next] += dist[b, d_next[has_next]] - dist[c[has_next], d_next[has_next]]
+            k = int(np.argmin(delta))
+            if delta[k] < -1e-6:
+                j = int(js[k])
+                route[i:j + 1] = reversed(route[i:j + 1])
+                improved = True
+    return route
+
+
+# ✅ Or-opt: 길이 1~3 구간을 다른 위치로 옮겨서(뒤집기 포함) 거리가 줄면 적용
+def or_opt(route, dist):
+    route = list(route)
+    improved = True
+    while improved:
+        improved = False
+        n = len(route)
+        for seg_len in (1, 2, 3):
+            for i in range(1, n - seg_len + 1):
+                first, last = route[i], route[i + seg_len - 1]
+                p = route[i - 1]
+                nx = route[i + seg_len] if i + seg_len < n else None
+                gain = dist[p, first] + (dist[last, nx] - dist[p, nx] if nx is not None else 0.0)
+                rest = route[:i] + route[i + seg_len:]
+                for pos in range(1, len(rest) + 1):
+                    if pos == i:
+                        continue
+                    x = rest[pos - 1]
+                    y = rest[pos] if pos < len(rest) else None
+                    for a, b, seg in ((first, last, route[i:i + seg_len]), (last, first, route[i:i + seg_len][::-1])):
+                        cost = dist[x, a] + (dist[b, y] - dist[x, y] if y is not None else 0.0)
+                        if cost < gain - 1e-6:
+                            route = rest[:pos] + seg + rest[pos:]
+                            improved = True
+                            break
+                    if improved:
+                        break
+                if improved:
+                    break
+            if improved:
+                break
+    return route
+
+
+PLAN_COLUMNS = ['순서', '구분', '이름', '도착', '출발', '이동거리(m)', '위도', '경도']
+
+
+def _name_column(df):
+    return '관광지명' if '관광지명' in df else '이름'
+
+
+# ✅ 하루 일정 만들기
+# attractions: 이름(또는 관광지명)/위도/경도, 선택적으로 체류시간(분)/개장/폐장 열
+# restaurants: 이름/위도/경도 (식사 시간대마다 동선에서 가장 덜 돌아가는 곳을 고른다)
+def plan_itinerary(attractions, restaurants=None, start=None, start_time="09:00", end_time="19:00",
+                   visit_minutes=VISIT_MINUTES, meal_minutes=MEAL_MINUTES, meal_slots=MEAL_SLOTS,
+                   speed_kmh=SPEED_KMH, max_stops=None):
+    attractions = attractions.dropna(subset=['위도', '경도']).reset_index(drop=True)
+    if attractions.empty or to_minutes(end_time) <= to_minutes(start_time):
+        return pd.DataFrame(columns=PLAN_COLUMNS)
+
+    name_col = _name_column(attractions)
+    if start is None:
+        start = (attractions.loc[0, '위도'], attractions.loc[0, '경도'])
+    lats = np.concatenate([[start[0]], attractions['위도'].to_numpy(dtype=float)])
+    lngs = np.concatenate([[start[1]], attractions['경도'].to_numpy(dtype=float)])
+    dist = distance_matrix(lats, lngs)
+
+    speed = speed_kmh * 1000 / 60
+    stay = np.concatenate([[0.0], pd.to_numeric(attractions.get('체류시간', pd.Series(visit_minutes, index=attractions.index)),
+                                                 errors='coerce').fillna(visit_minutes).to_numpy()])
+    opens = np.concatenate([[0.0], [to_minutes(v) if isinstance(v, str) else 0.0 for v in attractions.get('개장', [None] * len(attractions))]])
+    closes = np.concatenate([[24 * 60.0], [to_minutes(v) if isinstance(v, str) else 24 * 60.0 for v in attractions.get('폐장', [None] * len(attractions))]])
+
+    day_start, day_end = to_minutes(start_time), to_minutes(end_time)
+    slots = sorted(((label, to_minutes(s), to_minutes(e)) for label, s, e in meal_slots
+                    if day_start <= to_minutes(e) and to_minutes(s) <= day_end), key=lambda x: x[1])
+    if restaurants is not None:
+        restaurants = restaurants.dropna(subset=['위도', '경도']).reset_index(drop=True)
+    if restaurants is None or restaurants.empty:
+        slots = []
+    budget = day_end - day_start - meal_minutes * len(slots)
+
+    def window_ok(route):
+        t = day_start
+        for a, b in zip(route[:-1], route[1:]):
+            t = max(t + dist[a, b] / speed, opens[b])
+            if t + stay[b] > closes[b]:
+                return False
+            t += stay[b]
+        return True
+
+    route = nearest_insertion(dist, budget, speed, stay, max_stops=max_stops, feasible=window_ok)
+    for improve in (two_opt, or_opt):
+        improved = improve(route, dist)
+        if window_ok(improved):
+            route = improved
+
+    # 식사 포함 일정이 종료 시각을 넘기면 마지막 관광지부터 뺀다
+    while True:
+        schedule = _build_schedule(route, attractions, restaurants, name_col, lats, lngs,
+                                   stay, opens, closes, slots, day_start, speed, meal_minutes)
+        if len(route) <= 2 or not schedule or schedule[-1]['_end'] <= day_end:
+            break
+        route = route[:-1]
+
+    # 한 곳도 들어가지 않는 짧은 일정도 열은 그대로 둔다
+    df = pd.DataFrame(schedule, columns=PLAN_COLUMNS[1:] + ['_end']).drop(columns=['_end'])
+    df.insert(0, '순서', range(1, len(df) + 1))
+    return df
+
+
+def _build_schedule(route, attractions, restaurants, name_col, lats, lngs,
+                    stay, opens, closes, slots, day_start, speed, meal_minutes):
+    schedule = []
+    t = day_start
+    pos = (lats[0], lngs[0])
+    pending = list(slots)
+    used_restaurants = set()
+    stops = list(route[1:])
+    i = 0
+
+    while True:
+        a = stops[i] if i < len(stops) else None
+        if pending:
+            label, slot_start, slot_end = pending[0]
+            if a is not None:
+                finish_next = max(t + haversine_np(pos[0], pos[1], lats[a], lngs[a]) * ROAD_FACTOR / speed, opens[a]) + stay[a]
+            if a is None or t >= slot_start or finish_next > slot_end:
+                pending.pop(0)
+                to_lat, to_lng = (lats[a], lngs[a]) if a is not None else pos
+                r_lats = restaurants['위도'].to_numpy(dtype=float)
+                r_lngs = restaurants['경도'].to_numpy(dtype=float)
+                detour = (haversine_np(pos[0], pos[1], r_lats, r_lngs)
+                          + haversine_np(r_lats, r_lngs, to_lat, to_lng)) * ROAD_FACTOR
+                if used_restaurants:
+                    detour[list(used_restaurants)] = np.inf
+                r = int(np.argmin(detour))
+                if np.isfinite(detour[r]):
+                    move = haversine_np(pos[0], pos[1], r_lats[r], r_lngs[r]) * ROAD_FACTOR
+                    arrive = max(t + move / speed, slot_start)
+                    if arrive <= slot_end:
+                        used_restaurants.add(r)
+                        t = arrive + meal_minutes
+                        pos = (r_lats[r], r_lngs[r])
+                        schedule.append({'구분': label, '이름': restaurants.loc[r, '이름'],
+                                         '도착': to_hhmm(arrive), '출발': to_hhmm(t),
+                                         '이동거리(m)': int(round(move)), '위도': pos[0], '경도': pos[1], '_end': t})
+                continue
+        if a is None:
+            break
+
+        move = haversine_np(pos[0], pos[1], lats[a], lngs[a]) * ROAD_FACTOR
+        arrive = max(t + move / speed, opens[a])
+        i += 1
+        if arrive + stay[a] > closes[a]:
+            continue
+        t = arrive + stay[a]
+        pos = (lats[a], lngs[a])
+        schedule.append({'구분': '관광', '이름': attractions.loc[a - 1, name_col],
+                         '도착': to_hhmm(arrive), '출발': to_hhmm(t),
+                         '이동거리(m)': int(round(move)), '위도': pos[0], '경도': pos[1], '_end': t})
+    return schedule
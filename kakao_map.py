@@ -0,0 +1,159 @@
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+import streamlit.components.v1 as components
+
+from spatial_index import GridIndex
+from density import MIN_LEVEL, hex_size_deg
+
+# ✅ 뷰포트 기반 카카오맵 (양방향 컴포넌트)
+# 지도는 idle 이벤트마다 현재 범위/줌 레벨을 파이썬으로 보내고,
+# 파이썬은 공간 인덱스에서 화면 안 마커만 골라(줌 레벨별 상한) 이미 보낸 것과의 차이만 돌려준다.
+# iframe은 rerun 때마다 새로 만들어지지 않고 마커 델타만 적용한다.
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend", "kakao_map")
+_component = components.declare_component("kakao_map", path=FRONTEND_DIR)
+
+# 카카오 줌 레벨(1=가장 가까움) → 한 화면 최대 마커 수
+ZOOM_CAPS = ((3, 300), (5, 200), (7, 120), (9, 80))
+MIN_CAP = 50
+MARKER_COLUMNS = ['id', 'name', 'address', 'lat', 'lng', 'kind', 'search_key', 'priority']
+
+
+def marker_cap(level):
+    for max_level, cap in ZOOM_CAPS:
+        if level <= max_level:
+            return cap
+    return MIN_CAP
+
+
+# 첫 렌더링 때(지도가 아직 범위를 보내기 전) 쓸 대략적인 화면 범위
+def approx_bounds(lat, lng, level, half_deg=0.0025):
+    half = half_deg * 2 ** (level - 1)
+    return lat - half, lng - half, lat + half, lng + half
+
+
+# ✅ 검색 키: 전화번호가 있으면 전화번호, 없으면 "주소 이름"
+def search_keys(df):
+    phone = df['전화번호'].fillna("없음") if '전화번호' in df else pd.Series("없음", index=df.index)
+    fallback = df['주소'].fillna("").astype(str) + " " + df['이름'].astype(str)
+    return phone.where(phone != "없음", fallback)
+
+
+def restaurant_markers(df, prefix="food", priority=0.0):
+    if df is None or df.empty:
+        return pd.DataFrame(columns=MARKER_COLUMNS)
+    ids = df['place_id'] if 'place_id' in df else pd.Series(None, index=df.index)
+    ids = ids.where(ids.notna(), df['이름'].astype(str) + "@" + df['위도'].round(5).astype(str) + "," + df['경도'].round(5).astype(str))
+    return pd.DataFrame({
+        'id': prefix + ":" + ids.astype(str),
+        'name': df['이름'].astype(str),
+        'address': df['주소'].fillna("").astype(str),
+        'lat': df['위도'].astype(float),
+        'lng': df['경도'].astype(float),
+        'kind': "food",
+        'search_key': search_keys(df),
+        'priority': df['점수'].astype(float) if '점수' in df else priority,
+    })
+
+
+def tourist_markers(places_df, priority=0.0):
+    return pd.DataFrame({
+        'id': "kto:" + places_df['콘텐츠ID'].astype(str),
+        'name': places_df['관광지명'].astype(str),
+        'address': places_df['주소'].fillna("").astype(str),
+        'lat': places_df['위도'].astype(float),
+        'lng': places_df['경도'].astype(float),
+        'kind': "tour",
+        'search_key': places_df['주소'].fillna("").astype(str) + " " + places_df['관광지명'].astype(str),
+        'priority': priority,
+    })
+
+
+# ✅ 마커 레이어: 마커 표 + 격자 인덱스
+class MarkerLayer:
+    def __init__(self, markers):
+        self.markers = markers.drop_duplicates(subset='id').dropna(subset=['lat', 'lng']).reset_index(drop=True)
+        self.index = GridIndex(self.markers['lat'].to_numpy(), self.markers['lng'].to_numpy())
+        self.priority = self.markers['priority'].to_numpy(dtype=float)
+        self.ids = self.markers['id'].to_numpy()
+        self.kinds = self.markers['kind'].to_numpy()
+
+    # 화면 안 마커 번호 (많으면 priority 높은 순으로 cap 개)
+    def in_view(self, bounds, level):
+        idx = self.index.query_bbox(*bounds)
+        cap = marker_cap(level)
+        if len(idx) > cap:
+            idx = idx[np.argpartition(-self.priority[idx], cap - 1)[:cap]]
+        return idx
+
+    def records(self, idx):
+        rows = self.markers.iloc[idx].drop(columns=['priority'])
+        return rows.to_dict("records")
+
+
+# ✅ 고정 마커(추천 맛집)는 화면 범위 안일 때 항상 포함
+def _pinned_in_view(pinned, bounds):
+    south, west, north, east = bounds
+    lat, lng = pinned['lat'].to_numpy(), pinned['lng'].to_numpy()
+    return pinned[(lat >= south) & (lat <= north) & (lng >= west) & (lng <= east)]
+
+
+# ✅ 멀리 볼 때(줌 레벨 MIN_LEVEL 이상) 밀도 격자의 화면 안 칸들
+def _density_args(density, density_layer, bounds, level):
+    if density is None or level < MIN_LEVEL:
+        return None
+    cells, size = density.cells_in_view(density_layer, bounds, level)
+    return {"key": f"{density_layer}:{size}:{hash(tuple(map(tuple, cells)))}", "layer": density_layer,
+            "cells": cells, "size": hex_size_deg(size)}
+
+
+# events=True 이면 지도 클릭·"내 위치" 버튼 좌표를 새 이벤트일 때만 {"type", "lat", "lng"}로 돌려준다
+# density(DensityGrid)를 주면 멀리 볼 때 density_layer 종류 마커 대신 육각형 밀도 오버레이를 그린다
+def kakao_map(layer, center, appkey, pinned=None, level=4, height=500, key="kakao_map", events=False,
+              density=None, density_layer="food"):
+    pinned = pinned if pinned is not None else pd.DataFrame(columns=MARKER_COLUMNS)
+    state = st.session_state.setdefault(f"{key}__state", {"sent": set(), "seq": 0, "mount_id": None,
+                                                            "center_key": None, "args": None, "event_id": None})
+    center_key = f"{center[0]:.6f},{center[1]:.6f}"
+    value = st.session_state.get(key)
+
+    reset = False
+    if value and value.get("mount_id") != state["mount_id"]:
+        # 다른 iframe(새로 마운트된 지도)이 보낸 값이면 처음부터 다시 보낸다
+        reset = state["mount_id"] is not None
+        state["mount_id"] = value["mount_id"]
+    if center_key != state["center_key"] or not value:
+        # 중심이 바뀌면 지도가 새 범위를 보내기 전까지 근사 범위로 채운다
+        bounds, view_level = approx_bounds(center[0], center[1], level), level
+    else:
+        bounds, view_level = tuple(value["bounds"]), int(value["level"])
+    if reset:
+        state["sent"] = set()
+
+    pinned_view = _pinned_in_view(pinned, bounds)
+    density_args = _density_args(density, density_layer, bounds, view_level)
+    idx = layer.in_view(bounds, view_level)
+    if density_args is not None:
+        idx = idx[layer.kinds[idx] != density_layer]
+    wanted = dict(zip(pinned_view['id'], pinned_view.assign(pinned=True).drop(columns=['priority']).to_dict("records")))
+    for record, marker_id in zip(layer.records(idx), layer.ids[idx]):
+        wanted.setdefault(marker_id, record)
+
+    add = [wanted[i] for i in wanted.keys() - state["sent"]]
+    remove = sorted(state["sent"] - wanted.keys())
+    if add or remove or reset or center_key != state["center_key"] or state["args"] is None:
+        state["seq"] += 1
+        state["sent"] = set(wanted)
+        state["center_key"] = center_key
+        state["args"] = {"add": add, "remove": remove, "reset": reset, "seq": state["seq"]}
+
+    # 델타가 없으면 직전 인자를 그대로 다시 보낸다 (JS는 이미 적용한 seq를 무시)
+    value = _component(appkey=appkey, center=list(center), center_key=center_key, level=level,
+                       height=height, events=events, density=density_args, key=key, default=None, **state["args"])
+    event = (value or {}).get("event")
+    if not event or event["id"] == state["event_id"]:
+        return None
+    state["event_id"] = event["id"]
+    return event
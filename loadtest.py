@@ -0,0 +1,280 @@
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import struct
+import argparse
+import logging
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import requests
+
+from datasets import load_tourist_places
+
+# ✅ 동시 세션 부하 테스트
+# 로컬 스텁 서버가 Google/Kakao API를 흉내내고(응답 지연 포함),
+# Streamlit AppTest 세션 N개가 동시에 검색 → 관광지 선택 → 슬라이더 조작 흐름을 반복한다.
+#   python loadtest.py --app streamlit_최종.py --concurrency 1,5,10,20
+# 실제 API는 한 번도 호출하지 않는다.
+
+# 엔드포인트별 평균 지연(초) - 로그정규 분포로 흔들어서 사용
+LATENCY = {
+    "textsearch": 0.30,
+    "nearbysearch": 0.25,
+    "details": 0.15,
+    "geocode": 0.12,
+    "photo": 0.20,
+    "kakao": 0.08,
+}
+UPSTREAMS = ("https://maps.googleapis.com", "https://dapi.kakao.com")
+
+
+def _png_bytes(width=4, height=4):
+    raw = b"".join(b"\x00" + b"\x80\xa0\xc0" * width for _ in range(height))
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b""))
+
+
+# ✅ 스텁 응답 만들기 (tourist_places.csv 좌표 기반, 항상 같은 결과)
+class StubData:
+    def __init__(self):
+        self.places = load_tourist_places()
+        self.png = _png_bytes()
+
+    def textsearch(self, params):
+        rng = random.Random(params.get("query", ""))
+        rows = self.places.sample(n=min(20, len(self.places)), random_state=rng.randint(0, 10**6))
+        return {"status": "OK", "results": [{
+            "name": r['관광지명'],
+            "formatted_address": r['주소'],
+            "geometry": {"location": {"lat": r['위도'], "lng": r['경도']}},
+            "place_id": f"stub-place-{r['콘텐츠ID']}",
+            "rating": round(rng.uniform(3.5, 5.0), 1),
+            "user_ratings_total": rng.randint(10, 3000),
+            "photos": [{"photo_reference": f"ref-{r['콘텐츠ID']}"}],
+        } for _, r in rows.iterrows()]}
+
+    def nearbysearch(self, params):
+        lat, lng = map(float, params.get("location", "33.5,126.5").split(","))
+        rng = random.Random(params.get("location"))
+        # 실제 API처럼 요청 반경 전체에 흩어 둔다 (격자 칸 중심에서 칸 전체를 덮는 반경으로 부름)
+        spread = float(params.get("radius", 1000)) / 111320 / 1.5
+        return {"status": "OK", "results": [{
+            "name": f"스텁식당{i}",
+            "vicinity": f"제주특별자치도 제주시 스텁로 {i}",
+            "geometry": {"location": {"lat": lat + rng.uniform(-spread, spread),
+                                      "lng": lng + rng.uniform(-spread, spread)}},
+            "place_id": f"stub-rest-{lat:.4f}-{lng:.4f}-{i}",
+            "rating": round(rng.uniform(3.0, 5.0), 1),
+            "user_ratings_total": rng.randint(5, 2000),
+            "photos": [{"photo_reference": f"ref-r{i}"}],
+        } for i in range(20)]}
+
+    def details(self, params):
+        return {"status": "OK", "result": {
+            "formatted_phone_number": "064-000-0000",
+            "reviews": [{"author_name": "스텁", "rating": 5, "text": "맛있어요 " * 20, "time": 0}],
+        }}
+
+    def geocode(self, params):
+        return {"status": "OK", "results": [{"geometry": {"location": {"lat": 33.5, "lng": 126.5}}}]}
+
+    def kakao(self, params):
+        return {"documents": [{"id": "123456", "x": params.get("x", 126.5), "y": params.get("y", 33.5),
+                               "place_name": "스텁식당"}]}
+
+
+def _endpoint(path):
+    for name in ("textsearch", "nearbysearch", "details", "geocode", "photo"):
+        if name in path:
+            return name
+    return "kakao"
+
+
+def make_handler(data, latency_scale):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            name = _endpoint(url.path)
+            time.sleep(LATENCY[name] * latency_scale * random.lognormvariate(0, 0.3))
+            if name == "photo":
+                body, ctype = data.png, "image/png"
+            else:
+                body, ctype = json.dumps(getattr(data, name)(params), ensure_ascii=False).encode("utf-8"), "application/json"
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+    return Handler
+
+
+# ✅ requests 가 부르는 실제 API 주소를 스텁 서버로 돌린다
+def redirect_requests(base_url):
+    original = requests.sessions.Session.request
+
+    def request(self, method, url, *args, **kwargs):
+        url = "https:" + url if url.startswith("//") else url
+        for upstream in UPSTREAMS:
+            if url.startswith(upstream):
+                url = base_url + url[len(upstream):]
+        return original(self, method, url, *args, **kwargs)
+
+    requests.sessions.Session.request = request
+    return lambda: setattr(requests.sessions.Session, "request", original)
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = 0
+        self.running = True
+
+    @staticmethod
+    def current():
+        try:
+            with open("/proc/self/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def run(self):
+        while self.running:
+            self.peak = max(self.peak, self.current())
+            time.sleep(self.interval)
+
+
+# ✅ 세션 하나: 검색 → 관광지 선택 → 슬라이더 조작 (rerun마다 지연 기록)
+# 세션 스레드 안의 예외(AppTest 시간 초과, 검색 버튼 없음 등)도 오류로 센다 - 조용히 빠지면 오류율이 낮게 나온다
+def run_session(app_path, query, latencies, errors, timeout):
+    from streamlit.testing.v1 import AppTest
+
+    def timed(step):
+        start = time.perf_counter()
+        at_ = step()
+        latencies.append(time.perf_counter() - start)
+        if at_.exception:
+            errors.append(at_.exception[0].value)
+        return at_
+
+    try:
+        at = AppTest.from_file(app_path, default_timeout=timeout)
+        at = timed(at.run)
+        query_inputs = [t for t in at.text_input if "지역" in t.label]
+        if query_inputs:
+            query_inputs[0].input(query)
+        search_buttons = [b for b in at.button if "검색" in b.label]
+        if not search_buttons:
+            errors.append("검색 버튼을 찾지 못했습니다")
+            return
+        at = timed(search_buttons[0].click().run)
+        place_boxes = [s for s in at.selectbox if "관광지" in s.label]
+        if place_boxes and len(place_boxes[0].options) > 1:
+            at = timed(place_boxes[0].select_index(1).run)
+        if at.slider:
+            slider = at.slider[0]
+            at = timed(slider.set_value(slider.min if slider.value != slider.min else slider.max).run)
+    except Exception as e:
+        errors.append(f"{type(e).__name__}: {e}")
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    k = (len(values) - 1) * q / 100
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def run_level(app_path, concurrency, queries, timeout):
+    latencies, errors = [], []
+    sampler = RssSampler()
+    sampler.start()
+    start = time.perf_counter()
+    threads = [threading.Thread(target=run_session,
+                                args=(app_path, queries[i % len(queries)], latencies, errors, timeout))
+               for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    sampler.running = False
+    sampler.join()
+    return {
+        "concurrency": concurrency,
+        "reruns": len(latencies),
+        "errors": len(errors),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "peak_rss_mb": sampler.peak / 2**20,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streamlit 앱 동시 세션 부하 테스트 (로컬 API 스텁 사용)")
+    parser.add_argument("--app", default="streamlit_최종.py")
+    parser.add_argument("--concurrency", default="1,5,10", help="쉼표로 구분한 동시 세션 수 단계")
+    parser.add_argument("--queries", default="제주,애월,서귀포", help="세션마다 돌려가며 쓰는 검색어")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="스텁 지연 배율 (0이면 지연 없음)")
+    parser.add_argument("--no-shared-cache", action="store_true", help="세션 간 공유 캐시 끄기")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args(argv)
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    os.environ["Google_key"] = os.environ["KAKAO_KEY"] = "stub-key"
+    os.environ.pop("MATTOUR_OFFLINE", None)
+    os.environ["SHARED_CACHE_DISK"] = "0"
+    os.environ["MATTOUR_API_RATE"] = "0"     # 앱의 API 속도 제한은 끄고 스텁 지연만 잰다
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(StubData(), args.latency_scale))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    restore = redirect_requests(f"http://127.0.0.1:{server.server_port}")
+
+    import shared_cache
+    shared_cache.shared_cache.use_disk = False
+    if args.no_shared_cache:
+        # ttl=0: 저장된 결과는 재사용하지 않고, 동시에 진행 중인 같은 요청만 합친다
+        shared_cache.shared_cache.ttl = 0
+    levels = [int(c) for c in args.concurrency.split(",")]
+    queries = [q.strip() for q in args.queries.split(",") if q.strip()]
+    results = []
+    try:
+        print(f"{'세션':>5} {'rerun':>6} {'오류':>4} {'p50(s)':>8} {'p95(s)':>8} {'p99(s)':>8} {'rerun/s':>8} {'RSS(MB)':>8}")
+        for level in levels:
+            shared_cache.shared_cache.clear()
+            r = run_level(os.path.abspath(args.app), level, queries, args.timeout)
+            results.append(r)
+            print(f"{r['concurrency']:>5} {r['reruns']:>6} {r['errors']:>4} {r['p50']:>8.2f} {r['p95']:>8.2f} "
+                  f"{r['p99']:>8.2f} {r['throughput']:>8.2f} {r['peak_rss_mb']:>8.1f}")
+    finally:
+        restore()
+        server.shutdown()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+import functools
+
+import numpy as np
+import pandas as pd
+
+import offline
+from datasets import CONTENT_TYPES, load_tourist_places
+from facets import FacetIndex
+from spatial_index import GridIndex
+
+# ✅ "내 주변" 역검색
+# 검색어 없이 좌표 하나(브라우저 위치, 지도 클릭)만으로 가까운 관광지·맛집을 찾는다.
+# tourist_places.csv와 로컬 맛집 풀(캐시된 nearbysearch + *_맛집목록.csv)에 격자 인덱스를 만들어 두고
+# k-최근접 질의만 하므로 API를 부르지 않는다.
+RESTAURANT_TYPE = 39     # 관광지코드 39 = 음식점
+DEFAULT_K = 10
+
+
+class NearMeIndex:
+    def __init__(self, places, restaurants):
+        self.places = places.reset_index(drop=True)
+        self.restaurants = restaurants.reset_index(drop=True)
+        self.place_index = GridIndex(self.places['위도'].to_numpy(dtype=float), self.places['경도'].to_numpy(dtype=float))
+        self.restaurant_index = GridIndex(self.restaurants['위도'].to_numpy(dtype=float),
+                                          self.restaurants['경도'].to_numpy(dtype=float))
+        self.facets = FacetIndex(self.places)
+        self._masks = {}
+
+    # ✅ 필터 → 불리언 마스크 (같은 필터는 다시 만들지 않음)
+    def place_mask(self, content_types=None, categories=None):
+        key = (tuple(sorted(content_types or ())), tuple(sorted(categories or ())))
+        if key == ((), ()):
+            return None
+        if key not in self._masks:
+            # A05 → A0502 → A05020100 처럼 앞부분만 줘도 하위 분류까지 포함 (패싯 비트셋)
+            self._masks[key] = self.facets.mask(관광지코드=list(content_types or ()), 카테고리=list(categories or ()))
+        return self._masks[key]
+
+    def nearest_places(self, lat, lng, k=DEFAULT_K, content_types=None, categories=None, max_radius_m=None):
+        mask = self.place_mask(content_types, categories)
+        if mask is not None and not mask.any():
+            idx, dist = np.array([], dtype=np.int64), np.array([])
+        else:
+            idx, dist = self.place_index.knn(lat, lng, k, mask=mask, max_radius_m=max_radius_m)
+        result = self.places.iloc[idx].copy()
+        result['유형'] = result['관광지코드'].map(CONTENT_TYPES)
+        result['거리(m)'] = np.round(dist)
+        return result.reset_index(drop=True)
+
+    def nearest_restaurants(self, lat, lng, k=DEFAULT_K, max_radius_m=None):
+        idx, dist = self.restaurant_index.knn(lat, lng, k, max_radius_m=max_radius_m)
+        result = self.restaurants.iloc[idx].copy()
+        result['거리(m)'] = np.round(dist)
+        return result.reset_index(drop=True)
+
+
+# ✅ 맛집 후보: 로컬 맛집 풀 + 관광지 CSV의 음식점(39) 행
+def restaurant_frame(places, pool):
+    from_places = places[places['관광지코드'] == RESTAURANT_TYPE].rename(columns={'관광지명': '이름'})
+    from_places = from_places.assign(평점=np.nan, place_id="kto:" + from_places['콘텐츠ID'].astype(str))
+    columns = ['이름', '주소', '평점', '위도', '경도', '전화번호', 'place_id']
+    frames = [f.reindex(columns=columns) for f in (pool, from_places) if len(f)]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    merged = pd.concat(frames, ignore_index=True).dropna(subset=['위도', '경도'])
+    merged['전화번호'] = merged['전화번호'].fillna("없음")
+    return merged.drop_duplicates(subset=['이름', '위도', '경도']).reset_index(drop=True)
+
+
+@functools.lru_cache(maxsize=1)
+def near_me_index():
+    places = load_tourist_places()
+    return NearMeIndex(places, restaurant_frame(places, offline.restaurant_pool()))
@@ -0,0 +1,158 @@
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from ranking import haversine_np
+from shared_cache import cached
+from spatial_index import M_PER_DEG
+
+# ✅ 격자 칸 단위 주변 검색 캐시
+# 좌표 그대로를 키로 쓰면 200m 떨어진 두 관광지(애월 카페거리 등)가 거의 같은 nearbysearch를 따로 부른다.
+# 대신 CELL_DEG 격자 칸마다 칸 중심에서 칸 전체를 덮는 고정 반경으로 한 번만 받아 두고,
+# 질의는 반경에 걸치는 칸들을 합친 뒤 정확한 거리로 거른다.
+# 대가: 캐시가 빈 지역의 첫 검색은 좌표 하나로 부를 때(1회)보다 요청이 많다 - 칸이 걸치는 만큼.
+# 칸 한 변을 4km(기본 반경 2km의 지름) 이상으로 잡아 2km 질의가 칸 4개(2×2)를 넘지 않게 한다.
+#   0.02° 칸: 2km 질의당 평균 8.2칸, 최대 10칸  →  0.05° 칸: 평균 3.1칸, 최대 4칸 (위도 33~38.6° 무작위 점)
+# 대신 칸이 넓으므로(약 26km²) 한 페이지(20곳)로는 모자라 next_page_token을 따라 API 한도인 60곳까지 받는다.
+# 페이지는 차례로만 받을 수 있고 토큰이 유효해질 때까지 2초쯤 기다려야 해서, 가게가 많은 칸의 첫 조회는
+# 요청 최대 3회·4초 남짓 걸린다 (칸마다 한 번뿐, 이후 캐시). 가게가 적은 칸은 한 페이지로 끝난다.
+CELL_DEG = 0.05          # 약 5.6km × 4.6km (제주 위도 기준), 위도 38.6°에서도 경도 방향 4.3km
+MAX_PAGES = 3
+NEXT_PAGE_DELAY = 2.0    # next_page_token이 유효해질 때까지 기다리는 시간(초)
+REQUEST_TIMEOUT = 10     # 요청 하나의 기본 시간 제한(초) - 지연 예산이 있는 호출은 timeout=으로 더 짧게 준다
+ROUND_M = 100
+NEARBY_URL = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+MAX_WORKERS = 8
+
+
+def cell_of(lat, lng, cell_deg=CELL_DEG):
+    return math.floor(lat / cell_deg), math.floor(lng / cell_deg)
+
+
+def cell_center(row, col, cell_deg=CELL_DEG):
+    return (row + 0.5) * cell_deg, (col + 0.5) * cell_deg
+
+
+# ✅ 칸 중심에서 칸 모서리까지 거리 (적도 쪽 모서리가 가장 멀다) → 100m 단위 올림
+def fetch_radius(row, cell_deg=CELL_DEG):
+    lat = row * cell_deg if row >= 0 else (row + 1) * cell_deg
+    half_h = cell_deg / 2 * M_PER_DEG
+    half_w = cell_deg / 2 * M_PER_DEG * math.cos(math.radians(lat))
+    return int(math.ceil(math.hypot(half_h, half_w) / ROUND_M) * ROUND_M)
+
+
+# ✅ 반경 원과 겹치는 칸 목록
+def covering_cells(lat, lng, radius_m, cell_deg=CELL_DEG):
+    dlat = radius_m / M_PER_DEG
+    dlng = radius_m / (M_PER_DEG * max(math.cos(math.radians(lat)), 1e-6))
+    r0, c0 = cell_of(lat - dlat, lng - dlng, cell_deg)
+    r1, c1 = cell_of(lat + dlat, lng + dlng, cell_deg)
+    cells = []
+    for row in range(r0, r1 + 1):
+        for col in range(c0, c1 + 1):
+            # 칸 사각형에서 질의 점과 가장 가까운 점까지의 거리로 판정
+            near_lat = min(max(lat, row * cell_deg), (row + 1) * cell_deg)
+            near_lng = min(max(lng, col * cell_deg), (col + 1) * cell_deg)
+            if haversine_np(lat, lng, near_lat, near_lng) <= radius_m:
+                cells.append((row, col))
+    return cells
+
+
+# ✅ 캐시에 남길 필드만 (photos는 첫 장 참조값만)
+def _compact(result):
+    photos = result.get('photos') or []
+    return {
+        'name': result.get('name'),
+        'vicinity': result.get('vicinity'),
+        'geometry': {'location': result['geometry']['location']},
+        'place_id': result.get('place_id'),
+        'rating': result.get('rating'),
+        'user_ratings_total': result.get('user_ratings_total', 0),
+        'photos': [{'photo_reference': photos[0].get('photo_reference')}] if photos else [],
+        'types': result.get('types', []),
+    }
+
+
+# ✅ 칸 하나 받아오기 (칸 안에 있는 결과만 보관 → 이웃 칸과 겹치지 않음)
+# ZERO_RESULTS(바다 위 칸 등)도 캐시하고, 첫 페이지의 키 오류·쿼터 초과·시간 초과는 None을 돌려 캐시하지 않는다.
+# 둘째 페이지부터 실패하면 그때까지 받은 결과만 남긴다.
+@cached("nearbycell", ignore=("api_key", "timeout"))
+def fetch_cell(row, col, api_key, place_type="restaurant", cell_deg=CELL_DEG, timeout=None):
+    timeout = timeout or REQUEST_TIMEOUT
+    lat, lng = cell_center(row, col, cell_deg)
+    params = {
+        'location': f'{lat},{lng}',
+        'radius': fetch_radius(row, cell_deg),
+        'type': place_type,
+        'language': 'ko',
+        'key': api_key
+    }
+    pages = []
+    for page in range(MAX_PAGES):
+        try:
+            res = requests.get(NEARBY_URL, params=params, timeout=timeout).json()
+        except (requests.RequestException, ValueError):
+            res = {}
+        # 토큰을 너무 일찍 쓰면 INVALID_REQUEST - 한 번 더 기다렸다가 다시 부른다
+        if page and res.get('status') == 'INVALID_REQUEST':
+            time.sleep(NEXT_PAGE_DELAY)
+            try:
+                res = requests.get(NEARBY_URL, params=params, timeout=timeout).json()
+            except (requests.RequestException, ValueError):
+                res = {}
+        if res.get('status') not in ('OK', 'ZERO_RESULTS'):
+            if not page:
+                return None
+            break
+        pages.append(res.get('results', []))
+        token = res.get('next_page_token')
+        if not token:
+            break
+        params = {'pagetoken': token, 'key': api_key}
+        time.sleep(NEXT_PAGE_DELAY)
+
+    results = []
+    for r in (r for page_results in pages for r in page_results):
+        loc = r['geometry']['location']
+        if cell_of(loc['lat'], loc['lng'], cell_deg) == (row, col):
+            results.append(_compact(r))
+    return {'results': results}
+
+
+# ✅ 주변 검색: 걸치는 칸 합치기 → 정확한 거리로 거르기
+def nearby_search(lat, lng, radius_m, api_key, place_type="restaurant", cell_deg=CELL_DEG, timeout=None):
+    cells = covering_cells(lat, lng, radius_m, cell_deg)
+    # 아직 캐시에 없는 칸은 동시에 받아온다
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(cells) or 1)) as pool:
+        fetched = list(pool.map(lambda rc: fetch_cell(rc[0], rc[1], api_key, place_type=place_type,
+                                                       cell_deg=cell_deg, timeout=timeout), cells))
+    return merge_cells(lat, lng, radius_m, fetched)
+
+
+# ✅ 캐시에 이미 있는 칸만으로 주변 검색 (API 없음) → (결과, 아직 없는 칸 수)
+def cached_nearby_search(lat, lng, radius_m, api_key, place_type="restaurant", cell_deg=CELL_DEG):
+    fetched = [fetch_cell.peek(row, col, api_key, place_type=place_type, cell_deg=cell_deg)
+               for row, col in covering_cells(lat, lng, radius_m, cell_deg)]
+    return merge_cells(lat, lng, radius_m, fetched), sum(cell is None for cell in fetched)
+
+
+# ✅ 칸 응답들 합치기 → 정확한 거리로 거르기
+# 칸마다 구글의 prominence 순서가 따로라서, 합친 결과는 리뷰 수가 많은 순으로 돌려준다.
+def merge_cells(lat, lng, radius_m, fetched):
+    merged = {}
+    for cell in fetched:
+        for r in (cell or {}).get('results', []):
+            merged.setdefault(r['place_id'] or r['name'], r)
+    results = list(merged.values())
+    if not results:
+        return []
+
+    lats = np.array([r['geometry']['location']['lat'] for r in results], dtype=float)
+    lngs = np.array([r['geometry']['location']['lng'] for r in results], dtype=float)
+    dist = haversine_np(lat, lng, lats, lngs)
+    keep = np.flatnonzero(dist <= radius_m)
+    keep = sorted(keep, key=lambda i: (-(results[i]['user_ratings_total'] or 0), dist[i]))
+    return [results[i] for i in keep]
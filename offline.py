@@ -0,0 +1,114 @@
+import os
+import glob
+import json
+import functools
+
+import numpy as np
+import pandas as pd
+
+from datasets import DATA_DIR, load_tourist_places, load_area_numbers
+from geocode_cache import get_cached_lat_lng
+from shared_cache import shared_cache, access_log, CACHE_DIR
+from spatial_index import GridIndex
+
+# ✅ 오프라인(리플레이) 모드
+# MATTOUR_OFFLINE=1 이거나 Google 키가 없으면 외부 API를 전혀 부르지 않고
+# 공유 캐시에 기록된 응답 → 로컬 CSV/공간 인덱스 순서로 결과를 만든다.
+# 캐시는 온라인 실행 때 @cached 가 data/cache/shared 에 자동으로 쌓는다.
+RESTAURANT_LIST_GLOB = os.path.join(DATA_DIR, "*_맛집목록.csv")
+
+
+def is_offline(api_key=None):
+    return os.getenv("MATTOUR_OFFLINE") == "1" or not api_key
+
+
+# ✅ 관광지 CSV → Text Search 응답과 같은 모양
+def _to_text_search_result(row):
+    return {
+        "name": row['관광지명'],
+        "formatted_address": row['주소'],
+        "geometry": {"location": {"lat": float(row['위도']), "lng": float(row['경도'])}},
+        "place_id": f"kto:{row['콘텐츠ID']}",
+        "rating": None,
+        "types": [str(row['관광지코드'])],
+    }
+
+
+@functools.lru_cache(maxsize=1)
+def _tourist_places():
+    return load_tourist_places()
+
+
+@functools.lru_cache(maxsize=1)
+def _area_codes():
+    areas = load_area_numbers()
+    return dict(zip(areas['지역명'], areas['지역코드']))
+
+
+# ✅ 관광지 검색 (기록된 응답 → 지역명/주소/관광지명 매칭)
+def search_places(query, api_key=None, namespace="textsearch"):
+    recorded = shared_cache.get(namespace, {"query": query})
+    if recorded:
+        return recorded
+
+    df = _tourist_places()
+    df = df[~df['관광지코드'].isin([32, 39])]
+    query = str(query).strip()
+    code = next((c for name, c in _area_codes().items() if query and (query in name or name in query)), None)
+    hit = df['주소'].str.contains(query, regex=False, na=False) | df['관광지명'].str.contains(query, regex=False, na=False)
+    if code is not None:
+        hit |= df['지역코드'] == code
+    rows = df[hit].head(20)
+    # 관광지 행 조회 기록 (refresh_daemon.py가 자주 보는 행부터 갱신)
+    for content_id in rows['콘텐츠ID']:
+        access_log.record(f"tourist:{content_id}")
+    return [_to_text_search_result(row) for _, row in rows.iterrows()]
+
+
+# ✅ 로컬 맛집 풀: 기록된 nearbysearch 응답 + data/*_맛집목록.csv
+@functools.lru_cache(maxsize=1)
+def restaurant_pool():
+    frames = []
+    for path in glob.glob(os.path.join(CACHE_DIR, "nearbysearch*", "*", "*.json")):
+        try:
+            with open(path, encoding="utf-8") as f:
+                records = json.load(f)["value"]
+        except (OSError, ValueError, KeyError):
+            continue
+        if records:
+            frames.append(pd.DataFrame(records))
+    for path in glob.glob(RESTAURANT_LIST_GLOB):
+        frames.append(pd.read_csv(path))
+    if not frames:
+        return pd.DataFrame(columns=['이름', '주소', '평점', '위도', '경도', '전화번호', 'place_id'])
+
+    pool = pd.concat(frames, ignore_index=True)
+    pool = pool.dropna(subset=['위도', '경도'])
+    pool = pool.drop_duplicates(subset=['이름', '위도', '경도']).reset_index(drop=True)
+    for col, default in (('전화번호', "없음"), ('place_id', None)):
+        if col not in pool:
+            pool[col] = default
+    pool['전화번호'] = pool['전화번호'].fillna("없음")
+    return pool
+
+
+@functools.lru_cache(maxsize=1)
+def _restaurant_index():
+    pool = restaurant_pool()
+    return GridIndex(pool['위도'].to_numpy(dtype=float), pool['경도'].to_numpy(dtype=float))
+
+
+# ✅ 주변 맛집 (기록된 응답 → 공간 인덱스 반경 검색)
+def find_nearby_restaurants(lat, lng, api_key=None, radius=2000, namespace="nearbysearch", limit=15):
+    recorded = shared_cache.get(namespace, {"lat": lat, "lng": lng})
+    if recorded:
+        return recorded
+
+    idx, _ = _restaurant_index().query_radius(lat, lng, radius)
+    records = restaurant_pool().iloc[idx[:limit]]
+    return records.replace({np.nan: None}).to_dict("records")
+
+
+# ✅ 좌표: 지오코딩 캐시만 조회
+def get_lat_lng(address, api_key=None):
+    return get_cached_lat_lng(address) or (None, None)
@@ -0,0 +1,86 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+import requests
+
+from shared_cache import shared_cache
+
+# ✅ 장소 사진 바이트 캐시
+# 구글 Place Photo는 rerun마다 다시 받으면 요청·시간이 그대로 들므로, 처음 받은 원본 바이트를
+# data/cache/photos 에 photo_reference(+maxwidth)별 파일로 남기고 다음부터는 파일에서 읽는다.
+# 오프라인 모드는 cached_photo()로 저장된 사진만 보여준다 (없으면 사진 없이).
+# SHARED_CACHE_DISK=0 (부하 테스트 등)이면 파일 대신 이 프로세스 메모리에 최근 MAX_MEMORY_PHOTOS장만 둔다.
+PHOTO_DIR = os.path.join("data", "cache", "photos")
+PHOTO_URL = "https://maps.googleapis.com/maps/api/place/photo"
+MAX_MEMORY_PHOTOS = 200
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+_inflight = {}      # 같은 사진을 여러 세션이 동시에 받지 않도록 키별 잠금
+
+
+def _key(photo_reference, maxwidth):
+    return hashlib.sha1(f"{photo_reference}|{maxwidth}".encode("utf-8")).hexdigest()
+
+
+def _path(key):
+    return os.path.join(PHOTO_DIR, key[:2], key + ".img")
+
+
+# ✅ 저장된 사진만 조회 (네트워크 없음) → 바이트 또는 None
+def cached_photo(photo_reference, maxwidth=400):
+    if not photo_reference:
+        return None
+    key = _key(photo_reference, maxwidth)
+    if not shared_cache.use_disk:
+        with _lock:
+            data = _memory.get(key)
+            if data is not None:
+                _memory.move_to_end(key)
+            return data
+    try:
+        with open(_path(key), "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _store(key, data):
+    if not shared_cache.use_disk:
+        with _lock:
+            _memory[key] = data
+            while len(_memory) > MAX_MEMORY_PHOTOS:
+                _memory.popitem(last=False)
+        return
+    path = _path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+# ✅ 사진 바이트: 저장된 것이 있으면 그대로, 없으면 한 번 받아 저장 (이미지가 아닌 응답·오류는 저장하지 않음)
+def get_photo(photo_reference, api_key, maxwidth=400):
+    data = cached_photo(photo_reference, maxwidth)
+    if data is not None or not photo_reference:
+        return data
+    key = _key(photo_reference, maxwidth)
+    with _lock:
+        key_lock = _inflight.setdefault(key, threading.Lock())
+    with key_lock:
+        data = cached_photo(photo_reference, maxwidth)
+        if data is None:
+            params = {"maxwidth": maxwidth, "photoreference": photo_reference, "key": api_key}
+            try:
+                res = requests.get(PHOTO_URL, params=params, timeout=10)
+            except requests.RequestException:
+                res = None
+            if res is not None and res.ok and res.headers.get("Content-Type", "").startswith("image/"):
+                data = res.content
+                _store(key, data)
+    with _lock:
+        _inflight.pop(key, None)
+    return data
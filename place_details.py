@@ -0,0 +1,74 @@
+import re
+import requests
+
+from ranking import haversine_np
+from shared_cache import cached
+
+# ✅ 가게 상세 정보 조회 (전화번호·영업 상태·카카오 id)
+# 자주 바뀌지 않는 값이라 검색 결과보다 TTL을 길게 잡고, refresh_daemon.py가 인기 항목부터 미리 갱신한다.
+DETAILS_TTL = 7 * 24 * 60 * 60
+KAKAO_ID_TTL = 30 * 24 * 60 * 60
+REQUEST_TIMEOUT = 10    # 요청 하나의 기본 시간 제한(초) - 시간 초과·연결 오류는 빈 값(캐시하지 않음)
+
+
+# ✅ 구글 Place Details API → 전화번호 가져오기
+@cached("details", ttl=DETAILS_TTL, ignore=("api_key", "timeout"))
+def get_place_details(place_id, api_key, timeout=None):
+    url = "https://maps.googleapis.com/maps/api/place/details/json"
+    params = {
+        "place_id": place_id,
+        "fields": "name,formatted_address,formatted_phone_number,business_status",
+        "language": "ko",
+        "key": api_key
+    }
+    try:
+        res = requests.get(url, params=params, timeout=timeout or REQUEST_TIMEOUT).json()
+    except (requests.RequestException, ValueError):
+        return {}
+    return res.get("result", {})
+
+
+# ✅ Kakao place_id 가져오기
+@cached("kakaoid", ttl=KAKAO_ID_TTL, ignore=("kakao_key", "timeout"))
+def get_kakao_place_id(name, lat, lng, kakao_key, address="", phone=None, timeout=None):
+    url = "https://dapi.kakao.com/v2/local/search/keyword.json"
+    headers = {"Authorization": f"KakaoAK {kakao_key}"}
+
+    queries = []
+    if phone:
+        queries.append(phone)
+
+    korean = re.sub(r"[^가-힣]", "", name)
+    region = ""
+    if "시" in address:
+        region = address.split("시")[0] + "시"
+    elif "도" in address:
+        region = address.split("도")[0] + "도"
+
+    if korean:
+        queries.append(f"{region} {korean}")
+    else:
+        queries.append(f"{region} {name}")
+
+    best_doc, best_dist = None, float("inf")
+
+    for q in queries:
+        params = {"query": q, "x": lng, "y": lat, "radius": 300}
+        try:
+            res = requests.get(url, headers=headers, params=params, timeout=timeout or REQUEST_TIMEOUT).json()
+        except (requests.RequestException, ValueError):
+            return None
+
+        if not res.get("documents"):
+            continue
+
+        for d in res["documents"]:
+            dist = float(haversine_np(lat, lng, float(d["y"]), float(d["x"])))
+            if dist < best_dist:
+                best_dist = dist
+                best_doc = d
+
+        if best_doc and best_dist < 100:
+            break
+
+    return best_doc["id"] if best_doc else None
@@ -0,0 +1,47 @@
+from dataclasses import dataclass, asdict
+
+# ✅ 화면에 쓰는 필드만 남긴 관광지 레코드
+# Text Search 응답 전체(photos 배열, html_attributions, plus_code, viewport, icon ...)를
+# session_state에 그대로 두지 않고, 렌더링에 필요한 값만 __slots__ 레코드로 보관한다.
+
+
+@dataclass(slots=True)
+class PlaceRecord:
+    name: str
+    address: str
+    lat: float | None
+    lng: float | None
+    rating: float | None
+    user_ratings_total: int
+    place_id: str | None
+    photo_ref: str | None
+
+    @classmethod
+    def from_text_search(cls, result):
+        location = result.get('geometry', {}).get('location', {})
+        photos = result.get('photos') or []
+        rating = result.get('rating')
+        return cls(
+            name=result.get('name', ''),
+            address=result.get('formatted_address', ''),
+            lat=location.get('lat'),
+            lng=location.get('lng'),
+            rating=rating if isinstance(rating, (int, float)) else None,
+            user_ratings_total=int(result.get('user_ratings_total') or 0),
+            place_id=result.get('place_id'),
+            photo_ref=photos[0].get('photo_reference') if photos else None,
+        )
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def to_place_records(results):
+    return [PlaceRecord.from_text_search(r) for r in results or []]
+
+
+# ✅ 맛집 결과에서 사진 배열 대신 첫 사진 참조값만 남기기
+def first_photo_ref(photos):
+    if not photos:
+        return None
+    return photos[0].get('photo_reference')
@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import pstats
+import logging
+import cProfile
+import datetime
+import threading
+import uuid
+from contextlib import contextmanager
+
+# ✅ rerun 단계별 시간 측정
+# main()의 각 단계를 phase("이름")으로 감싸면 rerun 한 번의 단계별 시간을 모아
+# 디버그 사이드바에 보여주고 JSON 한 줄로 로그에 남긴다.
+# 사이드바 버튼을 누르면 그 rerun 한 번만 cProfile로 기록해 data/cache/profiles 에 저장한다.
+#   MATTOUR_DEBUG=1 또는 ?debug=1 → 사이드바 표시 + JSON 로그
+#   snakeviz data/cache/profiles/rerun-....prof → 플레임 그래프
+PROFILE_DIR = os.path.join("data", "cache", "profiles")
+
+logger = logging.getLogger("mattour.profile")
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# Streamlit은 세션마다 별도 스레드에서 스크립트를 돌리므로 스레드별로 현재 측정기를 둔다
+_local = threading.local()
+
+
+class RerunProfiler:
+    def __init__(self, capture=False):
+        self.phases = []        # [경로, 깊이, 초] - 시작한 순서 (바깥 단계가 안쪽 단계보다 앞)
+        self._stack = []
+        self.capture = capture
+        self.profile = cProfile.Profile() if capture else None
+        self.profile_path = None
+        self.total = None
+        self._start = None
+
+    def start(self):
+        _local.profiler = self
+        self._start = time.perf_counter()
+        if self.profile:
+            self.profile.enable()
+        return self
+
+    def finish(self):
+        if self.profile:
+            self.profile.disable()
+        self.total = time.perf_counter() - self._start
+        _local.profiler = None
+        if self.profile:
+            self.profile_path = self._save_profile()
+        return self
+
+    @contextmanager
+    def phase(self, name):
+        self._stack.append(name)
+        path = "/".join(self._stack)
+        depth = len(self._stack) - 1
+        record = [path, depth, None]
+        self.phases.append(record)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record[2] = time.perf_counter() - start
+            self._stack.pop()
+
+    def _save_profile(self):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(PROFILE_DIR, f"rerun-{stamp}-{os.getpid()}.prof")
+        self.profile.dump_stats(path)
+        # 도구 없이 볼 수 있게 누적 시간 상위 40개도 텍스트로 남긴다
+        with open(path[:-len(".prof")] + ".txt", "w", encoding="utf-8") as f:
+            pstats.Stats(path, stream=f).sort_stats("cumulative").print_stats(40)
+        return path
+
+    def to_dict(self, **extra):
+        return {
+            "event": "rerun",
+            "at": datetime.datetime.now().isoformat(timespec="milliseconds"),
+            "total_ms": round(self.total * 1000, 1) if self.total is not None else None,
+            "phases": [{"name": name, "ms": round(seconds * 1000, 1)} for name, _, seconds in self.phases],
+            "profile": self.profile_path,
+            **extra,
+        }
+
+    def log(self, **extra):
+        logger.info(json.dumps(self.to_dict(**extra), ensure_ascii=False))
+
+
+# ✅ 어디서든 현재 rerun의 단계로 기록 (측정 중이 아니면 아무 일도 안 함)
+@contextmanager
+def phase(name):
+    profiler = getattr(_local, "profiler", None)
+    if profiler is None:
+        yield
+        return
+    with profiler.phase(name):
+        yield
+
+
+def debug_enabled(st):
+    return os.getenv("MATTOUR_DEBUG") == "1" or st.query_params.get("debug") == "1"
+
+
+def _request_capture():
+    import streamlit as st
+    st.session_state["profile_next_rerun"] = True
+
+
+# ✅ rerun 시작: 캡처 버튼이 눌렸으면(콜백은 rerun 전에 실행됨) 이번 rerun을 cProfile로 기록
+def start_rerun(st):
+    capture = st.session_state.pop("profile_next_rerun", False)
+    st.session_state.setdefault("profile_session_id", uuid.uuid4().hex[:8])
+    return RerunProfiler(capture=capture).start()
+
+
+# ✅ rerun 끝: 사이드바 표 + JSON 로그
+def finish_rerun(st, profiler):
+    profiler.finish()
+    if not debug_enabled(st):
+        return
+    profiler.log(session=st.session_state.get("profile_session_id"))
+    with st.sidebar.expander("⏱ rerun 단계별 시간", expanded=True):
+        lines = ["| 단계 | ms | % |", "|---|---:|---:|"]
+        for name, depth, seconds in profiler.phases:
+            label = "&nbsp;" * 4 * depth + name.split("/")[-1]
+            share = seconds / profiler.total * 100 if profiler.total else 0
+            lines.append(f"| {label} | {seconds * 1000:,.1f} | {share:.0f} |")
+        lines.append(f"| **전체** | **{profiler.total * 1000:,.1f}** | 100 |")
+        st.markdown("\n".join(lines))
+        st.button("📸 rerun 한 번 cProfile 저장", on_click=_request_capture)
+        if profiler.profile_path:
+            st.success(f"저장됨: {profiler.profile_path}")
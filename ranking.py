@@ -0,0 +1,93 @@
+import numpy as np
+
+# ✅ 랭킹 기본 설정
+# 점수 = rating 가중치 × (베이지안 평점 / 5) + distance 가중치 × exp(-거리 / DISTANCE_SCALE)
+DEFAULT_WEIGHTS = {"rating": 0.7, "distance": 0.3}
+PRIOR_VOTES = 50          # 리뷰 수가 이 정도는 돼야 자기 평점을 절반 이상 믿는다
+PRIOR_MEAN = 3.5          # 사전 평균 (고정값 - 후보 평균을 쓰면 같은 가게 점수가 검색 결과마다 달라진다)
+DISTANCE_SCALE = 1000.0   # 1km 멀어질 때마다 거리 점수가 1/e 로 감소
+
+
+# ✅ 벡터화 하버사인 (미터)
+def haversine_np(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * 6371e3 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+# ✅ 베이지안 가중 평점: 리뷰가 적을수록 사전 평균(PRIOR_MEAN) 쪽으로 당겨진다
+# 후보 평균을 사전 평균으로 쓰려면 호출하는 쪽에서 prior_mean으로 직접 넘긴다
+def bayesian_rating(ratings, counts, prior_mean=PRIOR_MEAN, prior_votes=PRIOR_VOTES):
+    ratings = np.asarray(ratings, dtype=float)
+    counts = np.nan_to_num(np.asarray(counts, dtype=float), nan=0.0)
+    counts = np.where(np.isnan(ratings), 0.0, np.maximum(counts, 0.0))
+    ratings = np.where(np.isnan(ratings), prior_mean, ratings)
+    return (counts * ratings + prior_votes * prior_mean) / (counts + prior_votes)
+
+
+# ✅ 후보 전체 점수 계산 (distances가 없으면 평점만 사용)
+def score(ratings, counts, distances=None, weights=None,
+          prior_mean=PRIOR_MEAN, prior_votes=PRIOR_VOTES, distance_scale=DISTANCE_SCALE):
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    result = weights["rating"] * bayesian_rating(ratings, counts, prior_mean, prior_votes) / 5.0
+    if distances is not None:
+        decay = np.exp(-np.asarray(distances, dtype=float) / distance_scale)
+        result = result + weights["distance"] * np.nan_to_num(decay, nan=0.0)
+    return result
+
+
+# ✅ 상위 k개 인덱스 (argpartition으로 O(n) 선택 후 k개만 정렬)
+def top_k(scores, k=None):
+    scores = np.asarray(scores, dtype=float)
+    n = len(scores)
+    if k is None or k >= n:
+        return np.argsort(-scores, kind="stable")
+    if k <= 0:
+        return np.array([], dtype=int)
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+# ✅ 맛집 데이터프레임 랭킹 ('점수', '거리(m)' 열 추가)
+def rank_dataframe(df, lat=None, lng=None, k=None, weights=None,
+                   rating_col='평점', count_col='리뷰수', lat_col='위도', lng_col='경도', **kwargs):
+    if df.empty:
+        return df
+    ratings = df[rating_col].to_numpy(dtype=float)
+    counts = df[count_col].to_numpy(dtype=float) if count_col in df else np.zeros(len(df))
+    distances = None
+    if lat is not None and lng is not None:
+        distances = haversine_np(lat, lng, df[lat_col].to_numpy(dtype=float), df[lng_col].to_numpy(dtype=float))
+    scores = score(ratings, counts, distances, weights=weights, **kwargs)
+    order = top_k(scores, k)
+
+    df = df.iloc[order].copy()
+    df['점수'] = np.round(scores[order], 4)
+    if distances is not None:
+        df['거리(m)'] = np.round(distances[order])
+    return df.reset_index(drop=True)
+
+
+def _place_arrays(places):
+    if isinstance(places[0], dict):
+        rows = [(p.get('rating'), p.get('user_ratings_total'),
+                 p.get('geometry', {}).get('location', {}).get('lat'),
+                 p.get('geometry', {}).get('location', {}).get('lng')) for p in places]
+    else:
+        rows = [(p.rating, p.user_ratings_total, p.lat, p.lng) for p in places]
+    ratings = np.array([r if isinstance(r, (int, float)) else np.nan for r, _, _, _ in rows], dtype=float)
+    counts = np.array([c or 0 for _, c, _, _ in rows], dtype=float)
+    locs = np.array([[np.nan if la is None else la, np.nan if ln is None else ln] for _, _, la, ln in rows], dtype=float)
+    return ratings, counts, locs
+
+
+# ✅ 구글 Places 결과(dict 리스트 또는 PlaceRecord 리스트) 랭킹
+def rank_places(places, lat=None, lng=None, k=None, weights=None, **kwargs):
+    if not places:
+        return []
+    ratings, counts, locs = _place_arrays(places)
+    distances = None
+    if lat is not None and lng is not None:
+        distances = haversine_np(lat, lng, locs[:, 0], locs[:, 1])
+    scores = score(ratings, counts, distances, weights=weights, **kwargs)
+    return [places[i] for i in top_k(scores, k)]
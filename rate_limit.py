@@ -0,0 +1,54 @@
+import time
+import threading
+import multiprocessing as mp
+
+import requests
+
+# ✅ 외부 API 공유 속도 제한
+# 다음 요청 가능 시각을 하나 두고 잠금으로 한 칸씩 예약한다(토큰 버킷).
+# ctx=mp면 공유 메모리라 batch_recommend.py의 워커 프로세스끼리도, 한 프로세스 안의 스레드끼리도 나눠 쓴다.
+# install()은 requests 호출 중 UPSTREAMS로 나가는 것만 제한기를 거치게 한다 (캐시 적중은 예산을 쓰지 않음).
+UPSTREAMS = ("https://maps.googleapis.com", "https://dapi.kakao.com")
+
+
+class RateLimiter:
+    def __init__(self, rate, ctx=mp):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_slot = ctx.Value('d', 0.0, lock=False)
+        self.lock = ctx.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.time()
+            slot = max(now, self.next_slot.value)
+            self.next_slot.value = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_installed = {"limiter": None}
+_install_lock = threading.Lock()
+
+
+# ✅ 이 프로세스의 외부 API 요청을 limiter 하나로 묶는다
+# 처음 부른 limiter만 쓰고 이후 호출은 아무것도 하지 않는다 (이미 예약된 next_slot을 버리지 않도록)
+def install(limiter, upstreams=UPSTREAMS):
+    with _install_lock:
+        if _installed["limiter"] is not None:
+            return _installed["limiter"]
+        _installed["limiter"] = limiter
+        original = requests.sessions.Session.request
+
+        def request(self, method, url, *args, **kwargs):
+            if url.startswith(upstreams):
+                limiter.acquire()
+            return original(self, method, url, *args, **kwargs)
+
+        requests.sessions.Session.request = request
+    return limiter
+
+
+def shared_limiter():
+    return _installed["limiter"]
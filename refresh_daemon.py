@@ -0,0 +1,290 @@
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+from dataclasses import dataclass, field
+
+import pandas as pd
+import requests
+from dotenv import load_dotenv
+
+# @cached 함수가 있는 모듈을 불러와야 registry에 네임스페이스가 등록된다
+import place_details  # noqa: F401
+import nearby_cells  # noqa: F401
+import federated  # noqa: F401
+from datasets import TOURIST_PLACES_PATH
+from shared_cache import shared_cache, access_log, registry
+
+# ✅ 캐시 증분 갱신 스케줄러
+# 공유 캐시 항목(상세정보·카카오 id·주변 검색 칸·카카오 카테고리 페이지)과 tourist_places.csv 행마다
+# 나이(TTL 대비)와 조회 빈도를 보고, 오래됐고 자주 쓰이는 것부터 하룻밤 API 예산 안에서만 다시 받는다.
+#   python refresh_daemon.py --budget 500              # 한 번 실행 (cron용)
+#   python refresh_daemon.py --budget 500 --loop --at 03:00
+#   python refresh_daemon.py --dry-run                 # 무엇을 갱신할지만 보기
+REFRESH_NAMESPACES = ("details", "kakaoid", "nearbycell", "kakaocategory")
+CALL_COST = {"kakaoid": 2}      # 항목 하나 갱신에 드는 최대 호출 수 (없으면 1)
+REFRESH_AT = 0.8                # TTL의 80%가 지나면 갱신 대상
+HALF_LIFE_DAYS = 7              # 조회 빈도는 일주일마다 절반으로 줄여서 센다
+TOURIST_TTL = 30 * 24 * 60 * 60
+TOURIST_STATE_PATH = os.path.join("data", "cache", "tourist_refresh.json")
+REPORT_PATH = os.path.join("data", "cache", "refresh_report.ndjson")
+TOUR_DETAIL_URL = "http://apis.data.go.kr/B551011/KorService2/detailCommon2"
+REQUEST_TIMEOUT = 10            # 요청 하나가 밤새 멈춰 있지 않도록 (시간 초과는 실패로 센다)
+UPSTREAMS = ("https://maps.googleapis.com", "https://dapi.kakao.com", "http://apis.data.go.kr")
+
+
+@dataclass
+class Candidate:
+    kind: str           # 공유 캐시 네임스페이스 또는 "tourist"
+    key: str
+    age: float          # 초
+    ttl: float
+    popularity: float
+    cost: int
+    parts: dict = field(default_factory=dict)
+
+    @property
+    def staleness(self):
+        return self.age / self.ttl if self.ttl else float("inf")
+
+    # 오래될수록, 많이 볼수록 먼저 (한 번도 안 본 항목도 남는 예산으로 갱신)
+    @property
+    def priority(self):
+        return (1.0 + self.popularity) * self.staleness
+
+
+def popularity(access, key, now):
+    count, last = access.get(key, (0, 0))
+    return count * 0.5 ** ((now - last) / (HALF_LIFE_DAYS * 86400))
+
+
+# ✅ 공유 캐시 항목 후보 (parts가 없는 예전 항목은 다시 부를 수 없어 건너뜀)
+def cache_candidates(now, access, report):
+    candidates = []
+    for key, namespace, saved_at, parts in shared_cache.iter_entries(REFRESH_NAMESPACES):
+        wrapper = registry.get(namespace)
+        if wrapper is None or parts is None:
+            report["unrefreshable"] += 1
+            continue
+        report["entries"] += 1
+        ttl = wrapper.ttl or shared_cache.ttl
+        if now - saved_at < ttl * REFRESH_AT:
+            continue
+        candidates.append(Candidate(namespace, key, now - saved_at, ttl, popularity(access, key, now),
+                                    CALL_COST.get(namespace, 1), parts))
+    return candidates
+
+
+def _load_tourist_state():
+    try:
+        with open(TOURIST_STATE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# ✅ 관광지 CSV 행 후보 (갱신 기록이 없으면 CSV 파일 수정 시각을 기준으로)
+def tourist_candidates(now, access, report, path=TOURIST_PLACES_PATH):
+    state = _load_tourist_state()
+    file_time = os.path.getmtime(path)
+    ids = pd.read_csv(path, encoding="utf-8-sig", dtype=str)['콘텐츠ID'].dropna()
+    candidates = []
+    for content_id in ids:
+        report["entries"] += 1
+        age = now - state.get(content_id, file_time)
+        if age < TOURIST_TTL * REFRESH_AT:
+            continue
+        key = f"tourist:{content_id}"
+        candidates.append(Candidate("tourist", key, age, TOURIST_TTL, popularity(access, key, now), 1,
+                                    {"contentId": content_id}))
+    return candidates
+
+
+# ✅ 예산 안에서 우선순위 순으로 고르기
+def plan(candidates, budget):
+    chosen, spent = [], 0
+    for c in sorted(candidates, key=lambda c: c.priority, reverse=True):
+        if spent + c.cost > budget:
+            continue
+        chosen.append(c)
+        spent += c.cost
+    return chosen, spent
+
+
+# ✅ 외부 API 호출 수 세기 (실제로 쓴 예산)
+class RequestCounter:
+    def __init__(self):
+        self.calls = 0
+        self._original = None
+
+    def __enter__(self):
+        self._original = original = requests.sessions.Session.request
+
+        def request(session, method, url, *args, **kwargs):
+            if url.startswith(UPSTREAMS):
+                self.calls += 1
+            return original(session, method, url, *args, **kwargs)
+
+        requests.sessions.Session.request = request
+        return self
+
+    def __exit__(self, *exc):
+        requests.sessions.Session.request = self._original
+
+
+def refresh_cache_entry(c, keys):
+    wrapper = registry[c.kind]
+    kwargs = dict(c.parts)
+    for name in wrapper.ignore:
+        kwargs[name] = REQUEST_TIMEOUT if name == "timeout" else keys.get(name)
+    value = wrapper.uncached(**kwargs)
+    if not value:
+        return False   # 일시적 오류일 수 있으니 예전 값을 그대로 둔다
+    shared_cache.put(c.kind, c.parts, value)
+    return True
+
+
+def fetch_tourist_detail(content_id, tour_key):
+    params = {
+        "serviceKey": tour_key,
+        "MobileOS": "ETC",
+        "MobileApp": "MatTour",
+        "contentId": content_id,
+        "_type": "json",
+    }
+    data = requests.get(TOUR_DETAIL_URL, params=params, timeout=REQUEST_TIMEOUT).json()
+    items = data.get('response', {}).get('body', {}).get('items') or {}
+    item = items.get('item') or []
+    return item[0] if item else None
+
+
+# ✅ 관광지 행 갱신 (바뀐 행만 CSV에 다시 쓴다)
+def refresh_tourist_rows(chosen, tour_key, report, path=TOURIST_PLACES_PATH):
+    if not chosen:
+        return
+    df = pd.read_csv(path, encoding="utf-8-sig", dtype=str)
+    state = _load_tourist_state()
+    columns = {'관광지명': 'title', '주소': 'addr1', '위도': 'mapy', '경도': 'mapx',
+               '전화번호': 'tel', '카테고리': 'cat3', '관광지코드': 'contenttypeid'}
+    changed = False
+    for c in chosen:
+        content_id = c.parts["contentId"]
+        try:
+            item = fetch_tourist_detail(content_id, tour_key)
+        except (requests.RequestException, ValueError):
+            report["failed"]["tourist"] = report["failed"].get("tourist", 0) + 1
+            continue
+        if item is None:
+            # 관광공사 목록에서 빠진 곳 (폐업·삭제) - 행은 남기고 보고만 한다
+            report["missing"].append(content_id)
+            continue
+        row = df['콘텐츠ID'] == content_id
+        for col, source in columns.items():
+            value = item.get(source)
+            if value not in (None, "") and (df.loc[row, col] != str(value)).any():
+                df.loc[row, col] = str(value)
+                changed = True
+        state[content_id] = time.time()
+        report["refreshed"]["tourist"] = report["refreshed"].get("tourist", 0) + 1
+
+    if changed:
+        tmp_path = path + ".tmp"
+        df.to_csv(tmp_path, index=False, encoding="utf-8-sig")
+        os.replace(tmp_path, path)
+    os.makedirs(os.path.dirname(TOURIST_STATE_PATH), exist_ok=True)
+    with open(TOURIST_STATE_PATH, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+
+def run_once(budget, keys, dry_run=False, include_tourist=True):
+    now = time.time()
+    access_log.flush()
+    access = access_log.snapshot()
+    report = {
+        "started_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "budget": budget, "entries": 0, "unrefreshable": 0, "stale": 0,
+        "planned": 0, "planned_cost": 0, "calls": 0,
+        "refreshed": {}, "failed": {}, "missing": [], "deferred": 0,
+    }
+    candidates = cache_candidates(now, access, report)
+    if include_tourist and keys.get("tour_key"):
+        candidates += tourist_candidates(now, access, report)
+    report["stale"] = len(candidates)
+
+    chosen, cost = plan(candidates, budget)
+    report["planned"], report["planned_cost"] = len(chosen), cost
+    report["deferred"] = len(candidates) - len(chosen)
+    if dry_run:
+        report["preview"] = [{"kind": c.kind, "key": c.key, "age_days": round(c.age / 86400, 1),
+                              "popularity": round(c.popularity, 2), "cost": c.cost}
+                             for c in chosen[:20]]
+        return report
+
+    with RequestCounter() as counter:
+        for c in chosen:
+            if c.kind == "tourist":
+                continue
+            try:
+                ok = refresh_cache_entry(c, keys)
+            except (requests.RequestException, ValueError, KeyError):
+                ok = False
+            bucket = report["refreshed"] if ok else report["failed"]
+            bucket[c.kind] = bucket.get(c.kind, 0) + 1
+        refresh_tourist_rows([c for c in chosen if c.kind == "tourist"], keys.get("tour_key"), report)
+    report["calls"] = counter.calls
+    return report
+
+
+def print_report(report):
+    print(f"[{report['started_at']}] 항목 {report['entries']}개 중 갱신 대상 {report['stale']}개, "
+          f"예산 {report['budget']}회 중 {report['calls']}회 사용 (계획 {report['planned_cost']}회)")
+    for kind in sorted(set(report["refreshed"]) | set(report["failed"])):
+        print(f"  {kind:<14} 갱신 {report['refreshed'].get(kind, 0):>5}  실패 {report['failed'].get(kind, 0):>4}")
+    if report["deferred"]:
+        print(f"  예산 부족으로 다음으로 미룸: {report['deferred']}개")
+    if report["unrefreshable"]:
+        print(f"  인자 기록이 없어 갱신할 수 없는 예전 항목: {report['unrefreshable']}개")
+    if report["missing"]:
+        print(f"  관광공사 목록에서 사라진 콘텐츠ID: {', '.join(report['missing'])}")
+    for p in report.get("preview", []):
+        print(f"  - {p['kind']:<14} {p['age_days']:>6}일 인기 {p['popularity']:>6} 비용 {p['cost']} {p['key']}")
+
+
+def seconds_until(hhmm, now=None):
+    now = now or datetime.datetime.now()
+    hour, minute = map(int, hhmm.split(":"))
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += datetime.timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="공유 캐시·관광지 데이터 증분 갱신")
+    parser.add_argument("--budget", type=int, default=500, help="한 번 실행에 쓸 최대 API 호출 수")
+    parser.add_argument("--dry-run", action="store_true", help="갱신하지 않고 계획만 출력")
+    parser.add_argument("--no-tourist", action="store_true", help="tourist_places.csv 행은 건너뜀")
+    parser.add_argument("--loop", action="store_true", help="매일 --at 시각에 반복 실행")
+    parser.add_argument("--at", default="03:00", help="--loop 실행 시각 (HH:MM)")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    keys = {"api_key": os.getenv("Google_key"), "kakao_key": os.getenv("KAKAO_KEY"),
+            "tour_key": os.getenv("TOUR_KEY")}
+    while True:
+        if args.loop:
+            time.sleep(seconds_until(args.at))
+        report = run_once(args.budget, keys, dry_run=args.dry_run, include_tourist=not args.no_tourist)
+        print_report(report)
+        if not args.dry_run:
+            os.makedirs(os.path.dirname(REPORT_PATH), exist_ok=True)
+            with open(REPORT_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(report, ensure_ascii=False) + "\n")
+        if not args.loop:
+            return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import datetime
+import textwrap
+import threading
+import multiprocessing as mp
+from collections import Counter
+
+from datasets import load_food_places
+from shared_cache import shared_cache
+from deadline import map_within
+
+# ✅ 리뷰 요약·키워드 일괄 계산 (오프라인)
+# 공유 캐시에 쌓인 리뷰 원문(get_reviews의 "reviews" 네임스페이스)을 가게별로 모아
+# 프로세스 풀에서 키워드·메뉴 언급·긍부정 점수·짧은 리뷰 문구를 미리 계산하고 place_id별로 저장한다.
+# 카드는 저장된 요약만 읽어 그리므로 화면을 그릴 때 리뷰를 다시 부르거나 자르지 않는다.
+#   python review_summaries.py --workers 4
+#   python review_summaries.py --full        # 리뷰가 그대로인 가게도 다시 계산
+SUMMARY_PATH = os.path.join("data", "cache", "review_summaries.json")
+REVIEW_NAMESPACES = ("reviews",)
+TOP_KEYWORDS = 8
+TOP_MENUS = 5
+SNIPPETS = 3
+SNIPPET_WIDTH = 80
+
+# 조사·어미: 길이가 긴 것부터 한 번만 떼어낸다 (남는 말이 두 글자 이상일 때만)
+JOSA = sorted(["은", "는", "이", "가", "을", "를", "에", "의", "도", "로", "와", "과", "만", "랑",
+               "에서", "으로", "이랑", "까지", "부터", "보다", "처럼", "에도", "에는", "이나", "하고"],
+              key=len, reverse=True)
+# 서술어로 끝나는 말은 키워드에서 뺀다
+PREDICATE_ENDINGS = ("어요", "아요", "해요", "네요", "에요", "예요", "니다", "었다", "았다", "했다", "해서",
+                     "하게", "하는", "는데", "지만", "으면", "어서", "아서", "었어", "았어", "했어", "거든",
+                     "였다", "습니", "겠어", "하다", "한데", "해도", "할게", "려고")
+STOPWORDS = {"정말", "너무", "진짜", "그냥", "완전", "아주", "조금", "많이", "다시", "여기", "이곳", "저희",
+             "우리", "사람", "가게", "음식", "식당", "맛집", "방문", "주문", "메뉴", "그리고", "하지만", "그래서",
+             "근데", "먹었", "있는", "없는", "같은", "이번", "다음", "생각", "정도", "제주", "제주도", "때문",
+             "오늘", "처음", "먹고", "먹을", "가서", "갔는데", "있어서", "입니다", "합니다", "있습니다"}
+MENU_SUFFIXES = ("국수", "국밥", "찌개", "전골", "해장국", "구이", "고기", "갈비", "냉면", "칼국수", "볶음",
+                 "튀김", "만두", "덮밥", "비빔밥", "정식", "백반", "커피", "라떼", "케이크", "빙수", "회", "탕",
+                 "면", "밥", "빵", "전", "찜", "조림", "피자", "파스타", "버거", "초밥", "돈까스")
+POSITIVE = ("맛있", "맛나", "친절", "최고", "추천", "깔끔", "좋", "훌륭", "만족", "신선", "푸짐", "재방문",
+            "또 가", "또가", "감동", "존맛", "강추", "든든", "부드럽", "쫄깃", "고소")
+NEGATIVE = ("별로", "불친절", "비싸", "실망", "최악", "느리", "더럽", "불편", "아쉽", "비추", "짜다", "짰",
+            "싱겁", "질기", "불쾌", "위생", "오래 기다", "다신", "다시는")
+
+_menus = None
+
+
+# ✅ 메뉴 사전: 전국맛집 음식종류·대표메뉴 (띄어쓰기·쉼표로 나눈 두 글자 이상 말)
+def menu_vocabulary():
+    try:
+        food = load_food_places()
+    except (OSError, ValueError):
+        return set()
+    words = set()
+    for text in food['음식종류'].dropna().tolist() + food['대표메뉴'].dropna().tolist():
+        words.update(w for w in re.split(r"[\s,/()·&+]+", str(text)) if len(w) >= 2 and re.fullmatch(r"[가-힣]+", w))
+    return words
+
+
+def _init_worker(menus):
+    global _menus
+    _menus = menus
+
+
+def strip_josa(token):
+    for suffix in JOSA:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+            return token[:-len(suffix)]
+    return token
+
+
+def tokens(text):
+    # 서술어("맛있어요", "길지만")는 조사를 떼기 전에 거른다
+    return [strip_josa(t) for t in re.findall(r"[가-힣]{2,}", text or "") if not t.endswith(PREDICATE_ENDINGS)]
+
+
+def is_menu(token, menus):
+    return token in menus or (len(token) >= 2 and token.endswith(MENU_SUFFIXES))
+
+
+def is_keyword(token):
+    return (len(token) >= 2 and token not in STOPWORDS and not token.endswith(PREDICATE_ENDINGS)
+            and not any(token.startswith(w) for w in POSITIVE + NEGATIVE))
+
+
+# ✅ 긍부정: 리뷰 평점(1~5 → -1~1)과 단어 사전 점수를 평균
+def review_sentiment(review):
+    text = review.get('text') or ""
+    pos = sum(text.count(w) for w in POSITIVE)
+    neg = sum(text.count(w) for w in NEGATIVE)
+    scores = []
+    if pos + neg:
+        scores.append((pos - neg) / (pos + neg))
+    rating = review.get('rating')
+    if isinstance(rating, (int, float)):
+        scores.append((rating - 3) / 2)
+    return sum(scores) / len(scores) if scores else None
+
+
+def sentiment_label(score):
+    if score is None:
+        return "정보 없음"
+    return "긍정" if score >= 0.3 else "부정" if score <= -0.3 else "보통"
+
+
+# ✅ 카드에 그대로 넣을 짧은 리뷰 {"author", "rating", "text"}
+def snippet(review):
+    return {"author": review.get('author_name', '익명'), "rating": review.get('rating', ''),
+            "text": textwrap.shorten(review.get('text', ''), width=SNIPPET_WIDTH, placeholder='…')}
+
+
+def fingerprint(reviews):
+    raw = json.dumps(sorted((r.get('author_name', ''), r.get('time', 0), r.get('text', '')) for r in reviews),
+                     ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+# ✅ 가게 하나 요약 (워커 프로세스에서 실행)
+def summarize(item):
+    place_id, reviews = item
+    menus = _menus if _menus is not None else set()
+    keywords, menu_mentions, scores = Counter(), Counter(), []
+    for review in reviews:
+        words = tokens(review.get('text'))
+        menu_mentions.update(w for w in words if is_menu(w, menus))
+        keywords.update(w for w in set(words) if is_keyword(w))   # 같은 리뷰 안의 반복은 한 번만
+        score = review_sentiment(review)
+        if score is not None:
+            scores.append(score)
+
+    ratings = [r['rating'] for r in reviews if isinstance(r.get('rating'), (int, float))]
+    sentiment = round(sum(scores) / len(scores), 2) if scores else None
+    # 대표 리뷰: 글이 있는 리뷰 중 평점 높은 순 (같으면 긴 글 먼저)
+    ranked = sorted((r for r in reviews if (r.get('text') or "").strip()),
+                    key=lambda r: (-(r.get('rating') or 0), -len(r.get('text') or "")))
+    return place_id, {
+        "review_count": len(reviews),
+        "avg_rating": round(sum(ratings) / len(ratings), 2) if ratings else None,
+        "sentiment": sentiment,
+        "sentiment_label": sentiment_label(sentiment),
+        "keywords": [[w, n] for w, n in keywords.most_common(TOP_KEYWORDS)],
+        "menus": [[w, n] for w, n in menu_mentions.most_common(TOP_MENUS)],
+        "snippets": [snippet(r) for r in ranked[:SNIPPETS]],
+        "fingerprint": fingerprint(reviews),
+        "computed_at": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+# ✅ 캐시된 리뷰를 place_id별로 모으기 (max_reviews가 다른 항목은 합치고 같은 리뷰는 한 번만)
+def collect_reviews(cache=shared_cache):
+    grouped = {}
+    for _, _, _, parts, value in cache.iter_values(REVIEW_NAMESPACES):
+        if not parts or not parts.get("place_id") or not isinstance(value, list):
+            continue
+        reviews = grouped.setdefault(parts["place_id"], {})
+        for review in value:
+            reviews.setdefault((review.get('author_name'), review.get('time'), review.get('text')), review)
+    return {place_id: list(reviews.values()) for place_id, reviews in grouped.items()}
+
+
+def load_summaries(path=SUMMARY_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_summaries(summaries, path=SUMMARY_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(summaries, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def run(workers=None, full=False, path=SUMMARY_PATH):
+    start = time.perf_counter()
+    summaries = {} if full else load_summaries(path)
+    collected = collect_reviews()
+    # 리뷰 묶음이 지난번과 같으면 다시 계산하지 않는다
+    todo = [(place_id, reviews) for place_id, reviews in collected.items()
+            if full or summaries.get(place_id, {}).get("fingerprint") != fingerprint(reviews)]
+    if todo:
+        workers = workers or os.cpu_count() or 1
+        with mp.Pool(workers, initializer=_init_worker, initargs=(menu_vocabulary(),)) as pool:
+            for place_id, summary in pool.imap_unordered(summarize, todo, chunksize=16):
+                summaries[place_id] = summary
+        save_summaries(summaries, path)
+    return {"places": len(collected), "computed": len(todo), "stored": len(summaries),
+            "seconds": round(time.perf_counter() - start, 2)}
+
+
+# ✅ 화면용: 요약 파일이 바뀌었을 때만 다시 읽는다
+_loaded = {"mtime": None, "summaries": {}}
+
+
+def summary_for(place_id, path=SUMMARY_PATH):
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return _loaded["summaries"].get(place_id)
+    if mtime != _loaded["mtime"]:
+        _loaded["summaries"], _loaded["mtime"] = load_summaries(path), mtime
+    return _loaded["summaries"].get(place_id)
+
+
+# ✅ 검색 직후 Top 5 카드용: 요약이 아직 없는 가게의 리뷰를 받아 바로 요약해 파일에 더한다
+# 일괄 작업은 이미 "reviews" 캐시에 있는 가게만 보므로, 카드를 처음 그릴 때 빈 요약이 되지 않게 한다.
+# fetch_reviews(place_id) → 리뷰 목록 (앱의 캐시된 get_reviews). budget초 안에 끝난 것은 바로 저장하고
+# 늦은 것은 백그라운드에서 마저 받아 저장한다 (다음 rerun부터 카드에 보임).
+_merge_lock = threading.Lock()
+
+
+def _merge_summaries(results, path=SUMMARY_PATH):
+    results = [r for r in results if r is not None]
+    if not results:
+        return
+    with _merge_lock:
+        if not shared_cache.use_disk:
+            # 디스크 캐시를 끈 실행(부하 테스트 등)은 요약 파일을 건드리지 않고 이 프로세스에만 둔다
+            _loaded["summaries"] = {**_loaded["summaries"], **dict(results)}
+            return
+        summaries = load_summaries(path)
+        summaries.update(results)
+        save_summaries(summaries, path)
+
+
+def warm_summaries(place_ids, fetch_reviews, budget=1.0, path=SUMMARY_PATH):
+    # 예전에 저장된 리뷰 0건 요약도 없는 것으로 보고 다시 받는다
+    todo = [p for p in dict.fromkeys(place_ids) if p and not (summary_for(p, path) or {}).get("review_count")]
+    if not todo:
+        return 0
+    if _menus is None:
+        _init_worker(menu_vocabulary())
+    # 리뷰를 못 받았거나(오류) 아직 없는 가게는 요약을 남기지 않는다 - review_count 0 요약이 한 번 저장되면
+    # summary_for가 계속 찾아내 다시 받지 않으므로, 다음 검색에서 다시 시도하게 둔다
+    def task(place_id):
+        reviews = fetch_reviews(place_id)
+        return summarize((place_id, reviews)) if reviews else None
+
+    results, pending = map_within(task, todo, budget, on_complete=lambda done: _merge_summaries(done, path))
+    if pending:
+        _merge_summaries(results, path)
+    return len(todo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="캐시된 리뷰로 가게별 요약·키워드 일괄 계산")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--full", action="store_true", help="리뷰가 바뀌지 않은 가게도 다시 계산")
+    parser.add_argument("--out", default=SUMMARY_PATH)
+    args = parser.parse_args(argv)
+
+    report = run(args.workers, args.full, args.out)
+    print(f"리뷰가 있는 가게 {report['places']}곳 중 {report['computed']}곳 계산, "
+          f"저장된 요약 {report['stored']}곳 ({report['seconds']}초) → {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
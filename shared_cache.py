@@ -0,0 +1,337 @@
+import os
+import json
+import atexit
+import time
+import hashlib
+import inspect
+import threading
+import functools
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:  # Windows: 파일 잠금 없이 프로세스 내부 캐시만 사용
+    fcntl = None
+
+# ✅ 세션 간 공유 캐시
+# Streamlit은 한 서버 프로세스 안에서 모든 브라우저 세션이 모듈을 공유하므로,
+# 모듈 전역 캐시 하나로 같은 검색을 여러 사용자가 재사용할 수 있다.
+# 디스크 저장소(파일 + flock)를 켜면 여러 서버 프로세스끼리도 결과를 공유한다.
+CACHE_DIR = os.path.join("data", "cache", "shared")
+ACCESS_PATH = os.path.join("data", "cache", "access.json")
+DEFAULT_TTL = 6 * 60 * 60
+ACCESS_FLUSH_EVERY = 100      # 조회 100번마다
+ACCESS_FLUSH_SECONDS = 60     # 또는 60초마다 디스크에 합친다
+# 메모리 캐시 상한 - 넘치면 가장 오래 안 쓴 항목부터 버리고(LRU), TTL이 지난 항목은 주기적으로 지운다
+MAX_MEMORY_ENTRIES = int(os.getenv("SHARED_CACHE_MAX_ENTRIES", "5000"))
+PRUNE_SECONDS = 60
+
+# 네임스페이스 → @cached 함수 (refresh_daemon.py가 다시 불러올 때 사용)
+registry = {}
+
+
+# ✅ 캐시 키별 조회 횟수·마지막 조회 시각
+# 메모리에 모았다가 가끔 access.json에 더한다(여러 프로세스는 flock으로 순서대로 합침).
+class AccessLog:
+    def __init__(self, path=ACCESS_PATH, enabled=True):
+        self.path = path
+        self.enabled = enabled
+        self._pending = {}
+        self._count = 0
+        self._flushed_at = time.time()
+        self._lock = threading.Lock()
+
+    def record(self, key):
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            count, _ = self._pending.get(key, (0, now))
+            self._pending[key] = (count + 1, now)
+            self._count += 1
+            due = self._count >= ACCESS_FLUSH_EVERY or now - self._flushed_at >= ACCESS_FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    def _read(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._count = 0
+            self._flushed_at = time.time()
+        if not pending:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path + ".lock", "w") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            data = self._read()
+            for key, (count, last) in pending.items():
+                old_count, old_last = data.get(key, (0, 0))
+                data[key] = (old_count + count, max(old_last, last))
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+
+    # {키: (조회 횟수, 마지막 조회 시각)} - 아직 안 쓴 것까지 포함
+    def snapshot(self):
+        data = self._read()
+        with self._lock:
+            for key, (count, last) in self._pending.items():
+                old_count, old_last = data.get(key, (0, 0))
+                data[key] = (old_count + count, max(old_last, last))
+        return data
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SharedCache:
+    def __init__(self, cache_dir=CACHE_DIR, ttl=DEFAULT_TTL, use_disk=True, access_log=None,
+                 max_entries=MAX_MEMORY_ENTRIES):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.use_disk = use_disk
+        self.access_log = access_log
+        self.max_entries = max_entries
+        self._memory = OrderedDict()    # 키 → (저장 시각, 값, 만료 시각), 최근에 쓴 항목이 뒤
+        self._pruned_at = time.time()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0}
+
+    def _bump(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    # ✅ 메모리 조회 (self._lock 안에서 호출) - TTL이 지났으면 None, 적중하면 LRU 맨 뒤로
+    def _memory_get(self, key, ttl):
+        hit = self._memory.get(key)
+        if hit is None:
+            return None
+        now = time.time()
+        if now > hit[2]:
+            del self._memory[key]
+            return None
+        if now - hit[0] > ttl:
+            return None
+        self._memory.move_to_end(key)
+        return hit
+
+    # ✅ 메모리 저장 (self._lock 안에서 호출) - 만료 시각은 처음 저장한 시각 + 네임스페이스 TTL
+    # 디스크에서 읽어 온 값은 saved_at으로 디스크 저장 시각을 넘겨 메모리에서 TTL을 새로 시작하지 않게 한다
+    def _memory_put(self, namespace, key, value, ttl=None, saved_at=None):
+        now = time.time()
+        if ttl is None:
+            wrapper = registry.get(namespace)
+            ttl = wrapper.ttl if wrapper is not None and wrapper.ttl else self.ttl
+        saved_at = now if saved_at is None else saved_at
+        self._memory[key] = (saved_at, value, saved_at + ttl)
+        self._memory.move_to_end(key)
+        if now - self._pruned_at >= PRUNE_SECONDS:
+            self._pruned_at = now
+            for expired in [k for k, (_, _, expires_at) in self._memory.items() if now > expires_at]:
+                del self._memory[expired]
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    # ✅ 캐시 키 (네임스페이스 + 인자 → sha1)
+    @staticmethod
+    def make_key(namespace, parts):
+        raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+        return f"{namespace}-{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+    def _path(self, key):
+        namespace, digest = key.split("-", 1)
+        return os.path.join(self.cache_dir, namespace, digest[:2], key + ".json")
+
+    def _read_disk(self, key, ttl):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry["saved_at"] > ttl:
+            return None
+        return entry
+
+    # parts도 같이 남겨 두면 refresh_daemon.py가 같은 인자로 다시 받아올 수 있다
+    def _write_disk(self, key, value, parts=None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"saved_at": time.time(), "parts": parts, "value": value}, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+
+    # ✅ 프로세스 간 singleflight: 같은 키를 처음 잡은 프로세스만 API를 부르고
+    # 나머지는 잠금이 풀릴 때까지 기다렸다가 디스크에서 읽는다. → (값, 디스크 저장 시각 또는 새로 받았으면 None)
+    def _fetch_with_file_lock(self, key, ttl, fetch, cache_empty, parts=None):
+        if not (self.use_disk and fcntl):
+            return fetch(), None
+
+        lock_path = self._path(key) + ".lock"
+        os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        with open(lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                entry = self._read_disk(key, ttl)
+                if entry is not None:
+                    self._bump("disk_hits")
+                    return entry["value"], entry["saved_at"]
+                value = fetch()
+                if value or cache_empty:
+                    self._write_disk(key, value, parts)
+                return value, None
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get(self, namespace, parts, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        key = self.make_key(namespace, parts)
+        if self.access_log:
+            self.access_log.record(key)
+        with self._lock:
+            hit = self._memory_get(key, ttl)
+        if hit:
+            return hit[1]
+        if self.use_disk:
+            entry = self._read_disk(key, ttl)
+            if entry is not None:
+                return entry["value"]
+        return None
+
+    # ✅ 캐시 조회 → 없으면 fetch() 한 번만 실행 (진행 중인 같은 요청은 합류해서 대기)
+    def get_or_fetch(self, namespace, parts, fetch, ttl=None, cache_empty=False):
+        ttl = self.ttl if ttl is None else ttl
+        key = self.make_key(namespace, parts)
+        if self.access_log:
+            self.access_log.record(key)
+
+        with self._lock:
+            hit = self._memory_get(key, ttl)
+            if hit:
+                self.stats["memory_hits"] += 1
+                return hit[1]
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._inflight[key] = call
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            if self.use_disk:
+                entry = self._read_disk(key, ttl)
+            else:
+                entry = None
+            if entry is not None:
+                self._bump("disk_hits")
+                call.value, saved_at = entry["value"], entry["saved_at"]
+            else:
+                self._bump("misses")
+                call.value, saved_at = self._fetch_with_file_lock(key, ttl, fetch, cache_empty, parts)
+            if call.value or cache_empty:
+                with self._lock:
+                    self._memory_put(namespace, key, call.value, ttl, saved_at)
+            return call.value
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.done.set()
+
+    # ✅ 새 값으로 덮어쓰기 (갱신 작업용)
+    def put(self, namespace, parts, value):
+        key = self.make_key(namespace, parts)
+        with self._lock:
+            self._memory_put(namespace, key, value)
+        if self.use_disk:
+            self._write_disk(key, value, parts)
+
+    # ✅ 디스크에 저장된 항목 훑기 → (키, 네임스페이스, 저장 시각, parts)
+    def iter_entries(self, namespaces=None):
+        for key, namespace, entry in self._iter_disk(namespaces):
+            yield key, namespace, entry["saved_at"], entry.get("parts")
+
+    # ✅ 값까지 훑기 (TTL과 상관없이) → (키, 네임스페이스, 저장 시각, parts, 값) - 일괄 가공 작업용
+    def iter_values(self, namespaces=None):
+        for key, namespace, entry in self._iter_disk(namespaces):
+            yield key, namespace, entry["saved_at"], entry.get("parts"), entry.get("value")
+
+    def _iter_disk(self, namespaces):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for namespace in sorted(os.listdir(self.cache_dir)):
+            if namespaces is not None and namespace not in namespaces:
+                continue
+            for root, _, files in os.walk(os.path.join(self.cache_dir, namespace)):
+                for name in files:
+                    if not name.endswith(".json"):
+                        continue
+                    try:
+                        with open(os.path.join(root, name), encoding="utf-8") as f:
+                            entry = json.load(f)
+                    except (OSError, ValueError):
+                        continue
+                    yield name[:-len(".json")], namespace, entry
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+
+# ✅ 프로세스 전역 인스턴스 (SHARED_CACHE_DISK=0 이면 메모리 전용, 조회 기록도 끔)
+_use_disk = os.getenv("SHARED_CACHE_DISK", "1") != "0"
+access_log = AccessLog(enabled=_use_disk)
+atexit.register(access_log.flush)
+shared_cache = SharedCache(use_disk=_use_disk, access_log=access_log)
+
+
+# ✅ 함수 데코레이터: api_key 같은 인자는 키에서 제외
+def cached(namespace, ttl=None, ignore=("api_key",), cache=None):
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def key_parts(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return {k: v for k, v in bound.arguments.items() if k not in ignore}
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            store = cache or shared_cache
+            return store.get_or_fetch(namespace, key_parts(args, kwargs), lambda: func(*args, **kwargs), ttl=ttl)
+
+        # 캐시에 있는 값만 조회 (없으면 None, API는 부르지 않음)
+        def peek(*args, **kwargs):
+            return (cache or shared_cache).get(namespace, key_parts(args, kwargs), ttl=ttl)
+
+        wrapper.uncached = func
+        wrapper.peek = peek
+        wrapper.namespace = namespace
+        wrapper.ttl = ttl
+        wrapper.ignore = ignore
+        registry[namespace] = wrapper
+        return wrapper
+    return decorator
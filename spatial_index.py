@@ -0,0 +1,98 @@
+import math
+import numpy as np
+
+from ranking import haversine_np
+
+# ✅ 격자 공간 인덱스
+# 위경도를 cell_deg 크기의 격자 칸으로 나눠 칸 → 점 번호 배열을 저장한다.
+# 반경/사각형/최근접 질의는 겹치는 칸만 꺼내서 정확한 거리로 한 번 더 거른다.
+CELL_DEG = 0.01   # 약 1.1km (위도 기준)
+M_PER_DEG = 111_320.0
+
+
+class GridIndex:
+    def __init__(self, lats, lngs, cell_deg=CELL_DEG):
+        self.lats = np.asarray(lats, dtype=float)
+        self.lngs = np.asarray(lngs, dtype=float)
+        self.cell_deg = cell_deg
+        self.cells = {}
+        valid = ~(np.isnan(self.lats) | np.isnan(self.lngs))
+        rows = np.floor(self.lats / cell_deg).astype(np.int64)
+        cols = np.floor(self.lngs / cell_deg).astype(np.int64)
+        order = np.lexsort((cols, rows))
+        order = order[valid[order]]
+        if len(order):
+            keys = np.stack([rows[order], cols[order]], axis=1)
+            breaks = np.flatnonzero(np.any(np.diff(keys, axis=0) != 0, axis=1)) + 1
+            for chunk in np.split(order, breaks):
+                self.cells[(int(rows[chunk[0]]), int(cols[chunk[0]]))] = chunk
+            self.bounds = (int(rows[order].min()), int(rows[order].max()),
+                           int(cols[order].min()), int(cols[order].max()))
+
+    def __len__(self):
+        return len(self.lats)
+
+    def _cell(self, lat, lng):
+        return math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg)
+
+    def _candidates(self, row_min, row_max, col_min, col_max):
+        # 범위가 넓으면 칸을 일일이 도는 것보다 저장된 칸을 훑는 게 빠르다
+        span = (row_max - row_min + 1) * (col_max - col_min + 1)
+        if span > len(self.cells):
+            chunks = [idx for (r, c), idx in self.cells.items()
+                      if row_min <= r <= row_max and col_min <= c <= col_max]
+        else:
+            chunks = [self.cells[(r, c)] for r in range(row_min, row_max + 1)
+                      for c in range(col_min, col_max + 1) if (r, c) in self.cells]
+        return np.concatenate(chunks) if chunks else np.array([], dtype=np.int64)
+
+    # ✅ 사각형(뷰포트) 안의 점 번호
+    def query_bbox(self, south, west, north, east):
+        r0, c0 = self._cell(south, west)
+        r1, c1 = self._cell(north, east)
+        idx = self._candidates(r0, r1, c0, c1)
+        lat, lng = self.lats[idx], self.lngs[idx]
+        return idx[(lat >= south) & (lat <= north) & (lng >= west) & (lng <= east)]
+
+    # ✅ 반경 안의 점 (가까운 순 번호, 거리)
+    def query_radius(self, lat, lng, radius_m):
+        dlat = radius_m / M_PER_DEG
+        dlng = radius_m / (M_PER_DEG * max(math.cos(math.radians(lat)), 1e-6))
+        r0, c0 = self._cell(lat - dlat, lng - dlng)
+        r1, c1 = self._cell(lat + dlat, lng + dlng)
+        idx = self._candidates(r0, r1, c0, c1)
+        dist = haversine_np(lat, lng, self.lats[idx], self.lngs[idx])
+        keep = dist <= radius_m
+        idx, dist = idx[keep], dist[keep]
+        order = np.argsort(dist, kind="stable")
+        return idx[order], dist[order]
+
+    # ✅ k-최근접 (mask로 후보 제한 가능) - 칸 고리를 넓혀가며 찾는다
+    def knn(self, lat, lng, k, mask=None, max_radius_m=None):
+        if k <= 0 or not self.cells:
+            return np.array([], dtype=np.int64), np.array([])
+        r, c = self._cell(lat, lng)
+        row_min, row_max, col_min, col_max = self.bounds
+        max_ring = max(abs(r - row_min), abs(r - row_max), abs(c - col_min), abs(c - col_max))
+        ring = 0
+        while True:
+            idx = self._candidates(r - ring, r + ring, c - ring, c + ring)
+            if mask is not None:
+                idx = idx[mask[idx]]
+            dist = haversine_np(lat, lng, self.lats[idx], self.lngs[idx])
+            # ring 칸 안에 있는 점은 ring × 칸 크기(경도 방향은 cos 보정)보다 가까운 것만 확정
+            safe = ring * self.cell_deg * M_PER_DEG * max(math.cos(math.radians(abs(lat) + (ring + 1) * self.cell_deg)), 1e-6)
+            if (np.count_nonzero(dist <= safe) >= k) or ring >= max_ring:
+                break
+            if max_radius_m is not None and safe >= max_radius_m:
+                break
+            ring = max(1, ring * 2)
+        if max_radius_m is not None:
+            keep = dist <= max_radius_m
+            idx, dist = idx[keep], dist[keep]
+        k = min(k, len(idx))
+        if k == 0:
+            return np.array([], dtype=np.int64), np.array([])
+        part = np.argpartition(dist, k - 1)[:k]
+        order = part[np.argsort(dist[part], kind="stable")]
+        return idx[order], dist[order]
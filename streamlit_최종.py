@@ -4,85 +4,65 @@ import requests
 import time
 import os
 import re
+import datetime
+import functools
 import io
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import streamlit.components.v1 as components
 from dotenv import load_dotenv
-from math import radians, sin, cos, sqrt, atan2
+from geocode_cache import geocode as get_lat_lng, place_lat_lng
+from shared_cache import cached, shared_cache
+from place_details import get_place_details, get_kakao_place_id
+from ranking import rank_dataframe, rank_places, haversine_np
+from itinerary import plan_itinerary
+from datasets import load_tourist_places, CONTENT_TYPES
+from export import FORMATS, build_export, export_file_name, export_mime
+from analytics import food_cube
+from place_records import to_place_records
+from photo_cache import get_photo, cached_photo
+from federated import federated_nearby, cached_federated_nearby
+from crosswalk import crosswalk
+from kakao_map import MarkerLayer, kakao_map, restaurant_markers, tourist_markers
+from density import density_grid
+import offline
+from near_me import near_me_index
+from facets import tourist_facets
+from autocomplete import autocomplete_input
+from deadline import PartialResult, map_within
+from compare import compare_regions, parse_regions, MAX_REGIONS
+from rate_limit import RateLimiter, install as install_rate_limit
+from profiler import phase, start_rerun, finish_rerun
 
 load_dotenv()
 google_key = os.getenv("Google_key")
 kakao_key = os.getenv("KAKAO_KEY")
 
-# ✅ 좌표 거리 계산
-def haversine(lat1, lon1, lat2, lon2):
-    R = 6371e3
-    phi1, phi2 = radians(lat1), radians(lat2)
-    dphi = radians(lat2 - lat1)
-    dlambda = radians(lon2 - lon1)
-    a = sin(dphi/2)**2 + cos(phi1)*cos(phi2)*sin(dlambda/2)**2
-    return 2 * R * atan2(sqrt(a), sqrt(1-a))
-
-# ✅ 구글 Place Details API → 전화번호 가져오기
-def get_place_details(place_id, api_key):
-    url = "https://maps.googleapis.com/maps/api/place/details/json"
-    params = {
-        "place_id": place_id,
-        "fields": "name,formatted_address,formatted_phone_number",
-        "language": "ko",
-        "key": api_key
-    }
-    res = requests.get(url, params=params).json()
-    return res.get("result", {})
-
-# ✅ Kakao place_id 가져오기
-def get_kakao_place_id(name, lat, lng, kakao_key, address="", phone=None):
-    url = "https://dapi.kakao.com/v2/local/search/keyword.json"
-    headers = {"Authorization": f"KakaoAK {kakao_key}"}
-
-    queries = []
-    if phone:
-        queries.append(phone)
-
-    korean = re.sub(r"[^가-힣]", "", name)
-    region = ""
-    if "시" in address:
-        region = address.split("시")[0] + "시"
-    elif "도" in address:
-        region = address.split("도")[0] + "도"
-
-    if korean:
-        queries.append(f"{region} {korean}")
-    else:
-        queries.append(f"{region} {name}")
-
-    best_doc, best_dist = None, float("inf")
-
-    for q in queries:
-        params = {"query": q, "x": lng, "y": lat, "radius": 300}
-        res = requests.get(url, headers=headers, params=params).json()
+# 외부 API 요청은 이 프로세스 전체가 초당 MATTOUR_API_RATE회를 나눠 쓴다 (0이면 제한 없음)
+# 스크립트는 rerun마다 다시 실행되므로 제한기는 프로세스에 하나만 만든다
+API_RATE = float(os.getenv("MATTOUR_API_RATE", "20"))
 
-        if not res.get("documents"):
-            continue
+@st.cache_resource
+def api_rate_limiter(rate):
+    return install_rate_limit(RateLimiter(rate))
 
-        for d in res["documents"]:
-            dist = haversine(lat, lng, float(d["y"]), float(d["x"]))
-            if dist < best_dist:
-                best_dist = dist
-                best_doc = d
+if API_RATE > 0:
+    api_rate_limiter(API_RATE)
 
-        if best_doc and best_dist < 100:
-            break
+# 주변 맛집 보강(상세정보·카카오 id)을 기다리는 최대 시간(초) - 늦은 가게는 캐시 값/"없음"으로 먼저 보여준다
+NEARBY_BUDGET = float(os.getenv("MATTOUR_NEARBY_BUDGET", "1.5"))
 
-    return best_doc["id"] if best_doc else None
+# 내 주변 찾기 기본값: 제주시청 좌표, 숙박·음식점을 뺀 관광지 유형
+NEAR_ME_DEFAULT = (33.499621, 126.531188)
+NEAR_ME_TYPES = [12, 14, 15, 25, 28, 38]
 
 # ✅ 맛집 데이터 전처리
 def preprocess_restaurant_data(df):
     df['이름'] = df['이름'].astype(str).str.strip()
     df = df[~df['이름'].isin(['-', '없음', '', None])]
     df = df.drop_duplicates(subset='이름')
+    # 평점이 없는 곳(카카오 전용 후보 등)은 남겨 두고 랭킹에서 사전 평균으로 처리한다
     df['평점'] = pd.to_numeric(df['평점'], errors='coerce')
-    df = df.dropna(subset=['평점'])
     df['주소'] = df['주소'].astype(str).str.strip()
     df['주소'] = df['주소'].str.replace(r'^KR, ?', '', regex=True)
     df['주소'] = df['주소'].str.replace(r'^South Korea,?\s*', '', regex=True)
@@ -93,70 +73,122 @@ def preprocess_restaurant_data(df):
     df = df.sort_values(by='평점', ascending=False)
     return df.reset_index(drop=True)
 
-# ✅ 구글 좌표 가져오기
-def get_lat_lng(address, api_key):
-    url = "https://maps.googleapis.com/maps/api/geocode/json"
-    params = {'address': address, 'language': 'ko', 'key': api_key}
-    res = requests.get(url, params=params).json()
-    if res['status'] == 'OK':
-        location = res['results'][0]['geometry']['location']
-        return location['lat'], location['lng']
-    return None, None
-
-# ✅ 구글 주변 맛집 검색 (전화번호 포함)
-def find_nearby_restaurants(lat, lng, api_key):
-    url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-    params = {
-        'location': f'{lat},{lng}',
-        'radius': 2000,
-        'type': 'restaurant',
-        'language': 'ko',
-        'key': api_key
-    }
-    res = requests.get(url, params=params).json()
-    time.sleep(1)
-
-    restaurants = []
-    for r in res.get("results", [])[:15]:
-        name = r.get("name")
-        address = r.get("vicinity")
-        r_lat = r["geometry"]["location"]["lat"]
-        r_lng = r["geometry"]["location"]["lng"]
-
-        place_id_google = r.get("place_id")
-        phone = None
-        if place_id_google:
-            details = get_place_details(place_id_google, api_key)
-            phone = details.get("formatted_phone_number")
-
-        place_id_kakao = get_kakao_place_id(name, r_lat, r_lng, kakao_key, address, phone)
-
-        restaurants.append({
-            "이름": name,
-            "주소": address,
-            "평점": r.get("rating", "없음"),
-            "위도": r_lat,
-            "경도": r_lng,
-            "전화번호": phone if phone else "없음",
-            "place_id": place_id_kakao
-        })
-    return restaurants
+# ✅ 맛집 후보 나누기: 구글(격자 칸) + 카카오(FD6) 합친 후보, 제공자별 최대 15곳
+# 예전에 짝지은 가게는 id 대응표에서 전화번호·카카오 id를 바로 채워 API를 부르지 않는다
+def _split_candidates(candidates):
+    google = [c for c in candidates if c["google_place_id"]][:15]
+    kakao_only = [c for c in candidates if not c["google_place_id"]][:15]
+    store = crosswalk()
+    for c in google:
+        known = store.lookup(google_place_id=c["google_place_id"]) or {}
+        if c["kakao_id"] is None:
+            c["kakao_id"] = known.get("kakao_id")
+        if c["전화번호"] == "없음" and known.get("phone"):
+            c["전화번호"] = known["phone"]
+    return google, kakao_only
+
+
+# ✅ 카카오와 짝이 안 맞은 구글 후보만 전화번호·카카오 id를 따로 찾는다 (원본은 건드리지 않음)
+def _enrich(c, api_key, timeout=None):
+    c = dict(c)
+    if c["전화번호"] == "없음":
+        phone = get_place_details(c["google_place_id"], api_key, timeout=timeout).get("formatted_phone_number")
+        c["전화번호"] = phone if phone else "없음"
+    if c["kakao_id"] is None:
+        phone = c["전화번호"] if c["전화번호"] != "없음" else None
+        c["kakao_id"] = get_kakao_place_id(c["이름"], c["위도"], c["경도"], kakao_key, c["주소"] or "", phone,
+                                           timeout=timeout)
+    return c
+
+
+def _restaurant_rows(candidates):
+    return [{
+        "이름": c["이름"],
+        "주소": c["주소"],
+        "평점": c["평점"] if c["평점"] is not None else "없음",
+        "리뷰수": c["리뷰수"],
+        "위도": c["위도"],
+        "경도": c["경도"],
+        "전화번호": c["전화번호"],
+        "place_id": c["kakao_id"],
+        "google_place_id": c["google_place_id"],
+        "출처": c["출처"]
+    } for c in candidates]
+
+
+# ✅ 구글 주변 맛집 검색 (전화번호 포함) - 보강이 모두 끝난 결과만 캐시에 남는다
+# timeout: 외부 요청 하나의 시간 제한(초, 캐시 키에는 들어가지 않음)
+@cached("nearbysearch", ignore=("api_key", "timeout"))
+def nearby_restaurants(lat, lng, api_key, timeout=None):
+    google, kakao_only = _split_candidates(federated_nearby(lat, lng, 2000, api_key, kakao_key, timeout=timeout))
+    with phase("enrichment"), ThreadPoolExecutor(max_workers=8) as pool:
+        google = list(pool.map(lambda c: _enrich(c, api_key, timeout), google))
+    crosswalk().link_records(google + kakao_only)
+    return _restaurant_rows(google + kakao_only)
+
+
+# ✅ 지연 예산이 있는 주변 맛집 검색
+# 후보 검색(구글 칸·카카오 페이지)부터 보강(상세정보·카카오 id)까지 전체를 nearby_restaurants 하나로
+# 백그라운드에서 돌리고 budget초만 기다린다. 같은 좌표를 여러 세션이 동시에 찾으면 공유 캐시의
+# get_or_fetch가 한 번만 돌린다. 늦으면 그때까지 캐시에 들어온 칸·페이지·상세정보만으로 결과를 만든다:
+# 못 받은 제공자는 빠지고, 전화번호는 지난 상세정보 캐시 값 또는 "없음", 카카오 id는 None.
+# 남은 작업은 끝까지 돌아 완성된 결과를 캐시에 넣는다. 요청 하나는 budget + STRAGGLER_SECONDS초를 넘기지 않는다.
+# 돌려주는 PartialResult.degraded: 필드 → 못 채운 가게 이름들 ("출처" → 빠진 제공자)
+STRAGGLER_SECONDS = 5.0
+PROVIDER_LABELS = {"google": "구글", "kakao": "카카오"}
+
+def find_nearby_restaurants(lat, lng, api_key, budget=None):
+    if budget is None:
+        return nearby_restaurants(lat, lng, api_key)
+
+    timeout = budget + STRAGGLER_SECONDS
+    with phase("nearby_within_budget"):
+        (complete,), pending = map_within(lambda _: nearby_restaurants(lat, lng, api_key, timeout=timeout),
+                                          [None], budget)
+    if complete is not None:
+        return complete
+
+    candidates, missing = cached_federated_nearby(lat, lng, 2000, api_key, kakao_key)
+    google, kakao_only = _split_candidates(candidates)
+    degraded = {"출처": [PROVIDER_LABELS[m] for m in missing]} if missing else {}
+    for i, c in enumerate(google):
+        c = google[i] = dict(c)
+        if c["전화번호"] == "없음":
+            details = get_place_details.peek(c["google_place_id"], api_key)
+            if details is None:
+                degraded.setdefault("전화번호", []).append(c["이름"])
+                details = shared_cache.get("details", {"place_id": c["google_place_id"]}, ttl=float("inf")) or {}
+            c["전화번호"] = details.get("formatted_phone_number") or "없음"
+        if c["kakao_id"] is None:
+            phone = c["전화번호"] if c["전화번호"] != "없음" else None
+            c["kakao_id"] = get_kakao_place_id.peek(c["이름"], c["위도"], c["경도"], kakao_key, c["주소"] or "", phone)
+            if c["kakao_id"] is None:
+                degraded.setdefault("place_id", []).append(c["이름"])
+    return PartialResult(_restaurant_rows(google + kakao_only), degraded, pending, budget)
+
+# ✅ 예산 안에 못 채운 정보 안내 (남은 요청은 백그라운드에서 계속 받아 다음 검색부터 채워진다)
+DEGRADED_LABELS = {"전화번호": "전화번호", "place_id": "카카오맵 링크"}
+
+def display_degraded(restaurants):
+    degraded = getattr(restaurants, "degraded", None)
+    if not degraded:
+        return
+    missing = ", ".join(f"{'·'.join(names)} 검색 결과" if field == "출처" else
+                        f"{DEGRADED_LABELS.get(field, field)} {len(names)}곳" for field, names in degraded.items())
+    st.caption(f"⏳ {restaurants.budget:g}초 안에 받지 못한 정보: {missing} - 저장된 값 또는 '없음'으로 표시했고, 다시 검색하면 채워집니다.")
 
 # ✅ 관광지 검색
+@cached("textsearch")
 def search_places(query, api_key):
     url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
     params = {'query': f"{query} 관광지", 'language': 'ko', 'key': api_key}
     res = requests.get(url, params=params).json()
     return res.get('results', [])
 
-def get_place_photo_url(photo_reference, api_key, maxwidth=400):
-    return f"https://maps.googleapis.com/maps/api/place/photo?maxwidth={maxwidth}&photoreference={photo_reference}&key={api_key}"
-
-# ✅ 관광지 Top 5 표시
-def display_top_attractions(places: list):
-    rated_places = [p for p in places if isinstance(p.get('rating'), (int, float))]
-    rated_places = sorted(rated_places, key=lambda p: p['rating'], reverse=True)
-    top_five = rated_places[:5]
+# ✅ 관광지 Top 5 표시 (사진은 한 번 받으면 photo_cache에 남고, 오프라인 모드는 저장된 사진만 쓴다)
+def display_top_attractions(places: list, offline_mode=False):
+    rated_places = [p for p in places if p.rating is not None]
+    top_five = rank_places(rated_places, k=5)
     if not top_five:
         return
 
@@ -164,34 +196,246 @@ def display_top_attractions(places: list):
     cols = st.columns(len(top_five))
     for idx, place in enumerate(top_five):
         with cols[idx]:
-            st.markdown(f"**{place['name']}**")
-            st.markdown(f"평점: {place['rating']}")
-            photos = place.get('photos')
-            if photos:
-                ref = photos[0].get('photo_reference')
-                if ref:
-                    url = get_place_photo_url(ref, google_key)
-                    try:
-                        resp = requests.get(url)
-                        img = Image.open(io.BytesIO(resp.content))
-                        img = img.resize((300, 200))
-                        st.image(img)
-                    except:
-                        st.image(url, width=300)
+            st.markdown(f"**{place.name}**")
+            st.markdown(f"평점: {place.rating}")
+            photo = cached_photo(place.photo_ref) if offline_mode else get_photo(place.photo_ref, google_key)
+            if photo:
+                try:
+                    st.image(Image.open(io.BytesIO(photo)).resize((300, 200)))
+                except OSError:
+                    pass
+
+# ✅ Kakao 지도 출력 (전화번호 있으면 전화번호 검색, 없으면 주소+가게명 검색)
+# 지도를 움직일 때마다 오는 범위 값은 이 fragment만 다시 실행한다
+@st.fragment
+def display_kakao_map(df, lat, lng):
+    # 추천 맛집 10곳은 고정, 주변 관광지·로컬 맛집 풀은 화면 범위에 따라 나눠 싣는다
+    pinned = restaurant_markers(df.head(10))
+    # 멀리 볼 때(줌 레벨 6 이상)는 맛집 마커 대신 육각형 밀도 오버레이 (관광지 별 마커는 그대로)
+    event = kakao_map(load_marker_layer(), (lat, lng), kakao_key, pinned=pinned, events=True,
+                      density=density_grid())
+    if event:
+        # 지도 클릭·내 위치 → "내 주변 찾기" 좌표로 (다른 구역도 바뀌므로 전체 rerun)
+        st.session_state.near_lat, st.session_state.near_lng = event["lat"], event["lng"]
+        st.session_state.near_me_open = True
+        st.rerun()
+
+# ✅ 지도 마커 레이어 (관광지 CSV + 로컬 맛집 풀) - 프로세스당 한 번만 인덱싱
+@st.cache_resource
+def load_marker_layer():
+    return MarkerLayer(pd.concat([tourist_markers(load_places_csv()),
+                                  restaurant_markers(offline.restaurant_pool(), priority=1.0)],
+                                 ignore_index=True))
+
+# ✅ 관광지 CSV 캐시 로드
+@st.cache_data
+def load_places_csv():
+    return load_tourist_places()
+
+# ✅ 내 주변 찾기: 좌표 하나로 가까운 관광지·맛집 (로컬 인덱스만 사용, API 호출 없음)
+@st.fragment
+def display_near_me():
+    st.session_state.setdefault("near_lat", NEAR_ME_DEFAULT[0])
+    st.session_state.setdefault("near_lng", NEAR_ME_DEFAULT[1])
+    with st.expander("📍 내 주변 찾기 (좌표 · 지도 클릭 · 내 위치)", expanded=st.session_state.get("near_me_open", False)):
+        cols = st.columns(2)
+        lat = cols[0].number_input("위도", format="%.6f", key="near_lat")
+        lng = cols[1].number_input("경도", format="%.6f", key="near_lng")
+        cols = st.columns([2, 2, 1])
+        types = cols[0].multiselect("관광지코드", list(CONTENT_TYPES), default=NEAR_ME_TYPES,
+                                    format_func=lambda c: f"{c} {CONTENT_TYPES[c]}")
+        categories = cols[1].text_input("카테고리 코드 (앞부분, 쉼표로 여러 개)", placeholder="예: A01, A0502")
+        k = cols[2].number_input("개수", min_value=1, max_value=30, value=5)
+        categories = [c.strip().upper() for c in categories.split(",") if c.strip()]
+
+        index = near_me_index()
+        start = time.perf_counter()
+        places = index.nearest_places(lat, lng, k, content_types=types, categories=categories)
+        restaurants = index.nearest_restaurants(lat, lng, k)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        cols = st.columns(2)
+        cols[0].markdown("**🏞 가까운 관광지**")
+        cols[0].dataframe(places[['관광지명', '유형', '카테고리', '주소', '거리(m)']], hide_index=True)
+        cols[1].markdown("**🍽 가까운 맛집**")
+        cols[1].dataframe(restaurants[['이름', '주소', '평점', '거리(m)']], hide_index=True)
+        st.caption(f"로컬 인덱스 조회 {elapsed:.1f} ms · 관광지 {len(index.places)}곳 · 맛집 {len(index.restaurants)}곳")
+
+# ✅ 관광지 분류로 찾기: 지역·유형·카테고리 패싯 (비트셋 인덱스, 항목 옆 숫자는 그 값을 골랐을 때 개수)
+@st.fragment
+def display_place_facets():
+    index = tourist_facets()
+    with st.expander("🏷 관광지 분류로 찾기 (지역 · 유형 · 카테고리)"):
+        selections = {}
+        cols = st.columns(2)
+        for col, facet, title in ((cols[0], "지역코드", "지역"), (cols[1], "관광지코드", "유형")):
+            counts = index.facet_counts(facet, **selections)
+            # 0곳이 된 값도 뒤에 남겨 둔다 (이미 고른 값이 옵션에서 사라지지 않게)
+            options = list(counts.index) + sorted(set(index.bits[facet]) - set(counts.index))
+            selections[facet] = col.multiselect(title, options, key=f"facet_{facet}",
+                                                format_func=lambda k, f=facet, c=counts: f"{index.label(f, k)} ({c.get(k, 0)})")
+
+        # 대분류 → 중분류 → 소분류: 위 단계를 고르면 그 아래 단계만 보여준다
+        parent = None
+        cols = st.columns(3)
+        for col, title in zip(cols, ("대분류", "중분류", "소분류")):
+            counts = index.facet_counts("카테고리", parent=parent, **selections)
+            if parent is not None and counts.empty:
+                break
+            choice = col.selectbox(title, [None] + list(counts.index), key=f"facet_{title}",
+                                   format_func=lambda k, c=counts: "전체" if k is None else f"{index.label('카테고리', k)} ({c.get(k, 0)})")
+            if choice is None:
+                break
+            parent = choice
+        selections["카테고리"] = parent
+
+        start = time.perf_counter()
+        bitset = index.select(**selections)
+        elapsed = (time.perf_counter() - start) * 1e6
+        result = index.df.iloc[index.rows(bitset)].copy()
+        result['유형'] = result['관광지코드'].map(lambda c: index.label("관광지코드", c))
+        result['분류'] = result['카테고리'].map(lambda c: index.label("카테고리", c) if pd.notna(c) else "")
+        st.dataframe(result[['관광지명', '유형', '분류', '주소']], hide_index=True)
+        st.caption(f"{bitset.bit_count()}곳 · 필터 계산 {elapsed:.0f} μs")
+
+# ✅ 여러 지역 비교 (지역마다 검색 → 1위 관광지 주변 맛집을 동시에, 결과는 나란히)
+@st.fragment
+def display_region_comparison(offline_mode):
+    with st.expander("🆚 여러 지역 비교"):
+        text = st.text_input(f"비교할 지역 (쉼표로 구분, 최대 {MAX_REGIONS}곳)", "제주, 강릉, 부산", key="compare_regions")
+        regions, unknown = parse_regions(text)
+        if unknown:
+            st.warning(f"지역을 찾지 못했습니다: {', '.join(unknown)}")
+        fixed = [f"{typed} → {region}" for region, typed in regions if typed != region]
+        if fixed:
+            st.caption("지역명 확인: " + ", ".join(fixed))
+        if len(regions) < 2:
+            st.info("두 곳 이상 입력하세요.")
+            return
+
+        if st.button("비교하기", key="compare_run"):
+            search = offline.search_places if offline_mode else search_places
+            nearby = (offline.find_nearby_restaurants if offline_mode
+                      else functools.partial(find_nearby_restaurants, budget=NEARBY_BUDGET))
+
+            def restaurants_for(lat, lng):
+                restaurants = nearby(lat, lng, google_key)
+                if not restaurants:
+                    return pd.DataFrame()
+                return rank_dataframe(preprocess_restaurant_data(pd.DataFrame(restaurants)), lat, lng)
+
+            start = time.perf_counter()
+            results = compare_regions(regions, lambda region: search(region, google_key), restaurants_for)
+            st.session_state.compare_results = (results, time.perf_counter() - start)
+
+        if "compare_results" not in st.session_state:
+            return
+        results, total = st.session_state.compare_results
+        for col, result in zip(st.columns(len(results)), results):
+            with col:
+                st.markdown(f"#### {result.region}")
+                if result.error:
+                    st.error(f"검색 실패: {result.error}")
+                    continue
+                restaurants = result.restaurants if result.restaurants is not None else pd.DataFrame()
+                st.metric("관광지", result.place_count)
+                rated = pd.to_numeric(restaurants.get('평점', pd.Series(dtype=float)), errors='coerce')
+                st.metric("맛집 평균 평점", f"{rated.mean():.2f}" if rated.notna().any() else "없음")
+                for p in result.attractions:
+                    st.write(f"🏞 {p.name} (⭐ {p.rating if p.rating is not None else '없음'})")
+                if result.anchor is not None and not restaurants.empty:
+                    st.caption(f"🍽 {result.anchor.name} 주변")
+                    st.dataframe(restaurants[['이름', '평점']], hide_index=True)
+                st.caption(f"{result.seconds:.2f}s")
+        st.caption(f"⏱ 전체 {total:.2f}s (지역별 합계 {sum(r.seconds for r in results):.2f}s)")
+
+# ✅ 하루 여행 일정 (주변 관광지 여러 곳 + 점심/저녁 맛집) - 슬라이더·시간은 이 구역만 rerun
+@st.fragment
+def display_itinerary(lat, lng, restaurants_df):
+    st.subheader("🗓 하루 여행 일정 짜기")
+    places_df = load_places_csv()
+    places_df = places_df.assign(거리=haversine_np(lat, lng, places_df['위도'], places_df['경도']))
+
+    cols = st.columns(3)
+    with cols[0]:
+        radius_km = st.slider("관광지 범위 (km)", min_value=5, max_value=50, value=20, step=5)
+    with cols[1]:
+        start_time = st.time_input("출발 시각", datetime.time(9, 0))
+    with cols[2]:
+        end_time = st.time_input("종료 시각", datetime.time(19, 0))
+
+    nearby = places_df[places_df['거리'] <= radius_km * 1000]
+    attractions = nearby[~nearby['관광지코드'].isin([32, 39])]
+    meal_candidates = pd.concat([
+        restaurants_df[['이름', '위도', '경도']],
+        nearby[nearby['관광지코드'] == 39].rename(columns={'관광지명': '이름'})[['이름', '위도', '경도']],
+    ], ignore_index=True)
+
+    if attractions.empty:
+        st.info("범위 안에 일정에 넣을 관광지가 없습니다.")
+        return
+
+    if end_time <= start_time:
+        st.warning("종료 시각은 출발 시각보다 늦어야 합니다.")
+        return
+
+    plan = plan_itinerary(attractions, meal_candidates, start=(lat, lng),
+                          start_time=start_time.strftime("%H:%M"), end_time=end_time.strftime("%H:%M"))
+    if plan.empty:
+        st.info("이 시간 안에 들를 수 있는 곳이 없습니다. 종료 시각을 늦추거나 범위를 넓혀 보세요.")
+        return
+    st.dataframe(plan[['순서', '구분', '이름', '도착', '출발', '이동거리(m)']], hide_index=True)
+
+# ✅ 전국맛집 통계 (집계 큐브에서 바로 조회, 원본 재집계 없음)
+@st.cache_resource
+def load_food_cube():
+    return food_cube()
+
+def display_food_stats():
+    cube = load_food_cube()
+    with st.sidebar:
+        st.markdown("### 📊 전국맛집 통계")
+        region = st.selectbox("지역", list(cube.breakdown('지역').index))
+        city = st.selectbox("도시", ["전체"] + list(cube.breakdown('도시명', 지역=region).index))
+        city = None if city == "전체" else city
+        st.write(f"맛집 {cube.count(지역=region, 도시명=city)}곳")
+        st.bar_chart(cube.breakdown('도시명', 지역=region))
+        st.caption("음식종류 비율")
+        st.dataframe(cube.breakdown('음식종류', normalize=True, 지역=region, 도시명=city).head(10))
 
 # ✅ 메인 실행
 def main():
     st.set_page_config(page_title="관광지 주변 맛집 추천", layout="wide")
+    profiler = start_rerun(st)
+    try:
+        run_app()
+    finally:
+        finish_rerun(st, profiler)
+
+def run_app():
     st.title("📍 관광지 주변 맛집 추천 시스템")
+    with phase("food_stats"):
+        display_food_stats()
+    with phase("near_me"):
+        display_near_me()
+    with phase("facets"):
+        display_place_facets()
 
-    if not google_key:
-        st.error("❗ .env 파일에 'Google_key'가 설정되지 않았습니다.")
-        return
+    offline_mode = offline.is_offline(google_key)
+    if offline_mode:
+        st.info("🔌 오프라인 모드: 외부 API 없이 저장된 캐시와 로컬 데이터로 동작합니다.")
+
+    with phase("compare"):
+        display_region_comparison(offline_mode)
 
-    query = st.text_input("가고 싶은 지역을 입력하세요", "제주")
+    # 정식 지역·관광지 이름을 먼저 고르게 해서 오타·부분 단어로 Text Search를 부르지 않는다
+    with phase("autocomplete"):
+        query = autocomplete_input(st, "가고 싶은 지역을 입력하세요", "제주")
 
     if st.button("관광지 검색"):
-        st.session_state.places = search_places(query, google_key)
+        search = offline.search_places if offline_mode else search_places
+        with phase("search_places"):
+            st.session_state.places = to_place_records(search(query, google_key))
         st.session_state.selected_place = None
 
     if "places" not in st.session_state:
@@ -200,96 +444,74 @@ def main():
         st.session_state.selected_place = None
 
     if st.session_state.places:
-        display_top_attractions(st.session_state.places)
-        place_names = [p['name'] for p in st.session_state.places]
-        selected = st.selectbox("관광지를 선택하세요", place_names, key="place_select")
-        st.session_state.selected_place = selected
-
-        selected_place = next(p for p in st.session_state.places if p['name'] == selected)
-        address = selected_place.get('formatted_address')
-        rating = selected_place.get('rating', '없음')
-
-        st.markdown(f"### 🏞 관광지: {selected}")
-        st.write(f"📍 주소: {address}")
-        st.write(f"⭐ 평점: {rating}")
-
-        lat, lng = get_lat_lng(address, google_key)
-        if lat is None:
-            st.error("위치 정보를 불러오지 못했습니다.")
-            return
+        with phase("display_top_attractions"):
+            display_top_attractions(st.session_state.places, offline_mode=offline_mode)
+        place_section(st.session_state.places, offline_mode)
+
+# ✅ 관광지 선택 구역 (관광지를 바꾸면 이 구역만 rerun - 위쪽 통계·비교·검색은 다시 그리지 않는다)
+@st.fragment
+def place_section(places, offline_mode):
+    place_names = [p.name for p in places]
+    selected = st.selectbox("관광지를 선택하세요", place_names, key="place_select")
+    st.session_state.selected_place = selected
+
+    selected_place = next(p for p in places if p.name == selected)
+    address = selected_place.address
+    rating = selected_place.rating if selected_place.rating is not None else '없음'
+
+    st.markdown(f"### 🏞 관광지: {selected}")
+    st.write(f"📍 주소: {address}")
+    st.write(f"⭐ 평점: {rating}")
+
+    # Text Search 결과의 좌표를 그대로 쓰고, 없을 때만 지오코딩
+    lat, lng = place_lat_lng(selected_place)
+    if lat is None:
+        geocode = offline.get_lat_lng if offline_mode else get_lat_lng
+        with phase("get_lat_lng"):
+            lat, lng = geocode(address, google_key)
+    if lat is None:
+        st.error("위치 정보를 불러오지 못했습니다.")
+        return
 
-        st.subheader("🍽 주변 3km 맛집 Top 10")
-        restaurants = find_nearby_restaurants(lat, lng, google_key)
-        df = pd.DataFrame(restaurants)
-        df = preprocess_restaurant_data(df)
-        st.dataframe(df[['이름', '주소', '평점', '전화번호']].head(10))
-
-        # ✅ Kakao 지도 출력 (전화번호 있으면 전화번호 검색, 없으면 주소+가게명 검색)
-        st.subheader("🗺 지도에서 보기 (카카오맵)")
-        places_js = ""
-        for _, row in df.head(10).iterrows():
-            if row["전화번호"] != "없음":
-                search_key = row["전화번호"]
-            else:
-                search_key = f"{row['주소']} {row['이름']}"
-            places_js += f'''
-                {{
-                    name: "{row["이름"]}",
-                    address: "{row["주소"]}",
-                    phone: "{row["전화번호"]}",
-                    lat: {row["위도"]},
-                    lng: {row["경도"]},
-                    search_key: "{search_key}"
-                }},
-            '''
-
-        html_code = f"""
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <script src="//dapi.kakao.com/v2/maps/sdk.js?appkey={kakao_key}"></script>
-        </head>
-        <body>
-            <div id="map" style="width:100%; height:500px;"></div>
-            <script>
-                var map = new kakao.maps.Map(document.getElementById('map'), {{
-                    center: new kakao.maps.LatLng({lat}, {lng}),
-                    level: 4
-                }});
-
-                var places = [{places_js}];
-
-                places.forEach(function(p) {{
-                    var marker = new kakao.maps.Marker({{
-                        map: map,
-                        position: new kakao.maps.LatLng(p.lat, p.lng)
-                    }});
-
-                    var infowindow = new kakao.maps.InfoWindow({{
-                        content: "<div style='padding:5px; font-size:13px;'>" +
-                                 p.name + "<br>" + p.address + "</div>"
-                    }});
-                    infowindow.open(map, marker);
-
-                    kakao.maps.event.addListener(marker, 'click', function() {{
-                        let kakaoUrl = "https://map.kakao.com/?q=" + encodeURIComponent(p.search_key);
-                        window.open(kakaoUrl, "_blank");
-                    }});
-                }});
-            </script>
-        </body>
-        </html>
-        """
-
-        components.html(html_code, height=550)
-
-        csv = df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="📅 맛집 목록 CSV 다운로드",
-            data=csv,
-            file_name=f"{selected}_맛집목록.csv",
-            mime="text/csv"
-        )
+    st.subheader("🍽 주변 3km 맛집 Top 10")
+    nearby = (offline.find_nearby_restaurants if offline_mode
+              else functools.partial(find_nearby_restaurants, budget=NEARBY_BUDGET))
+    with phase("find_nearby_restaurants"):
+        restaurants = nearby(lat, lng, google_key)
+    if not restaurants:
+        st.warning("주변 맛집을 찾지 못했습니다.")
+        return
+    with phase("preprocess_restaurant_data"):
+        df = preprocess_restaurant_data(pd.DataFrame(restaurants))
+    with phase("rank"):
+        df = rank_dataframe(df, lat, lng)
+    st.dataframe(df[['이름', '주소', '평점', '전화번호']].head(10))
+    display_degraded(restaurants)
+
+    st.subheader("🗺 지도에서 보기 (카카오맵)" if not offline_mode else "🗺 지도에서 보기")
+    with phase("map"):
+        if offline_mode:
+            st.map(df.head(10).rename(columns={'위도': 'lat', '경도': 'lon'})[['lat', 'lon']])
+        else:
+            display_kakao_map(df, lat, lng)
+
+    with phase("itinerary"):
+        display_itinerary(lat, lng, df)
+
+    display_download(df, selected)
+
+# ✅ 다운로드 (형식 selectbox는 이 구역만 rerun, 파일은 버튼을 눌렀을 때만 만든다)
+@st.fragment
+def display_download(df, selected):
+    export_df = df.drop(columns=['place_id'], errors='ignore')
+    fmt = st.selectbox("다운로드 형식", list(FORMATS), format_func=str.upper)
+    st.download_button(
+        label=f"📅 맛집 목록 {fmt.upper()} 다운로드",
+        data=lambda: build_export(export_df, fmt),
+        file_name=export_file_name(f"{selected}_맛집목록", fmt),
+        mime=export_mime(fmt),
+        on_click="ignore"
+    )
 
 if __name__ == "__main__":
     main()
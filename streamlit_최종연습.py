@@ -4,9 +4,16 @@ import requests
 import time
 import os
 import re
-import textwrap
 from dotenv import load_dotenv
 import streamlit.components.v1 as components
+from geocode_cache import geocode as get_lat_lng, place_lat_lng
+from shared_cache import cached
+from place_details import get_place_details
+from ranking import rank_dataframe
+from nearby_cells import nearby_search
+from place_records import to_place_records, first_photo_ref
+from review_summaries import summary_for, snippet, warm_summaries
+from autocomplete import autocomplete_input
 
 # 🔧 환경 변수 로드
 load_dotenv()
@@ -18,40 +25,20 @@ def extract_region(address):
     match = re.match(r"([가-힣]+)", address.strip())
     return match.group(1) if match else ""
 
-# ✅ 구글 Place Details API → 전화번호 가져오기
-def get_place_details(place_id, api_key):
-    url = "https://maps.googleapis.com/maps/api/place/details/json"
-    params = {
-        "place_id": place_id,
-        "fields": "name,formatted_address,formatted_phone_number",
-        "language": "ko",
-        "key": api_key
-    }
-    res = requests.get(url, params=params).json()
-    return res.get("result", {})
-
 # ✅ 관광지 검색
+@cached("textsearch_rated")
 def search_places(query, api_key):
     url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
     params = {'query': f"{query} 관광지", 'language': 'ko', 'key': api_key}
     res = requests.get(url, params=params).json()
     return [p for p in res.get('results', []) if p.get('user_ratings_total', 0) >= 50]
 
-# ✅ 위도/경도 조회
-def get_lat_lng(address, api_key):
-    url = "https://maps.googleapis.com/maps/api/geocode/json"
-    params = {'address': address, 'language': 'ko', 'key': api_key}
-    res = requests.get(url, params=params).json()
-    if res.get('status') == 'OK' and res['results']:
-        loc = res['results'][0]['geometry']['location']
-        return loc['lat'], loc['lng']
-    return None, None
-
 # ✅ 사진 URL
 def get_place_photo_url(photo_reference, api_key, maxwidth=400):
     return f"https://maps.googleapis.com/maps/api/place/photo?maxwidth={maxwidth}&photoreference={photo_reference}&key={api_key}"
 
-# ✅ 리뷰 여러 개 가져오기
+# ✅ 리뷰 여러 개 가져오기 (fragment가 다시 돌아도 같은 가게는 다시 부르지 않음)
+@cached("reviews")
 def get_reviews(place_id, api_key, max_reviews=3):
     url = "https://maps.googleapis.com/maps/api/place/details/json"
     params = {'place_id': place_id, 'fields': 'review', 'language': 'ko', 'key': api_key}
@@ -62,18 +49,10 @@ def get_reviews(place_id, api_key, max_reviews=3):
         return []
 
 # ✅ 맛집 검색 (평점·사진·리뷰 없는 가게 제외)
+@cached("nearbysearch_reviewed")
 def find_nearby_restaurants(lat, lng, api_key, radius=2000):
-    url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-    params = {
-        'location': f'{lat},{lng}',
-        'radius': radius,
-        'type': 'restaurant',
-        'language': 'ko',
-        'key': api_key
-    }
-    res = requests.get(url, params=params).json()
-    time.sleep(1)
-    results = res.get('results', [])
+    # 격자 칸 캐시에서 합친 결과 (반경 슬라이더를 움직여도 칸 응답을 재사용)
+    results = nearby_search(lat, lng, radius, api_key)
 
     restaurants = []
     for r in results[:15]:
@@ -84,8 +63,9 @@ def find_nearby_restaurants(lat, lng, api_key, radius=2000):
         if rating is None or not photos or place_id is None:
             continue
 
-        reviews = get_reviews(place_id, api_key, 1)
-        if len(reviews) == 0:
+        # 요약이 있으면 리뷰가 있는 가게 (없을 때만 리뷰 한 개를 불러 확인)
+        summary = summary_for(place_id)
+        if not (summary and summary["review_count"]) and not get_reviews(place_id, api_key, 1):
             continue
 
         phone = None
@@ -97,9 +77,10 @@ def find_nearby_restaurants(lat, lng, api_key, radius=2000):
             '이름': r.get('name'),
             '주소': r.get('vicinity'),
             '평점': rating,
+            '리뷰수': r.get('user_ratings_total', 0),
             '위도': r['geometry']['location']['lat'],
             '경도': r['geometry']['location']['lng'],
-            'photos': photos,
+            'photo_ref': first_photo_ref(photos),
             '전화번호': phone if phone else "없음",
             'place_id': place_id
         })
@@ -125,14 +106,13 @@ def display_top_attractions(places):
     cols = st.columns(5)
     for idx, place in enumerate(places[:5]):
         with cols[idx]:
-            name = place.get('name', '')
-            rating = place.get('rating', '')
-            address = place.get('formatted_address', '')
-            place_id = place.get('place_id')
+            name = place.name
+            rating = place.rating if place.rating is not None else ''
+            address = place.address
+            place_id = place.place_id
             link = f"https://www.google.com/maps/place/?q=place_id:{place_id}"
-            photo_url = get_place_photo_url(place['photos'][0]['photo_reference'], google_key) if place.get('photos') else DEFAULT_IMG
-            reviews = get_reviews(place_id, google_key, 1)
-            review_html = render_reviews(reviews) if reviews else ""
+            photo_url = get_place_photo_url(place.photo_ref, google_key) if place.photo_ref else DEFAULT_IMG
+            review_html = render_summary(place_id)
             st.markdown(f"""
                 <div style='background:#f9f9f9; padding:10px; border-radius:10px; height:460px;'>
                     <div style='display:flex; justify-content:space-between;'>
@@ -145,18 +125,25 @@ def display_top_attractions(places):
                 </div>
             """, unsafe_allow_html=True)
 
-# ✅ 리뷰 HTML 렌더링
-def render_reviews(reviews):
+# ✅ 리뷰 HTML 렌더링 (snippets: review_summaries.py가 미리 잘라 둔 {"author", "rating", "text"})
+def render_reviews(snippets):
     review_blocks = []
-    for r in reviews:
-        author = r.get('author_name', '익명')
-        rating = r.get('rating', '')
-        text = textwrap.shorten(r.get('text', ''), width=80, placeholder='…')
+    for r in snippets:
         block = f"<div style='background:#f1f1f1; border-radius:8px; padding:10px; margin-top:5px;'>"
-        block += f"<b>{author}</b> ⭐ {rating}<br><span style='font-size:14px;'>{text}</span></div>"
+        block += f"<b>{r['author']}</b> ⭐ {r['rating']}<br><span style='font-size:14px;'>{r['text']}</span></div>"
         review_blocks.append(block)
     return "".join(review_blocks)
 
+# ✅ 카드용 리뷰 요약 (키워드·메뉴 태그 + 대표 리뷰 한 개) - 요약이 아직 없으면 비워 둔다
+def render_summary(place_id, max_snippets=1):
+    summary = summary_for(place_id)
+    if not summary or not summary["review_count"]:
+        return ""
+    tags = [f"#{w}" for w, _ in summary["menus"][:2]] + [f"#{w}" for w, _ in summary["keywords"][:3]]
+    tag_html = " ".join(f"<span style='font-size:12px; color:#2c7be5;'>{t}</span>" for t in dict.fromkeys(tags))
+    mood = f"<span style='font-size:12px; color:#888;'>리뷰 {summary['review_count']}개 · {summary['sentiment_label']}</span>"
+    return f"<div style='margin-top:5px;'>{mood}<br>{tag_html}</div>" + render_reviews(summary["snippets"][:max_snippets])
+
 # ✅ 추천 맛집 카드 출력
 def display_top_restaurants(df):
     st.markdown("---")
@@ -171,13 +158,12 @@ def display_top_restaurants(df):
             place_id = row.get('place_id')
             link = f"https://www.google.com/maps/place/?q=place_id:{place_id}"
 
-            if row.get('photos') and row['photos'][0].get('photo_reference'):
-                photo_url = get_place_photo_url(row['photos'][0]['photo_reference'], google_key)
+            if pd.notna(row.get('photo_ref')):
+                photo_url = get_place_photo_url(row['photo_ref'], google_key)
             else:
                 photo_url = DEFAULT_IMG
 
-            reviews = get_reviews(place_id, google_key, 1)
-            review_html = render_reviews(reviews) if reviews else ""
+            review_html = render_summary(place_id)
 
             st.markdown(f"""
                 <div style='background:#f9f9f9; padding:10px; border-radius:10px; height:460px;'>
@@ -196,98 +182,125 @@ def main():
     st.set_page_config(layout="wide")
     st.title("📍 MatTour😋")
 
-    query = st.text_input("가고 싶은 지역을 입력하세요", "제주")
+    # 정식 지역·관광지 이름을 먼저 고르게 해서 오타·부분 단어로 Text Search를 부르지 않는다
+    query = autocomplete_input(st, "가고 싶은 지역을 입력하세요", "제주")
 
     if st.button("관광지 검색"):
-        st.session_state.places = search_places(query, google_key)
+        st.session_state.places = to_place_records(search_places(query, google_key))
         st.session_state.selected_place = None
+        # Top 5 카드에 쓸 리뷰 요약을 카드를 그리기 전에 채워 둔다
+        warm_summaries([p.place_id for p in st.session_state.places[:5]],
+                       lambda place_id: get_reviews(place_id, google_key, 3))
 
+    # 관광지 카드는 검색할 때만 다시 그리고, 아래 구역은 각자 fragment로 따로 rerun 된다
     if "places" in st.session_state and st.session_state.places:
         display_top_attractions(st.session_state.places)
+        place_section(st.session_state.places)
 
-        st.markdown("---")
-        st.markdown("<h5 style='font-size:22px;'>📌 관광지를 선택하세요</h5>", unsafe_allow_html=True)
-
-        names = [p['name'] for p in st.session_state.places]
-        selected = st.selectbox("", names)
-        selected_place = next(p for p in st.session_state.places if p['name'] == selected)
-        st.session_state.selected_place = selected_place
-
-        address = selected_place.get('formatted_address', '')
-        rating = selected_place.get('rating', '')
-        photo = get_place_photo_url(selected_place['photos'][0]['photo_reference'], google_key) if selected_place.get('photos') else DEFAULT_IMG
+# ✅ 선택한 관광지 구역 (selectbox를 바꾸면 이 구역과 맛집 구역만 rerun)
+@st.fragment
+def place_section(places):
+    st.markdown("---")
+    st.markdown("<h5 style='font-size:22px;'>📌 관광지를 선택하세요</h5>", unsafe_allow_html=True)
+
+    names = [p.name for p in places]
+    selected = st.selectbox("", names)
+    selected_place = next(p for p in places if p.name == selected)
+    st.session_state.selected_place = selected_place
+
+    address = selected_place.address
+    rating = selected_place.rating if selected_place.rating is not None else ''
+    photo = get_place_photo_url(selected_place.photo_ref, google_key) if selected_place.photo_ref else DEFAULT_IMG
+    lat, lng = place_lat_lng(selected_place)
+    if lat is None:
         lat, lng = get_lat_lng(address, google_key)
 
-        st.markdown(f"### 🏞 관광지: {selected}")
-        st.markdown("---")
-
-        cols = st.columns([1.5, 1])
-        with cols[0]:
-            st.markdown(f"""
-                <div style='font-size:18px; margin-bottom:10px;'>📍 <b>주소:</b> {address}</div>
-                <div style='font-size:18px; margin-bottom:18px;'>⭐ <b>평점:</b> {rating}</div>
-                <div style='margin-top:10px; margin-bottom:5px; font-size:17px; font-weight:bold;'>📝 사용자 리뷰</div>
-            """, unsafe_allow_html=True)
-            st.markdown(render_reviews(get_reviews(selected_place['place_id'], google_key, 3)), unsafe_allow_html=True)
-
-        with cols[1]:
-            if photo:
-                st.image(photo, use_column_width=True)
-
-        radius = st.slider("맛집 검색 반경 (미터)", min_value=500, max_value=3000, value=2000, step=100)
-
-        restaurants = find_nearby_restaurants(lat, lng, google_key, radius=radius)
-        df = pd.DataFrame(restaurants)
-        df = preprocess_restaurant_data(df)
-
-        display_top_restaurants(df)
+    st.markdown(f"### 🏞 관광지: {selected}")
+    st.markdown("---")
 
-        st.markdown("---")
-        st.subheader("🗺 지도에서 보기 (카카오맵)")
+    cols = st.columns([1.5, 1])
+    with cols[0]:
+        st.markdown(f"""
+            <div style='font-size:18px; margin-bottom:10px;'>📍 <b>주소:</b> {address}</div>
+            <div style='font-size:18px; margin-bottom:18px;'>⭐ <b>평점:</b> {rating}</div>
+            <div style='margin-top:10px; margin-bottom:5px; font-size:17px; font-weight:bold;'>📝 사용자 리뷰</div>
+        """, unsafe_allow_html=True)
+        summary_html = render_summary(selected_place.place_id, max_snippets=3)
+        if not summary_html:
+            # 요약이 아직 없는 곳만 원문을 받아 그 자리에서 자른다 (받은 리뷰는 다음 일괄 계산에 포함)
+            summary_html = render_reviews([snippet(r) for r in get_reviews(selected_place.place_id, google_key, 3)])
+        st.markdown(summary_html, unsafe_allow_html=True)
+
+    with cols[1]:
+        if photo:
+            st.image(photo, use_column_width=True)
+
+    restaurant_section(lat, lng)
+
+# ✅ 맛집 구역 (반경 슬라이더를 움직이면 이 구역만 rerun - 위의 카드·리뷰는 그대로)
+@st.fragment
+def restaurant_section(lat, lng):
+    radius = st.slider("맛집 검색 반경 (미터)", min_value=500, max_value=3000, value=2000, step=100)
+
+    restaurants = find_nearby_restaurants(lat, lng, google_key, radius=radius)
+    if not restaurants:
+        st.warning("주변 맛집을 찾지 못했습니다. 반경을 넓혀 보세요.")
+        return
+    df = pd.DataFrame(restaurants)
+    df = preprocess_restaurant_data(df)
+    df = rank_dataframe(df, lat, lng)
+
+    display_top_restaurants(df)
 
-        places_js = ""
-        for _, row in df.head(5).iterrows():  # ✅ 지도에도 Top 5만
-            if row["전화번호"] != "없음":
-                search_key = row["전화번호"]
-            else:
-                region = extract_region(row["주소"])
-                search_key = f"{region} {row['이름']}"
-            places_js += f'''
-                {{
-                    name: "{row["이름"]}",
-                    address: "{row["주소"]}",
-                    phone: "{row["전화번호"]}",
-                    lat: {row["위도"]},
-                    lng: {row["경도"]},
-                    search_key: "{search_key}"
-                }},
-            '''
-
-        html_code = f"""
-        <!DOCTYPE html><html><head><meta charset='utf-8'>
-        <script src='//dapi.kakao.com/v2/maps/sdk.js?appkey={kakao_key}'></script></head>
-        <body><div id='map' style='width:100%; height:500px;'></div><script>
-        var map = new kakao.maps.Map(document.getElementById('map'), {{
-            center: new kakao.maps.LatLng({lat}, {lng}), level: 4
+    st.markdown("---")
+    st.subheader("🗺 지도에서 보기 (카카오맵)")
+    display_kakao_map(df, lat, lng)
+
+# ✅ 카카오맵 (Top 5 맛집)
+def display_kakao_map(df, lat, lng):
+    places_js = ""
+    for _, row in df.head(5).iterrows():  # ✅ 지도에도 Top 5만
+        if row["전화번호"] != "없음":
+            search_key = row["전화번호"]
+        else:
+            region = extract_region(row["주소"])
+            search_key = f"{region} {row['이름']}"
+        places_js += f'''
+            {{
+                name: "{row["이름"]}",
+                address: "{row["주소"]}",
+                phone: "{row["전화번호"]}",
+                lat: {row["위도"]},
+                lng: {row["경도"]},
+                search_key: "{search_key}"
+            }},
+        '''
+
+    html_code = f"""
+    <!DOCTYPE html><html><head><meta charset='utf-8'>
+    <script src='//dapi.kakao.com/v2/maps/sdk.js?appkey={kakao_key}'></script></head>
+    <body><div id='map' style='width:100%; height:500px;'></div><script>
+    var map = new kakao.maps.Map(document.getElementById('map'), {{
+        center: new kakao.maps.LatLng({lat}, {lng}), level: 4
+    }});
+    var places = [{places_js}];
+    places.forEach(function(p) {{
+        var marker = new kakao.maps.Marker({{
+            map: map,
+            position: new kakao.maps.LatLng(p.lat, p.lng)
+        }});
+        var infowindow = new kakao.maps.InfoWindow({{
+            content: "<div style='padding:5px; font-size:13px;'>" + p.name + "<br>" + p.address + "</div>"
         }});
-        var places = [{places_js}];
-        places.forEach(function(p) {{
-            var marker = new kakao.maps.Marker({{
-                map: map,
-                position: new kakao.maps.LatLng(p.lat, p.lng)
-            }});
-            var infowindow = new kakao.maps.InfoWindow({{
-                content: "<div style='padding:5px; font-size:13px;'>" + p.name + "<br>" + p.address + "</div>"
-            }});
-            infowindow.open(map, marker);
-            kakao.maps.event.addListener(marker, 'click', function() {{
-                let kakaoUrl = "https://map.kakao.com/?q=" + encodeURIComponent(p.search_key);
-                window.open(kakaoUrl, "_blank");
-            }});
+        infowindow.open(map, marker);
+        kakao.maps.event.addListener(marker, 'click', function() {{
+            let kakaoUrl = "https://map.kakao.com/?q=" + encodeURIComponent(p.search_key);
+            window.open(kakaoUrl, "_blank");
         }});
-        </script></body></html>
-        """
-        components.html(html_code, height=550)
+    }});
+    </script></body></html>
+    """
+    components.html(html_code, height=550)
 
 if __name__ == "__main__":
     main()